@@ -0,0 +1,254 @@
+from os import chdir
+from os.path import abspath
+from sys import path, exit, version
+from argparse import ArgumentParser
+from platform import platform
+from datetime import datetime
+from json import load, dump
+from time import perf_counter
+
+# parses the arguments before changing directory so relative paths are kept
+parser = ArgumentParser(description="times the hot paths of Orbital Resonance without opening the program and compares "
+                                    "them to a stored baseline")
+parser.add_argument("--output", default="benchmark results.json", help="the json file to write the results to")
+parser.add_argument("--baseline", default="benchmark baseline.json", help="the json file of the baseline results")
+parser.add_argument("--save-baseline", action="store_true", help="stores the results as the new baseline")
+parser.add_argument("--tolerance", type=float, default=.35,
+                    help="how much slower than the baseline a result can be before it is a regression (default .35)")
+parser.add_argument("--repeat", type=int, default=7, help="how many times each benchmark is timed, the fastest is kept")
+parser.add_argument("--only", default="", help="only runs benchmarks whose name contains this text")
+args = parser.parse_args()
+output, baseline = abspath(args.output), abspath(args.baseline)
+
+chdir("../src")
+path.insert(0, ".")
+from FileManagement.FileManager import FileManager
+from FileManagement.ProjectFile import ProjectFile
+from Physics.PlanetManager import PlanetManager
+from Physics.Planet import Planet
+from Physics.Moon import Moon
+from GUI.Canvas import Canvas
+from GUI.StarField import StarField
+from GUI.AISettings import AISettings
+from AudioEngine.PitchShifter import PitchShifter
+from numpy import array, sin, pi, arange, int16
+from numpy.random import default_rng
+from tempfile import TemporaryDirectory
+from pathlib import Path
+from random import uniform, randint, seed
+
+BODY_COUNTS = [1_000, 10_000]
+MOONS_PER_PLANET = 3
+PHYSICS_FRAMES = 50
+DT = 1 / 60
+CHUNK_PAIRS = 1000
+STAR_REGION = (24, 16)  # chunks in a screen of stars
+SAMPLE_RATE = 22050
+EDITS = 1000
+MIN_RUN_TIME = .05  # seconds
+
+
+def time(function, repeat: int = args.repeat) -> float:
+    """
+    times a function, fast functions are called enough times in a row to take at least MIN_RUN_TIME so that timer
+    resolution and noise don't dominate, the fastest run is kept since slower runs are slowed by the rest of the system
+
+    :param function: the function to time, called without arguments
+    :param repeat: the number of runs
+
+    :return: the time of a single call in milliseconds
+    """
+
+    # finds how many calls make a run long enough to time, functions that are only run once are not called beforehand
+    calls, elapsed = 1, 0
+    while repeat > 1 and elapsed < MIN_RUN_TIME:
+        start = perf_counter()
+        [function() for call in range(calls)]
+        elapsed = perf_counter() - start
+        calls *= 2 if elapsed < MIN_RUN_TIME else 1
+
+    # times the runs
+    times = []
+    for i in range(repeat):
+        start = perf_counter()
+        [function() for call in range(calls)]
+        times.append((perf_counter() - start) / calls)
+    return min(times) * 1000
+
+
+def create_planet_manager(bodies: int) -> PlanetManager:
+    """
+    creates a planet manager with the given number of bodies split between planets and their moons
+
+    :param bodies: the total number of planets and moons to create
+
+    :return: the planet manager containing the bodies
+    """
+
+    planet_manager = PlanetManager()
+    while len(planet_manager.planets) <= bodies:
+        planet = Planet(randint(1, 64), 50, "white", 0, offset=uniform(0, 1))
+        planet_manager.add_planet(planet, False)
+        for i in range(MOONS_PER_PLANET):
+            planet_manager.add_planet(Moon(planet, uniform(.1, 3), 25, "white", 0, None, uniform(0, 1)), False)
+
+    return planet_manager
+
+
+def file_benchmarks() -> dict:
+    """
+    loads each bundled save the way the program does, saves it again to a temporary file in the current format and
+    loads that file, saves that fail to load are skipped
+
+    :return: the milliseconds to load and save each save and to load it once saved
+    """
+
+    results = {}
+    with TemporaryDirectory() as directory:
+        for save in sorted(Path("saves").glob("*.orbres")):
+            try:
+                planet_manager = FileManager().load(path=str(save))
+            except Exception as error:  # reports saves that can't be loaded rather than stopping the suite
+                print(f"skipping {save.name}: {error!r}")
+                continue
+
+            results[f"load {save.stem}"] = time(lambda: FileManager().load(path=str(save)))
+            target = str(Path(directory) / save.name)
+            results[f"save {save.stem}"] = time(lambda: ProjectFile.write(target, planet_manager.planets,
+                                                                          planet_manager.samples))
+            results[f"load {save.stem} (saved)"] = time(lambda: FileManager().load(path=target))
+
+    return results
+
+
+def physics_benchmarks() -> dict:
+    """
+    steps synthetic solar systems of each size in BODY_COUNTS
+
+    :return: the milliseconds per frame of each size
+    """
+
+    results = {}
+    for count in BODY_COUNTS:
+        planet_manager = create_planet_manager(count)
+        planet_manager.update_planet_physics(DT)  # first step syncs every body
+        frames = lambda: [planet_manager.update_planet_physics(DT) for frame in range(PHYSICS_FRAMES)]
+        results[f"physics {count} bodies"] = time(frames) / PHYSICS_FRAMES
+
+    return results
+
+
+def star_benchmarks() -> dict:
+    """
+    finds the chunks that come into view between random pairs of regions and generates the stars of a screen of chunks
+    with and without the cache
+
+    :return: the milliseconds per CHUNK_PAIRS chunk differences and per screen of stars
+    """
+
+    # creates overlapping regions the way panning and zooming do
+    random = default_rng(0)
+    corners = random.integers(-50, 50, (CHUNK_PAIRS, 2, 2, 2)) * Canvas.CHUNK_SIZE
+    corners[:, :, 1] = corners[:, :, 0] + random.integers(1, 30, (CHUNK_PAIRS, 2, 2)) * Canvas.CHUNK_SIZE
+    differences = lambda: [Canvas.chunk_difference(first, second) for first, second in corners]
+
+    # generates a screen of chunks
+    columns, rows = STAR_REGION
+    chunks = array([[x, y] for x in range(columns) for y in range(rows)]) * Canvas.CHUNK_SIZE
+    star_field = StarField(0, Canvas.CHUNK_SIZE, Canvas.STARS_PER_CHUNK)
+    star_field.get(chunks)
+
+    return {"chunk difference": time(differences), "stars generate": time(lambda: star_field.generate(chunks)),
+            "stars cached": time(lambda: star_field.get(chunks))}
+
+
+def pitch_benchmarks() -> dict:
+    """
+    finds the note of a sample and pitch shifts it the way the AI settings and the sequence editor do
+
+    :return: the milliseconds to find the nearest midi note and to shift a sample
+    """
+
+    signal = (sin(2 * pi * 440 * arange(SAMPLE_RATE) / SAMPLE_RATE) * 16000).astype(int16)  # one second of A4
+    sample = {"shifted_signal_array": signal, "sample_rate": SAMPLE_RATE, "crops": (0, len(signal))}
+    return {"find nearest midi": time(lambda: AISettings.find_nearest_midi(None, signal, SAMPLE_RATE)),
+            "pitch shift": time(lambda: PitchShifter.shift(sample, 3))}
+
+
+def state_benchmarks() -> dict:
+    """
+    edits planets and undoes then redoes every edit with the state manager
+
+    :return: the milliseconds to undo and to redo EDITS edits
+    """
+
+    # edits planets the way the planet settings do, each edit is its own state
+    planet_manager = create_planet_manager(100)
+    planets = planet_manager.planets
+    for edit in range(EDITS):
+        planet = planets[edit % len(planets)]
+        planet.update = False
+        planet.radius = planet.radius + 1
+
+    # undoes then redoes every edit, each pass leaves the edits as they were so the passes can be repeated
+    state_manager, undo, redo = planet_manager.state_manager, [], []
+    for i in range(args.repeat):
+        undo.append(time(lambda: [state_manager.undo() for edit in range(EDITS)], 1))
+        redo.append(time(lambda: [state_manager.redo() for edit in range(EDITS)], 1))
+
+    return {f"undo {EDITS} edits": min(undo), f"redo {EDITS} edits": min(redo)}
+
+
+def compare(results: dict, stored: dict, tolerance: float) -> list:
+    """
+    prints each result next to its baseline
+
+    :param results: the milliseconds of each benchmark
+    :param stored: the milliseconds of each benchmark in the baseline
+    :param tolerance: how much slower than the baseline a result can be before it is a regression
+
+    :return: the names of the benchmarks that regressed
+    """
+
+    regressions = []
+    print(f"{'benchmark':<32}{'ms':>12}{'baseline':>12}{'change':>9}")
+    for name, result in results.items():
+        if name not in stored:
+            print(f"{name:<32}{result:12.3f}{'-':>12}{'-':>9}  new")
+            continue
+
+        change = result / stored[name] - 1
+        status = "REGRESSION" if change > tolerance else "faster" if change < -tolerance else "ok"
+        regressions.append(name) if status == "REGRESSION" else None
+        print(f"{name:<32}{result:12.3f}{stored[name]:12.3f}{change:+9.1%}  {status}")
+
+    return regressions
+
+
+# runs every benchmark
+seed(0)
+results = {}
+for benchmark in (file_benchmarks, physics_benchmarks, star_benchmarks, pitch_benchmarks, state_benchmarks):
+    if args.only and args.only not in benchmark.__name__:
+        continue
+    print(f"running {benchmark.__name__.replace('_', ' ')}...")
+    results.update(benchmark())
+
+# writes the results
+report = {"date": datetime.now().isoformat(timespec="seconds"), "platform": platform(), "python": version.split()[0],
+          "repeat": args.repeat, "results_ms": results}
+with open(output, "w") as file:
+    dump(report, file, indent=2)
+if args.save_baseline:
+    with open(baseline, "w") as file:
+        dump(report, file, indent=2)
+
+# compares the results with the baseline and fails when any benchmark regressed
+stored = {}
+if Path(baseline).is_file() and not args.save_baseline:
+    with open(baseline) as file:
+        stored = load(file)["results_ms"]
+regressions = compare(results, stored, args.tolerance)
+print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}" if regressions else
+      f"\nno regressions beyond {args.tolerance:.0%}" if stored else "\nno baseline, run with --save-baseline to store one")
+exit(1 if regressions else 0)
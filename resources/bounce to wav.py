@@ -0,0 +1,28 @@
+from os import chdir
+from os.path import abspath
+from sys import path
+from argparse import ArgumentParser
+from time import perf_counter
+
+# parses the arguments before changing directory so relative paths are kept
+parser = ArgumentParser(description="renders an Orbital Resonance project to a WAV file without opening the program")
+parser.add_argument("project", help="the .orbres file to render")
+parser.add_argument("output", help="the .wav file to write")
+parser.add_argument("--duration", type=float, default=60, help="how many seconds to render (default 60)")
+parser.add_argument("--speed", type=float, default=1, help="the playback speed of the simulation (default 1)")
+parser.add_argument("--sample-rate", type=int, default=44100, help="the sample rate of the WAV file (default 44100)")
+args = parser.parse_args()
+project, output = abspath(args.project), abspath(args.output)
+
+chdir("../src")
+path.insert(0, ".")
+from FileManagement.ProjectFile import ProjectFile
+from Physics.PlanetManager import PlanetManager
+from AudioEngine.OfflineRenderer import OfflineRenderer
+
+# renders the project and reports how much faster than real time it was
+start = perf_counter()
+renderer = OfflineRenderer(PlanetManager(**ProjectFile.read(project)), args.sample_rate, args.speed)
+renderer.render(output, args.duration, lambda done: print(f"\rrendering: {done:6.1%}", end=""))
+elapsed = perf_counter() - start
+print(f"\nrendered {args.duration:g}s of audio in {elapsed:.2f}s ({args.duration / elapsed:.1f}x real time)")
@@ -0,0 +1,41 @@
+from os import chdir, replace, makedirs
+from os.path import abspath, getsize, join, basename
+from sys import path
+from argparse import ArgumentParser
+from glob import glob
+
+# parses the arguments before changing directory so relative paths are kept
+parser = ArgumentParser(description="converts older .orbres projects to the current container format")
+parser.add_argument("projects", nargs="*", help="the .orbres files to convert (default every save in src/saves)")
+parser.add_argument("--output", help="the folder to write the converted files to (default converts them in place and "
+                                     "keeps the original next to it as .orbres.v<version>)")
+args = parser.parse_args()
+projects = [abspath(project) for project in args.projects] or sorted(glob(abspath("../src/saves/*.orbres")))
+output = abspath(args.output) if args.output else None
+makedirs(output, exist_ok=True) if output else None
+
+chdir("../src")
+path.insert(0, ".")
+from FileManagement.ProjectFile import ProjectFile
+
+# converts each older project, projects are read with their planets so their sounds are stored again
+for project in projects:
+    version = ProjectFile.version(project)
+    if version >= ProjectFile.VERSION:
+        print(f"{basename(project)}: already version {version}")
+        continue
+
+    try:
+        data = ProjectFile.read(project)
+    except Exception as error:  # reports projects that can't be read rather than stopping the conversion
+        print(f"{basename(project)}: could not be read ({error!r})")
+        continue
+
+    # writes the converted project, the original is only replaced once the new file is complete
+    size = getsize(project)
+    target = join(output, basename(project)) if output else project + f".v{ProjectFile.VERSION}"
+    ProjectFile.write(target, data["planets"], data["samples"])
+    if not output:
+        replace(project, project + f".v{version}")
+        replace(target, project)
+    print(f"{basename(project)}: converted, {size} -> {getsize(target if output else project)} bytes")
@@ -0,0 +1,66 @@
+from os import chdir
+chdir("../src")
+from main import root, canvas
+
+
+class CountingTk:
+    """
+    wraps the tcl interpreter of the canvas so that every call the canvas makes into tcl is counted
+    """
+
+    def __init__(self, interpreter):
+        """
+        creates the wrapper
+
+        :param interpreter: the tcl interpreter of the canvas
+        """
+
+        self.interpreter = interpreter
+        self.calls = 0
+
+    def call(self, *args):
+        """
+        counts and forwards a tcl command
+        """
+
+        self.calls += 1
+        return self.interpreter.call(*args)
+
+    def eval(self, script: str):
+        """
+        counts and forwards a tcl script, a batch of commands only counts once since it is a single round trip
+        """
+
+        self.calls += 1
+        return self.interpreter.eval(script)
+
+    def __getattr__(self, name: str):
+        """
+        forwards everything else to the tcl interpreter
+        """
+
+        return getattr(self.interpreter, name)
+
+
+def update_planets():
+    """
+    changes how the update planets function of the canvas works to also display the number of tcl calls made by each
+    frame and the number of calls per item drawn
+    """
+
+    canvas.tk.calls = 0
+    old_func()
+    calls = canvas.tk.calls
+    items = canvas.lod_counts["shapes"] + canvas.lod_counts["points"] + canvas.lod_counts["paths"]
+    canvas.itemconfig(calls_label, text=f"Tk Calls: {calls} ({calls / max(items, 1):.2f} per item)")
+
+
+# changes the update planets function and counts the calls of the canvas
+canvas.tk = CountingTk(canvas.tk)
+old_func = canvas.update_planets
+canvas.update_planets = update_planets
+
+# adds the call label and starts program
+calls_label = canvas.create_text(canvas.canvas_size[0] - 40, 20, fill="white", tags="planet_settings",
+                                 font=("Arial", 12), anchor="ne")
+root.mainloop()
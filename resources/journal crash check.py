@@ -0,0 +1,145 @@
+from os import chdir, kill, getpid
+from os.path import abspath
+from sys import path, executable, exit
+from argparse import ArgumentParser
+from subprocess import run
+from tempfile import TemporaryDirectory
+from json import dump, load
+import signal
+
+# parses the arguments before changing directory so relative paths are kept
+parser = ArgumentParser(description="makes random edits to a project in a child process, compacts its journal and kills "
+                                    "it partway through and checks that replaying the journal restores every edit, exits "
+                                    "with 1 if it doesn't")
+parser.add_argument("--edits", type=int, nargs="+", default=[1, 7, 40, 150],
+                    help="how many edits the child makes before it is killed, one run each (default 1 7 40 150)")
+parser.add_argument("--seed", type=int, default=0, help="the seed of the random edits (default 0)")
+parser.add_argument("--child", nargs=3, metavar=("PROJECT", "EXPECTED", "EDITS"),
+                    help="used internally to run the child process")
+args = parser.parse_args()
+script = abspath(__file__)
+
+chdir("../src")
+path.insert(0, ".")
+from FileManagement.FileManager import FileManager
+from FileManagement.ProjectFile import ProjectFile
+from Physics.PlanetManager import PlanetManager
+from Physics.Planet import Planet
+from Physics.Moon import Moon
+from random import Random
+from numpy import full
+
+PLANETS = 12
+MOONS_PER_PLANET = 2
+DT = 1 / 60
+KILL = getattr(signal, "SIGKILL", signal.SIGTERM)  # terminates the process without cleanup on every platform
+
+
+def fingerprint(planet_manager: PlanetManager) -> dict:
+    """
+    reduces a project to the values the edits change so that two projects can be compared
+
+    :param planet_manager: the planet manager of the project
+
+    :return: the bodies by tag and the volume of each sample
+    """
+
+    bodies = {str(planet.tag): [type(planet).__name__, planet.period, planet.radius, planet.color, planet.offset,
+                                str(planet.parent.tag) if planet.parent else None,
+                                sorted(str(moon.tag) for moon in planet.moons)] for planet in planet_manager.planets}
+    return {"bodies": bodies, "samples": {name: sample["volume"] for name, sample in planet_manager.samples.items()}}
+
+
+def edit(planet_manager: PlanetManager, random: Random, number: int):
+    """
+    makes a random edit through the same functions the GUI uses
+
+    :param planet_manager: the planet manager of the project
+    :param random: the random generator of the edits
+    :param number: the number of the edit, used to name new samples
+    """
+
+    # planets of the sequence editor are only edited through their sample like in the program
+    sequenced = {id(planet) for sample in planet_manager.samples.values() for planet in sample.get(
+        "midi_array", full(0, None)).flat if planet is not None}
+    planets = [planet for planet in planet_manager.planets if type(planet) == Planet and id(planet) not in sequenced]
+    leaves = [planet for planet in planet_manager.planets[1:] if not planet.moons and id(planet) not in sequenced]
+    samples = [name for name in planet_manager.samples if name != "Default (No Audio)"]
+    state_manager = planet_manager.state_manager
+    action = random.choice(["radius", "color", "period", "planet", "moon", "remove", "undo", "redo", "sample",
+                            "delete sample"])
+
+    # values are edited like the editors do, the update flag is cleared first so the edit is added as a new state
+    if action in ("radius", "color", "period"):
+        planet = random.choice(planets[1:] if action == "period" else planet_manager.planets)
+        planet.update = False
+        setattr(planet, action, random.uniform(10, 80) if action == "radius" else random.randint(1, 32) if
+                action == "period" else f"#{random.randrange(0x1000000):06x}")
+    elif action == "planet":
+        planet_manager.add_planet(Planet(random.randint(1, 32), 40, "white", 0, offset=random.random()))
+    elif action == "moon":
+        planet_manager.add_planet(Moon(random.choice(planets), random.uniform(.2, 2), 20, "white", 0, None,
+                                       random.random()))
+    elif action == "remove" and leaves:
+        planet_manager.remove_planet(random.choice(leaves))
+    elif action == "undo":
+        state_manager.undo()
+    elif action == "redo":
+        state_manager.redo()
+    elif action == "sample":
+        midi_array = full((2, 4), None)
+        for column in random.sample(range(4), 2):
+            midi_array[0, column] = Planet(4, 40, "white", 0, offset=column / 4)
+        planet_manager.add_sample(f"sample {number}", {"pitch": 0, "volume": random.random(), "midi_array": midi_array})
+    elif action == "delete sample" and samples:
+        planet_manager.delete_sample(random.choice(samples))
+
+
+# makes edits like the program would and is killed without closing the project
+if args.child:
+    project, expected, edits = args.child
+    random = Random(args.seed + int(edits))
+    manager = FileManager().load(path=project)
+    journal = manager.state_manager.journal
+    for number in range(int(edits)):
+        edit(manager, random, number)
+        manager.update_planet_physics(DT)  # the frame after an edit journals it
+
+        # compacts the journal halfway through, the edits made while merging are kept after the merged record
+        journal.compact() if number == int(edits) // 2 else None
+        (journal.thread.join(), journal.finish()) if number == int(edits) * 3 // 4 and journal.thread else None
+    with open(expected, "w") as file:
+        dump(fingerprint(manager), file)
+    kill(getpid(), KILL)
+
+# creates a project, kills a child partway through editing it and compares the recovered project with the child's
+failures = 0
+random = Random(args.seed)
+with TemporaryDirectory() as directory:
+    for edits in args.edits:
+        project, expected = f"{directory}/crash {edits}.orbres", f"{directory}/expected {edits}.json"
+        manager = PlanetManager()
+        for number in range(PLANETS):
+            planet = Planet(random.randint(1, 32), 50, "white", 0, offset=random.random())
+            manager.add_planet(planet, False)
+            [manager.add_planet(Moon(planet, random.uniform(.2, 2), 25, "white", 0, None, random.random()), False)
+             for moon in range(MOONS_PER_PLANET)]
+        ProjectFile.write(project, manager.planets, manager.samples)
+        original = fingerprint(FileManager().load(path=project))
+
+        # runs the child, it exits through the kill signal
+        run([executable, script, "--seed", str(args.seed), "--child", project, expected, str(edits)])
+        with open(expected) as file:
+            expected = load(file)
+
+        # checks the recovered project is marked unsaved when it was edited, a record cut off while it was written
+        # must be ignored
+        recovered = FileManager().load(path=project)
+        ok = fingerprint(recovered) == expected and recovered.state_manager.unsaved == (original != expected)
+        with open(project + ".journal", "ab") as file:
+            file.write(b"\xff\x00\x00\x00cut off")
+        ok = ok and fingerprint(FileManager().load(path=project)) == expected
+        failures += not ok
+        print(f"{edits:>5} edits: {'recovered' if ok else 'FAILED'}")
+
+exit(1 if failures else 0)
@@ -0,0 +1,40 @@
+from os import chdir
+from sys import path
+chdir("../src")
+path.insert(0, ".")
+from Physics.PlanetManager import PlanetManager
+from Physics.Planet import Planet
+from AudioEngine.Mixer import Mixer
+from AudioEngine.NullOutput import NullOutput
+from AudioEngine.Voice import Voice
+from numpy import zeros, float32, flatnonzero, diff
+from random import uniform
+
+PERIOD = 1
+DURATION = 30
+FRAME_TIMES = (.005, .05)  # range of seconds between display frames, simulates tk jitter
+
+# creates a planet that plays a single click each orbit through a mixer that records to an array
+output = NullOutput()
+mixer = Mixer(output)
+PlanetManager.MIXER = mixer
+planet_manager = PlanetManager()
+planet = Planet(PERIOD, 10, "white", 0)
+planet_manager.add_planet(planet, False)
+click = zeros(64, dtype=float32)
+click[0] = 1
+planet.sound = Voice(mixer, click)
+
+# steps the simulation with irregular frames while the output advances at the sample rate
+time_elapsed = 0
+while time_elapsed < DURATION:
+    time_elapsed += uniform(*FRAME_TIMES)
+    planet_manager.update_planet_physics(time_elapsed - planet_manager.time_elapsed)
+    output.pull(max(round(time_elapsed * mixer.sample_rate) - mixer.clock, 0))
+output.pull(mixer.latency + mixer.buffer_size)
+
+# reports how far each click was from the expected spacing
+intervals = diff(flatnonzero(output.get_recording() > .5))
+error = abs(intervals - PERIOD * mixer.sample_rate)
+print(f"{len(intervals) + 1} clicks, max jitter {error.max()} frames ({error.max() / mixer.sample_rate * 1000:.3f} ms), "
+      f"{mixer.late_events} late")
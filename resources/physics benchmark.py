@@ -0,0 +1,44 @@
+from os import chdir
+from sys import path
+chdir("../src")
+path.insert(0, ".")
+from Physics.PlanetManager import PlanetManager
+from Physics.Planet import Planet
+from Physics.Moon import Moon
+from time import perf_counter
+from random import uniform, randint
+
+BODY_COUNTS = [100, 1_000, 10_000, 100_000]
+MOONS_PER_PLANET = 3
+FRAMES = 100
+DT = 1 / 60
+
+
+def create_planet_manager(bodies: int) -> PlanetManager:
+    """
+    creates a planet manager with the given number of bodies split between planets and their moons
+
+    :param bodies: the total number of planets and moons to create
+
+    :return: the planet manager containing the bodies
+    """
+
+    planet_manager = PlanetManager()
+    while len(planet_manager.planets) <= bodies:
+        planet = Planet(randint(1, 64), 50, "white", 0, offset=uniform(0, 1))
+        planet_manager.add_planet(planet, False)
+        for i in range(MOONS_PER_PLANET):
+            planet_manager.add_planet(Moon(planet, uniform(.1, 3), 25, "white", 0, None, uniform(0, 1)), False)
+
+    return planet_manager
+
+
+# steps each planet manager and reports the average cost of a frame
+for count in BODY_COUNTS:
+    manager = create_planet_manager(count)
+    manager.update_planet_physics(DT)  # first step syncs every body
+    start = perf_counter()
+    for frame in range(FRAMES):
+        manager.update_planet_physics(DT)
+    frame_time = (perf_counter() - start) / FRAMES
+    print(f"{count:>7} bodies: {frame_time * 1000:8.3f} ms/frame ({frame_time / count * 1e9:6.1f} ns/body)")
@@ -0,0 +1,93 @@
+from os import chdir
+from sys import path
+chdir("../src")
+path.insert(0, ".")
+from Physics.PlanetManager import PlanetManager
+from Physics.Planet import Planet
+from Physics.Moon import Moon
+from GUI.Canvas import Canvas
+from GUI.PlanetSettings import PlanetSettings
+from GUI.AISettings import AISettings
+from customtkinter import CTk
+from numpy import array
+from time import perf_counter
+from random import uniform, randint, choice
+
+BODY_COUNTS = [1_000, 10_000]
+RENDERERS = ["tk", "raster"]
+MOONS_PER_PLANET = 3
+FRAMES = 100
+SHAPES = ["Circle", "Square", "Triangle", "Rectangle"]
+
+
+def create_planet_manager(bodies: int) -> PlanetManager:
+    """
+    creates a planet manager with the given number of bodies split between planets and their moons
+
+    :param bodies: the total number of planets and moons to create
+
+    :return: the planet manager containing the bodies
+    """
+
+    planet_manager = PlanetManager()
+    while len(planet_manager.planets) <= bodies:
+        planet = Planet(randint(1, 64), 50, f"#{randint(0, 0xFFFFFF):06x}", 0, offset=uniform(0, 1))
+        planet._shape = choice(SHAPES)
+        planet_manager.add_planet(planet, False)
+        for i in range(MOONS_PER_PLANET):
+            planet_manager.add_planet(Moon(planet, uniform(.1, 3), 25, "white", 0, None, uniform(0, 1)), False)
+
+    return planet_manager
+
+
+def benchmark(root: CTk, renderer: str, bodies: int) -> float:
+    """
+    draws frames of a solar system with a renderer, including the time tk takes to redraw the canvas
+
+    :param root: the window to draw in
+    :param renderer: the name of the renderer in Canvas.RENDERERS
+    :param bodies: the number of bodies to draw
+
+    :return: the average time of a frame in seconds
+    """
+
+    # creates the canvas and its menus with the renderer
+    Canvas.RENDERER = renderer
+    planet_manager = create_planet_manager(bodies)
+    planet_settings = PlanetSettings(root, planet_manager=planet_manager)
+    ai_settings = AISettings(root, planet_manager=planet_manager, planet_settings=planet_settings, pipe=None)
+    canvas = Canvas(root, bg="black", highlightthickness=1, planet_settings=planet_settings, AI_settings=ai_settings,
+                    planet_manager=planet_manager, file_manager=None)
+    canvas.grid(row=0, column=0, sticky="nsew")
+    root.update()
+
+    # zooms out so that the whole solar system is on screen
+    largest_orbit = max(planet.orbital_radius for planet in planet_manager.planets)
+    canvas.set_focus(None)
+    canvas.zoom_event(array([[min(canvas.canvas_size) / (2 * largest_orbit) / canvas.zoom[0, 0]], [1]]))
+    canvas.update_planets()
+    root.update_idletasks()
+
+    # times frames, only idle tasks are processed so the frames scheduled by the canvas never run
+    start = perf_counter()
+    for frame in range(FRAMES):
+        canvas.update_planets()
+        root.update_idletasks()
+    frame_time = (perf_counter() - start) / FRAMES
+
+    # removes the widgets so the next benchmark starts from an empty window
+    for widget in (canvas, planet_settings, ai_settings):
+        widget.destroy()
+    return frame_time
+
+
+# draws each solar system with each renderer and reports the average cost of a frame
+window = CTk()
+window.geometry("1600x900")
+window.rowconfigure(0, weight=1)
+window.columnconfigure(0, weight=1)
+for count in BODY_COUNTS:
+    for name in RENDERERS:
+        frame_time = benchmark(window, name, count)
+        print(f"{name:>6} renderer, {count:>6} bodies: {frame_time * 1000:8.2f} ms/frame ({1 / frame_time:6.1f} fps)")
+window.destroy()
@@ -0,0 +1,11 @@
+from os import chdir
+from sys import path
+chdir("../src")
+path.insert(0, ".")
+from GUI.Canvas import Canvas
+
+# draws the solar system as a single image rather than with a canvas item per body, must be set before the canvas is
+# created
+Canvas.RENDERER = "raster"
+from main import root
+root.mainloop()
@@ -0,0 +1,136 @@
+from os import chdir
+from sys import path, exit
+from argparse import ArgumentParser
+
+# parses the arguments before changing directory so relative paths are kept
+parser = ArgumentParser(description="draws frames of N and 2N bodies without user input and checks that the number of "
+                                    "tcl calls the canvas makes per frame doesn't grow with the number of bodies, exits "
+                                    "with 1 if it does (needs a display, such as Xvfb on a server)")
+parser.add_argument("--bodies", type=int, default=1000, help="N, the smaller number of bodies (default 1000)")
+parser.add_argument("--frames", type=int, default=30, help="the number of frames counted for each size (default 30)")
+parser.add_argument("--limit", type=int, default=10, help="the most tcl calls a frame can make (default 10)")
+parser.add_argument("--renderer", default="tk", help="the name of the renderer in Canvas.RENDERERS (default tk)")
+args = parser.parse_args()
+
+chdir("../src")
+path.insert(0, ".")
+from Physics.PlanetManager import PlanetManager
+from Physics.Planet import Planet
+from Physics.Moon import Moon
+from GUI.Canvas import Canvas
+from GUI.PlanetSettings import PlanetSettings
+from GUI.AISettings import AISettings
+from customtkinter import CTk
+from numpy import array
+from random import Random
+
+MOONS_PER_PLANET = 3
+SHAPES = ["Circle", "Square", "Triangle", "Rectangle"]
+
+
+class CountingTk:
+    """
+    wraps the tcl interpreter of a widget so that every call the widget makes into tcl is counted, a batch of commands
+    evaluated at once counts once since it is a single round trip
+    """
+
+    def __init__(self, interpreter):
+        """
+        creates the wrapper
+
+        :param interpreter: the tcl interpreter of the widget
+        """
+
+        self.interpreter = interpreter
+        self.calls = 0
+
+    def call(self, *args):
+        """
+        counts and forwards a tcl command
+        """
+
+        self.calls += 1
+        return self.interpreter.call(*args)
+
+    def eval(self, script: str):
+        """
+        counts and forwards a tcl script
+        """
+
+        self.calls += 1
+        return self.interpreter.eval(script)
+
+    def __getattr__(self, name: str):
+        """
+        forwards everything else to the tcl interpreter
+        """
+
+        return getattr(self.interpreter, name)
+
+
+def count_calls(root: CTk, bodies: int) -> tuple[int, int]:
+    """
+    draws frames of a solar system with every body on screen and counts the tcl calls of the canvas, time is stopped
+    after the first frame so that every counted frame draws the same items
+
+    :param root: the window to draw in
+    :param bodies: the number of planets and moons to draw
+
+    :return: the most calls made by a frame and the number of items drawn
+    """
+
+    # creates a solar system, the same seed is used for every size so only the number of bodies differs
+    random, planet_manager = Random(0), PlanetManager()
+    while len(planet_manager.planets) <= bodies:
+        planet = Planet(random.randint(1, 64), 50, f"#{random.randint(0, 0xFFFFFF):06x}", 0, offset=random.random())
+        planet._shape = random.choice(SHAPES)
+        planet_manager.add_planet(planet, False)
+        for moon in range(MOONS_PER_PLANET):
+            planet_manager.add_planet(Moon(planet, random.uniform(.1, 3), 25, "white", 0, None, random.random()), False)
+
+    # creates the canvas and zooms out so that the whole solar system is on screen
+    Canvas.RENDERER = args.renderer
+    planet_settings = PlanetSettings(root, planet_manager=planet_manager)
+    ai_settings = AISettings(root, planet_manager=planet_manager, planet_settings=planet_settings, pipe=None)
+    canvas = Canvas(root, bg="black", highlightthickness=1, planet_settings=planet_settings, AI_settings=ai_settings,
+                    planet_manager=planet_manager, file_manager=None)
+    canvas.grid(row=0, column=0, sticky="nsew")
+    root.update()
+    largest_orbit = max(planet.orbital_radius for planet in planet_manager.planets)
+    canvas.set_focus(None)
+    canvas.zoom_event(array([[min(canvas.canvas_size) / (2 * largest_orbit) / canvas.zoom[0, 0]], [1]]))
+    canvas.update_planets()
+    root.update_idletasks()
+
+    # counts the calls of each frame, only idle tasks are processed so the frames scheduled by the canvas never run
+    canvas.speed, canvas.tk = 0, CountingTk(canvas.tk)
+    most = 0
+    for frame in range(args.frames):
+        canvas.tk.calls = 0
+        canvas.update_planets()
+        most = max(most, canvas.tk.calls)
+        root.update_idletasks()
+    items = canvas.lod_counts["shapes"] + canvas.lod_counts["points"] + canvas.lod_counts["paths"]
+
+    # removes the widgets so the next size starts from an empty window
+    for widget in (canvas, planet_settings, ai_settings):
+        widget.destroy()
+    return most, items
+
+
+# counts the calls of each size and checks they stay within the limit and don't grow with the number of bodies
+window = CTk()
+window.geometry("1600x900")
+window.rowconfigure(0, weight=1)
+window.columnconfigure(0, weight=1)
+counts = {bodies: count_calls(window, bodies) for bodies in (args.bodies, 2 * args.bodies)}
+window.destroy()
+for bodies, (calls, items) in counts.items():
+    print(f"{bodies:>7} bodies: {items:>6} items drawn, at most {calls} tcl calls per frame")
+(small, small_items), (large, large_items) = counts.values()
+failures = [message for message, failed in [
+    ("nothing was drawn", not (small_items and large_items)),
+    (f"a frame made more than {args.limit} tcl calls", max(small, large) > args.limit),
+    ("the tcl calls per frame grew with the number of bodies", large > small)] if failed]
+[print(f"FAILED: {message}") for message in failures]
+exit(1 if failures else 0)
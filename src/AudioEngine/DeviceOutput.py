@@ -0,0 +1,52 @@
+class DeviceOutput:
+    """
+    plays the mixer through an audio device of the system
+        --> SDL calls the mixer from its own audio thread whenever the device needs another buffer
+        --> pygame is only imported when the output is started so the audio engine can be used without it
+    """
+
+    def __init__(self, device_name: str = None):
+        """
+        creates the output
+
+        :param device_name: the name of the device to play through, the first output device when not given
+        """
+
+        self.device_name = device_name
+        self.device = None
+        self.mixer = None
+
+    def start(self, mixer):
+        """
+        opens the device and starts pulling buffers from a mixer
+
+        :param mixer: the mixer to play
+        """
+
+        from pygame._sdl2.sdl2 import init_subsystem, INIT_AUDIO
+        from pygame._sdl2.audio import AudioDevice, AUDIO_F32, get_audio_device_names
+
+        # opens a mono float device with the sample rate and buffer size of the mixer
+        self.mixer = mixer
+        init_subsystem(INIT_AUDIO)
+        name = self.device_name if self.device_name else get_audio_device_names(False)[0]
+        self.device = AudioDevice(name, False, mixer.sample_rate, AUDIO_F32, 1, mixer.buffer_size, 0, self.callback)
+        self.device.pause(0)
+
+    def callback(self, device, view: memoryview):
+        """
+        fills the buffer of the device, called from the audio thread
+
+        :param device: the device requesting the buffer
+        :param view: the raw buffer to fill with 32 bit float frames
+        """
+
+        view[:] = self.mixer.mix(len(view) // 4).tobytes()
+
+    def stop(self):
+        """
+        closes the device
+        """
+
+        self.device.close() if self.device else None
+        self.device, self.mixer = None, None
@@ -0,0 +1,77 @@
+from threading import Lock
+
+
+class LazySound:
+    """
+    the sound of a planet loaded from a project, the audio of the sound file is kept in memory and is only decoded into
+    a playable sound once it is materialized
+        --> the sounds of a loaded project are materialized on a background thread (see SoundLoader)
+        --> a sound that is played before it has been materialized is materialized on the spot
+        --> has the same volume and play functions as a voice so it can be used as the sound of a planet
+    """
+
+    def __init__(self, load, data):
+        """
+        creates the sound, nothing is decoded until it is materialized
+
+        :param load: creates a playable sound from the contents of a sound file (see SoundCache.get_data)
+        :param data: the contents of the sound file, bytes or an AudioSection
+        """
+
+        self.load = load
+        self.data = data
+        self.volume = 1
+        self.sound = None  # the playable sound once it has been materialized
+        self.lock = Lock()  # held while materializing so the loader and the display never decode the same sound twice
+
+    # read only, determines if the sound can be played without decoding it
+    ready = property(lambda self: self.sound is not None)
+
+    def materialize(self):
+        """
+        decodes the sound the first time it is needed, called from the loader thread or when the sound is played
+
+        :return: the playable sound
+        """
+
+        with self.lock:
+            if self.sound is None:
+                sound = self.load(self.data)
+                sound.set_volume(self.volume)
+                self.sound = sound
+            return self.sound
+
+    def set_volume(self, volume: float):
+        """
+        sets the volume the sound will be played at
+
+        :param volume: the volume between 0 and 1
+        """
+
+        with self.lock:
+            self.volume = volume
+            self.sound.set_volume(volume) if self.sound else None
+
+    def get_volume(self) -> float:
+        """
+        :return: the volume the sound will be played at
+        """
+
+        return self.volume
+
+    def get_length(self) -> float:
+        """
+        :return: the length of the sound in seconds
+        """
+
+        return self.materialize().get_length()
+
+    def play(self, *args):
+        """
+        plays the sound, takes the same arguments as the play function of the materialized sound
+        """
+
+        self.materialize().play(*args)
+
+    # read only, the decoded signal of a voice that the mixer schedules
+    signal = property(lambda self: self.materialize().signal)
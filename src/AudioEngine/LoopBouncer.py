@@ -0,0 +1,120 @@
+from numpy import zeros, float32
+from threading import Thread
+from time import perf_counter
+
+
+class LoopBouncer:
+    """
+    renders one full repeat of the solar system into a single buffer in the background and has the mixer play it as a
+    seamless loop in place of individual voices (bounce in place)
+        --> the loop is rendered from the trigger table once the arrangement has stopped changing for SETTLE_TIME
+        --> an edit that changes when bodies trigger (their period, offset, parent or the bodies themselves, which is
+            also how planets change sample), a volume change or a change in speed drops back to live triggering until
+            the loop is rendered again, edits to the size or looks of bodies keep the loop
+        --> voices that ring past the end of the repeat wrap around to its start so the loop has no seam
+    """
+
+    SETTLE_TIME = 1  # seconds without changes before the loop is rendered
+    MAX_LENGTH = 120  # seconds, longer loops are played live to limit memory
+
+    def __init__(self, mixer):
+        """
+        creates the bouncer
+
+        :param mixer: the mixer that plays the rendered loop
+        """
+
+        self.mixer = mixer
+        self.enabled = True
+        self.key = None  # identifies the arrangement being played, see get_key
+        self.settle_time = 0  # when the current arrangement can be rendered
+        self.thread = None
+        self.result = None  # the last rendered loop in the form (key, signal, speed, loop length)
+
+    def get_key(self, planet_manager, speed: float) -> tuple:
+        """
+        identifies everything that a rendered loop depends on, the version of the orbit store only changes with edits
+        that change when bodies trigger (see OrbitStore.sync)
+
+        :param planet_manager: the planet manager being played
+        :param speed: the simulation speed
+
+        :return: a key that changes whenever the loop would need to be rendered again
+        """
+
+        orbits = planet_manager.orbits
+        return id(orbits), orbits.version, self.mixer.sound_version, speed
+
+    def update(self, planet_manager, speed: float):
+        """
+        starts, installs or drops the rendered loop, called every frame before triggers are played
+
+        :param planet_manager: the planet manager being played
+        :param speed: the simulation speed
+        """
+
+        # plays live when bouncing is disabled or the solar system has no short enough repeat
+        loop_length = planet_manager.loop_length
+        if (not self.enabled) or (not loop_length) or loop_length / speed > LoopBouncer.MAX_LENGTH:
+            self.key = None
+            self.mixer.clear_loop()
+            return
+
+        # drops back to live playback when the arrangement changes
+        key = self.get_key(planet_manager, speed)
+        if key != self.key:
+            self.key, self.settle_time = key, perf_counter() + LoopBouncer.SETTLE_TIME
+            self.mixer.clear_loop()
+            return
+
+        # installs a finished loop of the current arrangement
+        if self.result is not None and self.result[0] == key:
+            self.mixer.set_loop(*self.result[1:])
+            self.result = None
+
+        # renders the loop in the background once the arrangement has settled and the sounds of a loaded project have
+        # been materialized
+        elif self.mixer.loop is None and perf_counter() >= self.settle_time and not (
+                self.thread and self.thread.is_alive()) and not planet_manager.LOADER.busy:
+            events = self.get_events(planet_manager)
+            self.thread = Thread(target=self.render, args=(key, events, speed, loop_length), daemon=True)
+            self.thread.start()
+
+    @staticmethod
+    def get_events(planet_manager) -> list[tuple]:
+        """
+        copies every sound of one repeat out of the trigger table so that it can be rendered on another thread
+
+        :param planet_manager: the planet manager being played
+
+        :return: the sounds in the form (simulation time, signal, volume)
+        """
+
+        events = []
+        for time, planet in zip(planet_manager.timeline.times.tolist(), planet_manager.timeline.bodies):
+            for body in [planet] + [moon for moon in planet.get_satellites() if moon.store is planet_manager.orbits]:
+                events.append((time, body.sound.signal, body.sound.volume)) if body.sound else None
+
+        return events
+
+    def render(self, key: tuple, events: list[tuple], speed: float, loop_length: float):
+        """
+        mixes one repeat into a buffer, runs on a background thread
+
+        :param key: the key of the arrangement being rendered
+        :param events: the sounds of one repeat in the form (simulation time, signal, volume)
+        :param speed: the simulation speed to render at
+        :param loop_length: the simulation time of one repeat
+        """
+
+        # mixes each sound and wraps the part that rings past the end of the loop back to the start
+        sample_rate = self.mixer.sample_rate
+        buffer = zeros(max(round(loop_length / speed * sample_rate), 1), dtype=float32)
+        for time, signal, volume in events:
+            first = round(time / speed * sample_rate) % len(buffer)
+            while len(signal):
+                frames = min(len(signal), len(buffer) - first)
+                buffer[first:first + frames] += signal[:frames] * volume
+                signal, first = signal[frames:], 0
+
+        self.result = (key, buffer.clip(-1, 1, out=buffer), speed, loop_length)
@@ -0,0 +1,233 @@
+from AudioEngine.Voice import Voice
+from AudioEngine.NullOutput import NullOutput
+from AudioEngine.SoundCache import SoundCache
+from scipy.io.wavfile import read
+from numpy import array, zeros, float32, iinfo, interp, linspace, arange, clip
+from queue import SimpleQueue, Empty
+from heapq import heappush, heappop
+from itertools import count
+
+
+class Mixer:
+    """
+    mixes the sounds of planets on the audio thread so that triggers start on exact sample positions no matter how
+    irregular the frames of the display are
+        --> the display schedules voices with the simulation time of their trigger, the time is converted to a frame of
+            the audio clock that is LATENCY seconds in the future so the audio thread receives it ahead of time
+        --> the audio clock is anchored to the simulation clock and is only re-anchored when the two drift apart (a
+            seek, a pause or a change in speed), jitter between frames of the display never reaches the output
+        --> a pre-rendered loop can be played in place of individual voices, it is kept in phase with the simulation
+            clock through the same anchor (see LoopBouncer)
+        --> the output pulls buffers through mix, see NullOutput and DeviceOutput
+    """
+
+    SAMPLE_RATE = 44100
+    BUFFER_SIZE = 512  # frames mixed per callback of the output
+    LATENCY = .1  # seconds between a trigger in the simulation and its sound, must cover the time between frames
+    RESYNC_THRESHOLD = .05  # seconds the clocks can drift apart before the audio clock is re-anchored
+    MAX_VOICES = 256  # the oldest voices are dropped when more than this many are playing
+
+    def __init__(self, output=None, sample_rate: int = SAMPLE_RATE, buffer_size: int = BUFFER_SIZE):
+        """
+        creates the mixer and starts its output
+
+        :param output: the output that pulls buffers from the mixer, a NullOutput when not given
+        :param sample_rate: the sample rate of the output
+        :param buffer_size: the number of frames mixed at a time
+        """
+
+        # settings
+        self.sample_rate = sample_rate
+        self.buffer_size = buffer_size
+        self.latency = round(Mixer.LATENCY * sample_rate)
+        self.max_voices = Mixer.MAX_VOICES
+        self.sounds = SoundCache(self.decode)  # decoded signals shared between every voice of the same file
+        self.sound_version = 0  # incremented when the volume of a voice changes so pre-rendered loops are redone
+
+        # fields shared between threads, only written by the audio thread except for the queue and generation
+        self.events = SimpleQueue()  # scheduled voices in the form (frame, order, signal, volume, generation)
+        self.generation = 0  # incremented to stop every voice
+        self.clock = 0  # the number of frames that have been mixed
+        self.late_events = 0  # the number of voices that reached the audio thread after their start frame
+        self.loop = None  # a pre-rendered loop in the form (signal, speed, simulation time of one repeat)
+
+        # fields only used by the audio thread
+        self.pending = []  # min heap of scheduled voices that have not started
+        self.active = []  # playing voices in the form [signal, volume, first frame]
+        self.mixed_generation = 0
+
+        # fields only used by the display thread
+        self.anchor = None  # (simulation time, frame, speed) used to convert simulation time to frames
+        self.order = count()
+
+        # starts output
+        self.output = output if output else NullOutput()
+        self.output.start(self)
+
+    def load(self, path: str) -> Voice:
+        """
+        creates a voice that can be played by the mixer, the decoded signal is shared through the sound cache so each
+        file is only decoded once
+
+        :param path: the file path to the WAV file
+
+        :return: the voice of the file at the sample rate of the mixer
+        """
+
+        return Voice(self, self.sounds.get(path))
+
+    def load_data(self, data) -> Voice:
+        """
+        creates a voice from the contents of a WAV file held in memory, the decoded signal is shared through the sound
+        cache with every file and every other planet of the same contents
+
+        :param data: the contents of the WAV file, bytes or an AudioSection
+
+        :return: the voice of the file at the sample rate of the mixer
+        """
+
+        return Voice(self, self.sounds.get_data(data))
+
+    def decode(self, path) -> array:
+        """
+        decodes a WAV file into the format of the mixer
+
+        :param path: the file path to the WAV file or a file object of its contents
+
+        :return: the signal of the file as mono 32 bit floats at the sample rate of the mixer
+        """
+
+        # converts the file to mono floats
+        sample_rate, signal = read(path)
+        signal = signal.mean(axis=1) if signal.ndim > 1 else signal
+        signal = signal / (iinfo(signal.dtype).max + 1) if signal.dtype.kind == "i" else signal
+
+        # resamples the file to the sample rate of the mixer
+        frames = round(len(signal) * self.sample_rate / sample_rate)
+        signal = interp(linspace(0, len(signal) - 1, frames), arange(len(signal)), signal) if frames != len(
+            signal) else signal
+        return signal.astype(float32)
+
+    def sync(self, time_elapsed: float, speed: float = 1):
+        """
+        anchors the audio clock to the simulation clock when they have drifted apart, called every frame
+
+        :param time_elapsed: the current simulation time
+        :param speed: how many seconds of simulation time pass per second
+        """
+
+        # finds the simulation time the audio clock expects
+        now = self.clock + self.latency
+        if self.anchor is not None:
+            time, frame, anchor_speed = self.anchor
+            if anchor_speed == speed and abs(time + (now - frame) / self.sample_rate * speed - time_elapsed) <= \
+                    Mixer.RESYNC_THRESHOLD * speed:
+                return
+
+        # re-anchors the clocks
+        self.anchor = (time_elapsed, now, speed)
+
+    def schedule(self, voice: Voice, time: float = None):
+        """
+        sends a voice to the audio thread to start at a simulation time
+
+        :param voice: the voice to play
+        :param time: the simulation time to start at, as soon as possible when not given or the clocks are not synced
+        """
+
+        # converts the simulation time to a frame of the audio clock
+        if time is None or self.anchor is None:
+            frame = self.clock + self.latency
+        else:
+            anchor_time, anchor_frame, speed = self.anchor
+            frame = anchor_frame + round((time - anchor_time) / speed * self.sample_rate)
+
+        self.events.put((frame, next(self.order), voice.signal, voice.volume, self.generation))
+
+    def set_loop(self, signal: array, speed: float, loop_length: float):
+        """
+        plays a pre-rendered loop in place of individual voices, every playing and scheduled voice is stopped since the
+        loop already contains them
+
+        :param signal: one repeat of the solar system rendered at the sample rate of the mixer
+        :param speed: the simulation speed the loop was rendered at, the loop is silent at any other speed
+        :param loop_length: the simulation time of one repeat
+        """
+
+        self.generation += 1
+        self.loop = (signal, speed, loop_length)
+
+    def clear_loop(self):
+        """
+        stops playing the pre-rendered loop so that voices can be scheduled again
+        """
+
+        self.loop = None
+
+    def clear(self):
+        """
+        stops every playing and scheduled voice and unsyncs the clocks, used when the simulation time jumps
+        """
+
+        self.generation += 1
+        self.anchor = None
+
+    def mix(self, frames: int) -> array:
+        """
+        mixes the next buffer of the output, called from the audio thread
+
+        :param frames: the number of frames to mix
+
+        :return: the mixed frames as 32 bit floats between -1 and 1
+        """
+
+        # drops every voice when the mixer is cleared
+        start, end = self.clock, self.clock + frames
+        generation = self.generation
+        if generation != self.mixed_generation:
+            self.pending.clear()
+            self.active.clear()
+            self.mixed_generation = generation
+
+        # receives scheduled voices
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except Empty:
+                break
+            heappush(self.pending, event) if event[4] == generation else None
+
+        # starts the voices that begin within the buffer, late voices start at the beginning of the buffer
+        while self.pending and self.pending[0][0] < end:
+            frame, _, signal, volume, _ = heappop(self.pending)
+            self.late_events += frame < start
+            self.active.append([signal, volume, max(frame, start)])
+        del self.active[:max(len(self.active) - self.max_voices, 0)]
+
+        # mixes the part of each voice that overlaps the buffer and drops the voices that have finished
+        buffer = zeros(frames, dtype=float32)
+        for signal, volume, first in self.active:
+            overlap_start, overlap_end = max(start, first), min(end, first + len(signal))
+            if overlap_start < overlap_end:
+                buffer[overlap_start - start:overlap_end - start] += signal[
+                    overlap_start - first:overlap_end - first] * volume
+        self.active = [voice for voice in self.active if voice[2] + len(voice[0]) > end]
+
+        # adds the part of the pre-rendered loop that is in phase with the simulation clock
+        loop, anchor = self.loop, self.anchor
+        if loop is not None and anchor is not None and loop[1] == anchor[2]:
+            signal, speed, loop_length = loop
+            time, frame, _ = anchor
+            position = round((time + (start - frame) / self.sample_rate * speed) % loop_length / speed *
+                             self.sample_rate)
+            buffer += signal[(position + arange(frames)) % len(signal)]
+
+        self.clock = end
+        return clip(buffer, -1, 1, out=buffer)
+
+    def close(self):
+        """
+        stops the output
+        """
+
+        self.output.stop()
@@ -0,0 +1,56 @@
+from numpy import array, concatenate, zeros, float32
+
+
+class NullOutput:
+    """
+    an output that does not need an audio device, the mixer only advances when pull is called
+        --> everything that is mixed is recorded so that playback can be checked sample by sample
+        --> used when running headless and when testing the mixer
+    """
+
+    def __init__(self, record: bool = True):
+        """
+        creates the output
+
+        :param record: determines if the mixed buffers should be kept
+        """
+
+        self.mixer = None
+        self.record = record
+        self.recording = []
+
+    def start(self, mixer):
+        """
+        connects the output to a mixer
+
+        :param mixer: the mixer to pull buffers from
+        """
+
+        self.mixer = mixer
+
+    def stop(self):
+        """
+        disconnects the output from its mixer
+        """
+
+        self.mixer = None
+
+    def pull(self, frames: int) -> array:
+        """
+        advances the mixer by the given number of frames one buffer at a time the same way an audio device would
+
+        :param frames: the number of frames to mix, rounded up to a whole number of buffers
+
+        :return: the frames that were mixed
+        """
+
+        buffers = [self.mixer.mix(self.mixer.buffer_size) for _ in range(-(-frames // self.mixer.buffer_size))]
+        self.recording.extend(buffers) if self.record else None
+        return concatenate(buffers) if buffers else zeros(0, dtype=float32)
+
+    def get_recording(self) -> array:
+        """
+        :return: every frame that has been mixed since the output was created
+        """
+
+        return concatenate(self.recording) if self.recording else zeros(0, dtype=float32)
@@ -0,0 +1,107 @@
+from AudioEngine.PitchShifter import PitchShifter
+from Physics.TriggerScheduler import TriggerScheduler
+from numpy import array, zeros, full, float32, int16, clip, interp, arange, linspace, ndenumerate
+from wave import open as open_wave
+
+
+class OfflineRenderer:
+    """
+    renders a project to a WAV file faster than real time without a display or an audio device
+        --> the trigger timeline is computed with the same scheduler that drives live playback
+        --> each planet plays its sample cropped and pitched the same way as the sequence editor
+        --> voices are mixed at sample accurate offsets and written in chunks so memory use stays flat
+    """
+
+    SAMPLE_RATE = 44100
+    CHUNK_SIZE = 44100  # number of frames mixed and written at a time
+
+    def __init__(self, planet_manager, sample_rate: int = SAMPLE_RATE, speed: float = 1):
+        """
+        creates the renderer for the project loaded in a planet manager
+
+        :param planet_manager: the planet manager containing the planets and samples to render
+        :param sample_rate: the sample rate of the rendered file
+        :param speed: how fast the simulation runs, matches the speed of the canvas
+        """
+
+        self.planet_manager = planet_manager
+        self.sample_rate = sample_rate
+        self.speed = speed
+        self.voices = {}  # rendered voices of each sample and row
+
+        # finds the sample and row of every planet placed in a sequence editor
+        self.planet_samples = {}
+        for name, sample in planet_manager.samples.items():
+            for (row, col), planet in ndenumerate(sample.get("midi_array", full((0, 0), None))):
+                self.planet_samples.update({planet: (name, row)} if planet is not None else {})
+
+    def get_voice(self, planet) -> array:
+        """
+        gets the signal that a planet plays, each row of a sample is only pitched and resampled once
+
+        :param planet: the planet to get the voice of
+
+        :return: the signal of the planet as floats at the output sample rate, None if the planet has no sound
+        """
+
+        # handles planets without a sample
+        if self.planet_samples.get(planet) is None:
+            return
+        name, row = self.planet_samples[planet]
+        sample = self.planet_manager.samples[name]
+        if sample.get("shifted_signal_array") is None:
+            return
+
+        # pitches the sample the same way as the sequence editor and resamples it to the output sample rate
+        if (name, row) not in self.voices:
+            voice = PitchShifter.shift(sample, row).astype(float32)
+            frames = round(len(voice) * self.sample_rate / sample["sample_rate"])
+            voice = interp(linspace(0, len(voice) - 1, frames), arange(len(voice)), voice) if frames != len(
+                voice) else voice
+            self.voices[(name, row)] = (voice * sample["volume"]).astype(float32)
+        return self.voices[(name, row)]
+
+    def render(self, path: str, duration: float, progress=None):
+        """
+        renders the project to a 16 bit mono WAV file
+
+        :param path: the file path to write the WAV file to
+        :param duration: how many seconds of audio to render
+        :param progress: an optional function called with the fraction of the file that has been rendered
+        """
+
+        # schedules every planet from the start of the project, a render never skips triggers
+        triggers = TriggerScheduler()
+        triggers.catch_up_policy = "all"
+        triggers.reset(self.planet_manager.planets, 0)
+        bodies = set(self.planet_manager.planets)
+        total = round(duration * self.sample_rate)
+        active = []  # voices that are still playing in the form [voice, first frame]
+
+        # mixes and writes the file one chunk at a time
+        with open_wave(path, "wb") as file:
+            file.setnchannels(1)
+            file.setsampwidth(2)
+            file.setframerate(self.sample_rate)
+            for start in range(0, total, OfflineRenderer.CHUNK_SIZE):
+                end = min(start + OfflineRenderer.CHUNK_SIZE, total)
+                buffer = zeros(end - start, dtype=float32)
+
+                # starts the voice of every planet and moon that triggers before the end of the chunk
+                for time, planet in triggers.pop_due(end / self.sample_rate * self.speed):
+                    for body in [planet] + planet.get_satellites():
+                        voice = self.get_voice(body) if body in bodies else None
+                        active.append([voice, round(time / self.speed * self.sample_rate)]) if voice is not None \
+                            else None
+
+                # mixes the part of each voice that overlaps the chunk and drops the voices that have finished
+                for voice, first in active:
+                    overlap_start, overlap_end = max(start, first), min(end, first + len(voice))
+                    if overlap_start < overlap_end:
+                        buffer[overlap_start - start:overlap_end - start] += voice[
+                            overlap_start - first:overlap_end - first]
+                active = [[voice, first] for voice, first in active if first + len(voice) > end]
+
+                # writes the chunk
+                file.writeframes(clip(buffer, -32768, 32767).astype(int16).tobytes())
+                progress(end / total) if progress else None
@@ -0,0 +1,23 @@
+from librosa.effects import pitch_shift
+from numpy import int16, array
+
+
+class PitchShifter:
+    """
+    creates the pitched versions of a sample that are played by its planets
+    """
+
+    @staticmethod
+    def shift(sample: dict, steps: int) -> array:
+        """
+        pitch shifts and crops the signal of a sample the same way for every planet in a row of the sequence editor
+
+        :param sample: the sample containing the shifted signal, sample rate and crops
+        :param steps: how many semitones to shift the sample by, the row of the planet in the sequence editor
+
+        :return: the cropped and shifted signal as 16 bit integers
+        """
+
+        left, right = sample["crops"]
+        signal = pitch_shift(y=sample["shifted_signal_array"].astype(float), sr=sample["sample_rate"], n_steps=steps)
+        return signal[left:right].astype(int16)
@@ -0,0 +1,154 @@
+from collections import OrderedDict
+from weakref import WeakValueDictionary
+from hashlib import blake2b
+from threading import RLock, Event
+from io import BytesIO
+from os import stat
+
+
+class SoundCache:
+    """
+    decodes each sound file once and shares the result between every planet that plays it
+        --> files are looked up by path, modification time and size so unchanged files are never read again
+        --> decoded sounds are stored by a hash of the file contents so identical files share one decoded sound
+        --> sounds held in memory rather than in a file are looked up by the same hash (see get_data)
+        --> the least recently used sounds are evicted once the sounds held by the cache use more than max_bytes, a
+            sound that is still used elsewhere (such as by the voice of a planet) stays alive and is found again through
+            a weak reference so it is never decoded twice, max_bytes only limits the sounds nothing else uses
+        --> decoded sounds must support weak references, such as arrays and memory views
+        --> sounds can be decoded from several threads, lookups are made under a lock and decodes outside of it
+    """
+
+    MAX_BYTES = 256 * 1024 ** 2
+
+    def __init__(self, decode, max_bytes: int = MAX_BYTES):
+        """
+        creates an empty cache
+
+        :param decode: the function that decodes a file path or file object into a sound, only called on a miss
+        :param max_bytes: the memory the sounds held by the cache can use before they are evicted
+        """
+
+        self.decode = decode
+        self.max_bytes = max_bytes
+        self.files = {}  # path -> (modification time, size, content hash)
+        self.sounds = OrderedDict()  # content hash -> (decoded sound, bytes), ordered from least to most recently used
+        self.decoding = {}  # content hash -> event set once the thread decoding the contents has finished
+        self.alive = WeakValueDictionary()  # content hash -> every decoded sound still in use, including evicted ones
+        self.bytes = 0  # the bytes of the sounds held by the cache
+        self.hits = 0
+        self.misses = 0
+        self.lock = RLock()
+
+    def __len__(self) -> int:
+        """
+        :return: the number of decoded sounds in the cache
+        """
+
+        return len(self.sounds)
+
+    def get(self, path: str):
+        """
+        gets the decoded sound of a file, decoding it only if its contents have not been seen before
+
+        :param path: the file path of the sound
+
+        :return: the decoded sound, shared with every other caller of the same contents
+        """
+
+        # finds the contents of the file without reading it when it hasn't changed, files are read outside the lock
+        info = stat(path)
+        version = (info.st_mtime_ns, info.st_size)
+        with self.lock:
+            known = self.files.get(path, (None, None, None))
+        if known[:2] != version:
+            with open(path, "rb") as file:
+                known = (*version, blake2b(file.read(), digest_size=16).digest())
+            with self.lock:
+                self.files[path] = known
+        return self.find(known[2], lambda: self.decode(path), lambda: info.st_size)
+
+    def get_data(self, data):
+        """
+        gets the decoded sound of the contents of a file held in memory, such as the audio of a planet loaded from a
+        project
+
+        :param data: the contents of the file, bytes or an AudioSection which is found by its hash without being read
+
+        :return: the decoded sound, shared with every other caller of the same contents
+        """
+
+        digest = bytes.fromhex(data.digest) if getattr(data, "digest", None) else blake2b(
+            bytes(data), digest_size=16).digest()
+        return self.find(digest, lambda: self.decode(BytesIO(bytes(data))), lambda: len(data))
+
+    def find(self, digest: bytes, decode, size):
+        """
+        gets a decoded sound by the hash of its contents, decoding it only if it is not cached
+            --> sounds are decoded outside the lock so that looking up other sounds never waits for a decode
+            --> a thread that needs contents that are being decoded by another thread waits for that decode rather than
+                decoding them again
+
+        :param digest: the hash of the contents of the sound
+        :param decode: decodes the sound, only called on a miss
+        :param size: gets the size of the contents, used as the size of sounds that don't have nbytes
+
+        :return: the decoded sound
+        """
+
+        # returns the sound when it is cached or was evicted while still in use, otherwise claims the decode
+        while True:
+            with self.lock:
+                sound = self.sounds[digest][0] if digest in self.sounds else self.alive.get(digest)
+                if sound is not None:
+                    self.hits += 1
+                    return self.hold(digest, sound, size)
+                decoding = self.decoding.get(digest)
+                if decoding is None:
+                    self.misses += 1
+                    decoding = self.decoding[digest] = Event()
+                    break
+            decoding.wait()
+
+        # decodes the sound, threads waiting for it look it up again once it is held or the decode failed
+        try:
+            sound = decode()
+            with self.lock:
+                self.alive[digest] = sound
+                return self.hold(digest, sound, size)
+        finally:
+            with self.lock:
+                self.decoding.pop(digest).set()
+
+    def hold(self, digest: bytes, sound, size):
+        """
+        keeps a sound in the cache as the most recently used and evicts the least recently used sounds that no longer
+        fit, called under the lock
+
+        :param digest: the hash of the contents of the sound
+        :param sound: the decoded sound
+        :param size: gets the size of the contents, used as the size of sounds that don't have nbytes
+
+        :return: the sound
+        """
+
+        if digest in self.sounds:
+            self.sounds.move_to_end(digest)
+            return sound
+        size = sound.nbytes if hasattr(sound, "nbytes") else size()
+        self.sounds[digest] = (sound, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self.sounds) > 1:
+            self.bytes -= self.sounds.popitem(last=False)[1][1]
+        return sound
+
+    def clear(self):
+        """
+        removes every sound from the cache
+        """
+
+        with self.lock:
+            self.files.clear()
+            self.sounds.clear()
+            self.alive.clear()
+            self.bytes = 0
@@ -0,0 +1,54 @@
+from threading import Thread, Lock
+from collections import deque
+
+
+class SoundLoader:
+    """
+    materializes lazy sounds on a background thread so that a project is shown before its audio has been decoded
+        --> sounds are materialized in the order they are given, the planet manager gives the bodies that trigger
+            soonest first (see PlanetManager.load_sounds)
+        --> giving new sounds replaces the sounds that are still waiting since they belong to the replaced project
+        --> sounds that fail to materialize are skipped, the error is raised again if the sound is played
+    """
+
+    def __init__(self):
+        """
+        creates the loader, the thread is only started when there are sounds to materialize
+        """
+
+        self.sounds = deque()
+        self.thread = None
+        self.lock = Lock()  # held while the waiting sounds are replaced or the thread decides to stop
+
+    # read only, determines if sounds are still being materialized
+    busy = property(lambda self: self.thread is not None)
+
+    def load(self, sounds: list):
+        """
+        materializes sounds in the background, replacing the sounds that are still waiting
+
+        :param sounds: the lazy sounds to materialize in the order they are needed
+        """
+
+        with self.lock:
+            self.sounds = deque(sounds)
+            if self.thread is None and self.sounds:
+                self.thread = Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+    def run(self):
+        """
+        materializes the waiting sounds one at a time until none are left, runs on a background thread
+        """
+
+        while True:
+            with self.lock:
+                if not self.sounds:
+                    self.thread = None
+                    return
+                sound = self.sounds.popleft()
+
+            try:
+                sound.materialize()
+            except Exception:
+                pass
@@ -0,0 +1,54 @@
+from numpy import array
+
+
+class Voice:
+    """
+    a decoded sound that is played through the mixer
+        --> has the same volume and play functions as a pygame sound so it can be used as the sound of a planet
+        --> the signal is shared between every voice created from the same file and is never modified
+    """
+
+    def __init__(self, mixer, signal: array):
+        """
+        creates the voice
+
+        :param mixer: the mixer that plays the voice
+        :param signal: the decoded signal as floats between -1 and 1 at the sample rate of the mixer
+        """
+
+        self.mixer = mixer
+        self.signal = signal
+        self.volume = 1
+
+    def set_volume(self, volume: float):
+        """
+        sets the volume the voice will be played at, voices that are already playing are not affected
+
+        :param volume: the volume between 0 and 1
+        """
+
+        self.mixer.sound_version += volume != self.volume
+        self.volume = volume
+
+    def get_volume(self) -> float:
+        """
+        :return: the volume the voice will be played at
+        """
+
+        return self.volume
+
+    def get_length(self) -> float:
+        """
+        :return: the length of the voice in seconds
+        """
+
+        return len(self.signal) / self.mixer.sample_rate
+
+    def play(self, time: float = None):
+        """
+        plays the voice
+
+        :param time: the simulation time the voice should start at, plays as soon as possible when not given
+        """
+
+        self.mixer.schedule(self, time)
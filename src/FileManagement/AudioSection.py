@@ -0,0 +1,127 @@
+from numpy import frombuffer, asarray
+from zlib import decompress
+from copy import deepcopy
+from threading import RLock
+from weakref import WeakSet
+
+
+class AudioSection:
+    """
+    a large binary value (the audio of a sample or a planet) kept in its own compressed section of a project file, the value is only read and decompressed the first time it is used
+        --> arrays can be used like the numpy array they hold, indexing, attributes and numpy functions load the array
+        --> bytes are loaded with bytes(section)
+        --> saving a project copies sections that were never used straight from their file without decompressing them
+        --> sections are read and moved to a new file under LOCK since projects are saved on another thread
+    """
+
+    LOCK = RLock()  # held while reading a section and while a project file is replaced
+    SECTIONS = WeakSet()  # every section that is in use, sections of a file are loaded before the file is replaced
+
+    def __init__(self, path: str, offset: int, length: int, kind: str, dtype: str = None, shape: tuple = None,
+                 digest: str = None):
+        """
+        creates the section, nothing is read until the value is used
+
+        :param path: the project file the section is stored in
+        :param offset: the position of the compressed section in the file in bytes
+        :param length: the length of the compressed section in bytes
+        :param kind: "bytes" or "array"
+        :param dtype: the numpy type of an array
+        :param shape: the shape of an array
+        :param digest: the hash of the contents the section is stored under, version 2 files don't store it
+        """
+
+        self.path, self.offset, self.length = path, offset, length
+        self.kind, self.dtype, self.shape = kind, dtype, shape
+        self.digest = digest
+        self.value = None  # the value once it has been loaded
+        AudioSection.SECTIONS.add(self)
+
+    def compressed(self) -> bytes:
+        """
+        reads the section from its file without decompressing it
+
+        :return: the compressed section
+        """
+
+        with AudioSection.LOCK, open(self.path, "rb") as file:
+            file.seek(self.offset)
+            return file.read(self.length)
+
+    def load(self):
+        """
+        reads and decompresses the value the first time it is needed
+
+        :return: the bytes or array stored in the section
+        """
+
+        self.value = AudioSection.decode(self.compressed(), self.kind, self.dtype, self.shape) if self.value is None \
+            else self.value
+        return self.value
+
+    @staticmethod
+    def decode(data: bytes, kind: str, dtype: str = None, shape: tuple = None):
+        """
+        decompresses a section
+
+        :param data: the compressed section
+        :param kind: "bytes" or "array"
+        :param dtype: the numpy type of an array
+        :param shape: the shape of an array
+
+        :return: the bytes or array stored in the section
+        """
+
+        data = decompress(data)
+        return data if kind == "bytes" else frombuffer(bytearray(data), dtype).reshape(shape)
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        lets numpy functions use the array of the section
+
+        :return: the loaded array
+        """
+
+        return asarray(self.load(), dtype)
+
+    def __bytes__(self):
+        """
+        :return: the loaded bytes
+        """
+
+        return bytes(self.load())
+
+    def __getitem__(self, item):
+        """
+        :return: an item or slice of the loaded value
+        """
+
+        return self.load()[item]
+
+    def __len__(self):
+        """
+        :return: the length of the loaded value
+        """
+
+        return len(self.load())
+
+    def __deepcopy__(self, memo):
+        """
+        copies the loaded value rather than the section, copies are edited independently of the file
+
+        :param memo: the dict of already copied objects
+
+        :return: the copied value
+        """
+
+        return deepcopy(self.load(), memo)
+
+    def __getattr__(self, name: str):
+        """
+        forwards the attributes of the array (dtype, astype, ...) to the loaded value, private names are not forwarded
+        so that the section can be inspected before it is initialized
+        """
+
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
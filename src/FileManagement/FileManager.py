@@ -1,17 +1,29 @@
 from Physics.PlanetManager import PlanetManager
+from FileManagement.ProjectFile import ProjectFile
+from FileManagement.Journal import Journal
+from Physics.Planet import Planet
 from GUI.Canvas import Canvas
 from tkinter.filedialog import asksaveasfilename, askopenfilename
+from threading import Thread
 from pathlib import Path
-from pickle import dumps, loads
-from zlib import compress, decompress
 from re import findall
 
 
 class FileManager:
     """
-    handles saving and loading of files
+    handles saving and loading of files from the GUI, reading and writing the files themselves is done by ProjectFile
+        --> saves take a snapshot of the project and write it on a background thread so playback doesn't stop, the
+            progress is shown on the canvas and the project is only marked as saved once the file has been written
+        --> saving while a save is running saves again from a new snapshot once the running save finishes
+        --> the edits of a saved project are journaled (see Journal) and the journal is replayed when the project is
+            loaded after a crash, the journal is compacted in place on a schedule so the project file is only written
+            when the user saves
     """
 
+    POLL_TIME = 50  # ms between checks of a background save
+    COMPACT_TIME = 5000  # ms between checks of whether the journal should be compacted
+    COMPACT_SIZE = 8 * 2 ** 20  # bytes of journal that start a compaction, it is compacted again once it has doubled
+
     # options for save as file explorer
     SAVE_OPTIONS = {
         "initialdir": Path("saves"),
@@ -42,15 +54,20 @@ class FileManager:
         """
 
         self.save_path = None
+        self.thread = None  # the thread of the running save
+        self.progress = 0  # the fraction of the running save that has been written
+        self.result = None  # True once the running save has finished, the error if it failed
+        self.queued = None  # the path to save to again once the running save has finished
+        self.journal = None  # the journal of the loaded project, projects that haven't been saved have none
 
     def save(self, canvas: Canvas, path: str = None):
         """
-        compresses and saves the program state to a file
+        takes a snapshot of the program state and compresses and saves it to a file on a background thread
 
         :param canvas: the canvas class that has access to all the data that needs to be saved
         :param path: the file path to save the file to, if given functions like save as, otherwise functions like save
 
-        :return True if save was successful
+        :return True if the save was started
         """
 
         # ask user for save path if no save path is found
@@ -69,15 +86,73 @@ class FileManager:
         if (not path) and (not self.save_path):
             return
 
-        # saves data and updates save path
+        # waits for the running save to finish before saving again
         self.save_path = path if path else self.save_path
-        data = {"planets": canvas.planet_manager.planets, "samples": canvas.planet_manager.samples}
-        data = compress(dumps(data))
-        with open(self.save_path, "wb") as file:
-            file.write(data)
-        canvas.planet_manager.state_manager.unsaved = False
+        if self.thread and self.thread.is_alive():
+            self.queued = self.save_path
+            return True
+
+        # saves a snapshot of the data on a background thread, edits journaled after the snapshot are kept
+        state_manager, path = canvas.planet_manager.state_manager, self.save_path
+        position = self.journal.checkpoint() if self.journal else None
+        snapshot, edits = ProjectFile.snapshot(canvas.planet_manager.planets, canvas.planet_manager.samples), \
+            state_manager.edits
+        self.progress, self.result = 0, None
+        self.thread = Thread(target=self.write, args=(path, snapshot))
+        self.thread.start()
+        canvas.after(FileManager.POLL_TIME, lambda: self.poll(canvas, state_manager, edits, path, position))
         return True
 
+    def write(self, path: str, snapshot: dict):
+        """
+        writes a snapshot to a file, runs on a background thread
+
+        :param path: the file path to save the file to
+        :param snapshot: the snapshot of the program state taken with ProjectFile.snapshot
+        """
+
+        try:
+            ProjectFile.store(path, snapshot, lambda progress: setattr(self, "progress", progress))
+            self.result = True
+        except Exception as error:  # reports the error on the GUI thread
+            self.result = error
+
+    def poll(self, canvas: Canvas, state_manager, edits: int, path: str, position: int):
+        """
+        shows the progress of a background save and handles it once it finishes
+            --> the project is marked as saved unless it was edited after the snapshot was taken
+            --> the journal only keeps the edits made after the snapshot, projects saved for the first time start one
+            --> errors are shown to the user and the project stays unsaved
+            --> a save that was requested while saving is started
+
+        :param canvas: the canvas the save was started from
+        :param state_manager: the state manager of the saved project
+        :param edits: the number of edits the state manager had when the snapshot was taken
+        :param path: the file path the project was saved to
+        :param position: the position in the journal when the snapshot was taken
+        """
+
+        # checks again later while the save is running
+        if self.thread.is_alive():
+            canvas.show_status(f"Saving {self.progress:.0%}")
+            canvas.after(FileManager.POLL_TIME, lambda: self.poll(canvas, state_manager, edits, path, position))
+            return
+
+        # marks the project as saved or reports the error, the journal is left alone if another project was loaded
+        if self.result is True:
+            state_manager.unsaved = state_manager.unsaved and state_manager.edits != edits
+            canvas.show_status("Saved")
+            if state_manager is canvas.planet_manager.state_manager:
+                self.journal.saved(position, path) if self.journal else self.open_journal(canvas.planet_manager)
+        else:
+            canvas.show_status("Save failed")
+            canvas.show_error("Save Failed", f"The project could not be saved:\n{self.result}")
+
+        # starts the queued save
+        if self.queued:
+            path, self.queued = self.queued, None
+            self.save(canvas, path)
+
     def load(self, canvas: Canvas = None, path: str = None, new: bool = False) -> object:
         """
         decompresses and loads a file
@@ -97,24 +172,72 @@ class FileManager:
         if canvas and (not path) and (not new):
             return
 
+        # closes the previous project, the user has already chosen to save or lose its edits, its audio is released
+        # unless the file can't be read
+        self.close()
+        audio, Planet.AUDIO = Planet.AUDIO, {}
+
         # handles creating new file
+        recovered = 0
         if new:
             self.save_path = None
             data = canvas.planet_manager.__init__() if canvas else PlanetManager()
 
-        # reads the file
+        # reads the file and replays the edits journaled before a crash
         else:
-            with open(path, "rb") as file:
-                data = loads(decompress(file.read()))
-                data = canvas.planet_manager.__init__(**data) if canvas else PlanetManager(**data)
+            try:
+                data = ProjectFile.read(path)
+                recovered = Journal.replay(path, data)
+            except Exception:
+                Planet.AUDIO = audio
+                raise
+            data = canvas.planet_manager.__init__(**data) if canvas else PlanetManager(**data)
             self.save_path = path
 
+        # journals the edits of the project, recovered edits are unsaved
+        planet_manager = canvas.planet_manager if canvas else data
+        self.open_journal(planet_manager)
+        planet_manager.state_manager.unsaved = bool(recovered)
+
         # loads the data into the program
         if canvas:
             canvas.speed = 1
-            canvas.delete("planets")
-            canvas.delete("paths")
-            canvas.delete("triggers")
+            canvas.renderer.clear()
             canvas.set_focus(canvas.planet_manager.get_sun(), True, False)
             canvas.planet_manager.set_sample("Default (No Audio)")
+            canvas.show_status(f"Recovered {recovered} unsaved edits") if recovered else None
         return data
+
+    def open_journal(self, planet_manager: PlanetManager):
+        """
+        starts journaling the edits of the loaded project, projects that haven't been saved have no journal
+
+        :param planet_manager: the planet manager of the project
+        """
+
+        self.journal = Journal(self.save_path, planet_manager) if self.save_path else None
+        planet_manager.state_manager.journal = self.journal
+
+    def close(self):
+        """
+        deletes the journal of the loaded project, called when the project is closed once the user has chosen to save or
+        lose its edits
+        """
+
+        self.journal.discard() if self.journal else None
+        self.journal = None
+
+    def compact_journal(self, canvas: Canvas):
+        """
+        compacts the journal of the loaded project on a schedule, the journal is compacted in the background once it is
+        larger than COMPACT_SIZE and twice the size it was last compacted to
+            --> the project file and whether the project is unsaved are left alone until the user saves
+
+        :param canvas: the canvas the schedule runs on
+        """
+
+        journal, saving = self.journal, self.thread and self.thread.is_alive()
+        journal.finish() if journal else None
+        if journal and (not saving) and journal.size >= max(FileManager.COMPACT_SIZE, 2 * journal.compacted):
+            journal.compact()
+        canvas.after(FileManager.COMPACT_TIME, lambda: self.compact_journal(canvas))
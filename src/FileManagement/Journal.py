@@ -0,0 +1,403 @@
+from FileManagement.ProjectFile import ProjectFile
+from FileManagement.AudioSection import AudioSection
+from Physics.Planet import Planet
+from pickle import Pickler, Unpickler, dumps, loads
+from zlib import compress, decompress
+from struct import Struct
+from io import BytesIO
+from os import stat, remove, replace
+from os.path import isfile, abspath
+from threading import Thread
+
+
+class Journal:
+    """
+    an append-only record of the edits made to a project since it was last saved so that they can be recovered after a
+    crash, the journal is kept next to the project as <project>.journal
+        --> each state added to the state manager (and each undo and redo) lists the planets and samples it touches
+            (see StateManger.add_state), a state that doesn't list them touches the whole project
+        --> a touched sample includes every planet in its midi array since editing a sample moves the planets around
+            the one that was edited
+        --> the touched planets and samples are appended as one record once the edit has been applied, which is when
+            the next edit is added or the physics are next updated, so a record costs as much as the edit rather than
+            the project
+        --> each planet and sample is pickled on its own so that later records replace it, planets refer to each other
+            by their tag and audio is stored once under its hash like in project files, audio that is already in the
+            project file is read from it rather than written again
+        --> the journal starts with the size and modification time of the project it applies to so that a journal
+            left next to a different version of the project is never replayed
+        --> saving the project keeps only the records written after the snapshot of the save was taken
+        --> a journal that grows large is compacted in place, its records are merged into one on a background thread
+            so that the project file is only ever written when the user saves
+    """
+
+    MAGIC = b"ORBJNL"
+    VERSION = 2
+    HEADER = Struct("<6sHQq")  # magic, version, size and modification time in ns of the project file
+    RECORD = Struct("<I")  # length of a record
+
+    def __init__(self, project: str, planet_manager):
+        """
+        creates the journal of a project, nothing is written until the first edit
+
+        :param project: the file path of the project
+        :param planet_manager: the planet manager of the project
+        """
+
+        self.project, self.path = project, project + ".journal"
+        self.planet_manager = planet_manager
+        self.planets = {}  # the touched planets in the form id: planet
+        self.samples = set()  # the names of the touched samples
+        self.complete = False  # True when an edit touched the whole project
+        self.digests = set()  # the hashes of the audio written since the last save
+        self.sections = ProjectFile.table(project)  # the audio in the project file that doesn't need to be written
+        self.file = None  # the journal file once it has been opened
+        self.size = 0  # the bytes of records written since the last save
+        self.compacted = 0  # the bytes of the record the journal was last compacted into
+        self.thread = None  # the thread of the running compaction
+        self.merged = None  # the result of the running compaction in the form (position, record)
+
+    # read only, determines if an edit is waiting to be recorded
+    pending = property(lambda self: bool(self.planets or self.samples or self.complete))
+
+    def add(self, functions: dict):
+        """
+        marks the planets and samples touched by a state, they are recorded once the state has been applied, the
+        planets of a touched sample are marked as well so that they are recorded as removed if the sample is deleted
+
+        :param functions: the state in the form {"undo": [...], "redo": [...], "planets": [...], "samples": [...]}
+        """
+
+        # the previous state has been applied by the time the next one is added
+        self.record()
+        planets, samples = functions.get("planets"), functions.get("samples")
+        self.complete = self.complete or (planets is None and samples is None)
+        self.planets.update({id(planet): planet for planet in planets or ()})
+        self.samples.update(samples or ())
+        for sample in (self.planet_manager.samples.get(name, {}) for name in samples or ()):
+            self.planets.update({id(p): p for p in sample["midi_array"].flat if p is not None}) if "midi_array" in \
+                sample else None
+
+    def record(self):
+        """
+        appends the touched planets and samples to the journal as one record
+            --> planets that are no longer in the solar system and samples that no longer exist are recorded as removed
+            --> the parent of each planet is recorded so the moons it keeps are up to date
+            --> an edit that touched the whole project records every planet and sample, replaying it removes the
+                planets and samples that aren't in it
+        """
+
+        if not self.pending:
+            return
+
+        # finds the planets of the touched samples and the parents of every planet
+        manager, complete = self.planet_manager, self.complete
+        names = set(manager.samples) if complete else self.samples
+        samples = {name: manager.samples[name] for name in names if name in manager.samples}
+        deleted = [name for name in names if name not in manager.samples]
+        planets = list(manager.planets) if complete else list(self.planets.values())
+        for sample in samples.values():
+            planets.extend(p for p in sample["midi_array"].flat if p is not None) if "midi_array" in sample else None
+        planets.extend([planet.parent for planet in planets if planet.parent is not None])
+        planets = list({id(planet): planet for planet in planets}.values())
+        removed = [planet.tag for planet in planets if planet.store is not manager.orbits]
+        planets = sorted([planet for planet in planets if planet.store is manager.orbits], key=lambda p: p.depth)
+        self.planets, self.samples, self.complete = {}, set(), False
+
+        # pickles each planet and sample on its own
+        sections = {}
+        delta = {"planets": {planet.tag: (type(planet), self.pickle(planet.__getstate__(), sections)) for planet in
+                             planets},
+                 "samples": {name: self.pickle(sample, sections) for name, sample in samples.items()},
+                 "removed": removed, "deleted": deleted, "complete": complete}
+
+        # appends the record with the audio that isn't already in the journal
+        audio = {digest: value.compressed() if isinstance(value, AudioSection) else compress(value)
+                 for digest, value in sections.items() if digest not in self.digests and digest not in self.sections}
+        self.digests.update(audio)
+        record = dumps((audio, compress(dumps(delta))))
+        self.open_file() if not self.file else None
+        self.file.write(Journal.RECORD.pack(len(record)) + record)
+        self.file.flush()
+        self.size += Journal.RECORD.size + len(record)
+
+    def pickle(self, value, sections: dict) -> bytes:
+        """
+        pickles a planet state or a sample for a record, planets of the solar system are referred to by their tag and
+        audio by its hash, planets that are only referred to (such as the parent a converted moon used to have) are
+        pickled whole
+
+        :param value: the value to pickle
+        :param sections: the audio found so far in the form {hash: bytes or section}
+
+        :return: the pickled value
+        """
+
+        data, orbits = BytesIO(), self.planet_manager.orbits
+        pickler = Pickler(data)
+        pickler.persistent_id = lambda item: ("planet", item.tag, type(item)) if isinstance(
+            item, Planet) and item.store is orbits else ProjectFile.reference(item, sections)
+        pickler.dump(value)
+        return data.getvalue()
+
+    def open_file(self):
+        """
+        opens the journal to append records, a journal that was left for the current version of the project is
+        continued after its last complete record, otherwise a new journal is started
+        """
+
+        # continues the journal, an incomplete record left by a crash is cut off
+        end = Journal.HEADER.size
+        for end, audio, delta in Journal.records(self.path, self.project):
+            self.digests.update(audio)
+        if end > Journal.HEADER.size:
+            self.file = open(self.path, "r+b")
+            self.file.truncate(end)
+            self.file.seek(end)
+
+        # starts a new journal
+        else:
+            self.file = open(self.path, "w+b")
+            self.file.write(Journal.HEADER.pack(Journal.MAGIC, Journal.VERSION, *Journal.stamp(self.project)))
+
+    def checkpoint(self) -> int:
+        """
+        marks where the snapshot of a save was taken, records written after it are kept once the save has finished and
+        include all of their audio since the journal before them will be discarded
+
+        :return: the position in the journal
+        """
+
+        self.record()
+        self.stop()
+        self.digests.clear()
+        self.sections = {}
+        return self.file.tell() if self.file else Journal.HEADER.size
+
+    def saved(self, position: int, project: str):
+        """
+        starts the journal again once a save has finished, the records written after the snapshot of the save are
+        kept since they are edits on top of the saved project
+
+        :param position: the position in the journal where the snapshot was taken (see checkpoint)
+        :param project: the file path the project was saved to, the journal follows the project when saved elsewhere
+        """
+
+        # reads the records written after the snapshot
+        tail = b""
+        if self.file:
+            self.file.seek(position)
+            tail = self.file.read()
+            self.file.close()
+            self.file = None
+
+        # replaces the journal with one for the saved project
+        remove(self.path) if isfile(self.path) else None
+        self.project, self.path = project, project + ".journal"
+        self.sections = ProjectFile.table(project)
+        if tail:
+            with open(self.path + ".tmp", "wb") as file:
+                file.write(Journal.HEADER.pack(Journal.MAGIC, Journal.VERSION, *Journal.stamp(self.project)) + tail)
+            replace(self.path + ".tmp", self.path)
+        self.size, self.compacted = len(tail), 0
+
+    def compact(self):
+        """
+        merges the records of the journal into one on a background thread, the journal is replaced with the merged
+        record once it is ready (see finish), records written in the meantime are kept after it
+        """
+
+        if self.thread or not (self.pending or self.file):
+            return
+        self.record()
+        self.thread = Thread(target=self.merge, args=(self.file.tell(),), daemon=True)
+        self.thread.start()
+
+    def merge(self, position: int):
+        """
+        merges the records up to a position in the journal into one, runs on a background thread
+            --> later records replace the planets and samples of earlier ones and a record of the whole project replaces
+                everything before it
+            --> the audio of every record is kept since the merged planets and samples may refer to any of it
+
+        :param position: the position in the journal after the last record to merge
+        """
+
+        audio, merged = {}, {"planets": {}, "samples": {}, "removed": set(), "deleted": set(), "complete": False}
+        try:
+            for end, written, delta in Journal.records(self.path, self.project):
+                if end > position:
+                    break
+                audio.update(written)
+                delta = loads(decompress(delta))
+                merged = {"planets": {}, "samples": {}, "removed": set(), "deleted": set(), "complete": True} if \
+                    delta["complete"] else merged
+
+                # the planets and samples of the record replace what the earlier records left of them
+                merged["planets"].update(delta["planets"])
+                merged["removed"].difference_update(delta["planets"])
+                [merged["planets"].pop(tag, None) for tag in delta["removed"]]
+                merged["removed"].update(delta["removed"])
+                merged["samples"].update(delta["samples"])
+                merged["deleted"].difference_update(delta["samples"])
+                [merged["samples"].pop(name, None) for name in delta["deleted"]]
+                merged["deleted"].update(delta["deleted"])
+
+            merged["removed"], merged["deleted"] = list(merged["removed"]), list(merged["deleted"])
+            self.merged = position, dumps((audio, compress(dumps(merged))))
+        except Exception:  # the journal is left as it is
+            self.merged = None
+
+    def finish(self):
+        """
+        replaces the journal with the record of a finished compaction followed by the records written since it was
+        started, called on the GUI thread
+        """
+
+        if not self.thread or self.thread.is_alive():
+            return
+        merged, self.thread, self.merged = self.merged, None, None
+        if not merged or not self.file:
+            return
+
+        # reads the records written while merging
+        position, record = merged
+        self.file.seek(position)
+        tail = self.file.read()
+        self.file.close()
+
+        # writes the compacted journal next to the journal before replacing it so a crash never loses the edits
+        with open(self.path + ".tmp", "wb") as file:
+            file.write(Journal.HEADER.pack(Journal.MAGIC, Journal.VERSION, *Journal.stamp(self.project)) +
+                       Journal.RECORD.pack(len(record)) + record + tail)
+        replace(self.path + ".tmp", self.path)
+        self.file = open(self.path, "r+b")
+        self.file.seek(0, 2)
+        self.compacted = Journal.RECORD.size + len(record)
+        self.size = self.compacted + len(tail)
+
+    def stop(self):
+        """
+        waits for the running compaction and drops its result, called whenever the journal is started again
+        """
+
+        self.thread.join() if self.thread else None
+        self.thread, self.merged = None, None
+
+    def discard(self):
+        """
+        closes and deletes the journal, used when the user has chosen to lose the edits since the last save
+        """
+
+        self.stop()
+        self.file.close() if self.file else None
+        self.file = None
+        remove(self.path) if isfile(self.path) else None
+
+    @staticmethod
+    def stamp(project: str) -> tuple:
+        """
+        :param project: the file path of the project
+
+        :return: the size and modification time in ns of the project file
+        """
+
+        info = stat(project)
+        return info.st_size, info.st_mtime_ns
+
+    @staticmethod
+    def records(path: str, project: str):
+        """
+        reads the records of a journal, stops at the first incomplete record which is left by a crash while writing
+
+        :param path: the file path of the journal
+        :param project: the file path of the project, nothing is read when the journal was written for a different
+            version of it
+
+        :return: a generator of each record in the form (position after the record, {hash: compressed audio}, delta)
+        """
+
+        if not (isfile(path) and isfile(project)):
+            return
+
+        # checks the journal belongs to the project
+        with open(path, "rb") as file:
+            header = file.read(Journal.HEADER.size)
+            if len(header) < Journal.HEADER.size or Journal.HEADER.unpack(header) != (
+                    Journal.MAGIC, Journal.VERSION, *Journal.stamp(project)):
+                return
+
+            # reads each complete record
+            while len(length := file.read(Journal.RECORD.size)) == Journal.RECORD.size:
+                record = file.read(Journal.RECORD.unpack(length)[0])
+                if len(record) < Journal.RECORD.unpack(length)[0]:
+                    return
+                try:
+                    audio, delta = loads(record)
+                except Exception:  # a record cut off while it was written
+                    return
+                yield file.tell(), audio, delta
+
+    @staticmethod
+    def replay(project: str, data: dict) -> int:
+        """
+        applies the journal of a project to the data read from the project file
+
+        :param project: the file path of the project
+        :param data: the project data in the form {"planets": [...], "samples": {...}}, edited in place
+
+        :return: the number of records that were replayed
+        """
+
+        planets, sections = {planet.tag: planet for planet in data["planets"]}, ProjectFile.table(project)
+        audio, decoded, created, count = {}, {}, {}, 0
+
+        # resolves references to planets by their tag and to audio by its hash, planets first seen in a record are
+        # created empty and given their state once the record is read, audio in the project file is read when used
+        def persistent_load(reference: tuple):
+            if reference[0] == "planet":
+                tag, cls = reference[1:]
+                return planets[tag] if tag in planets else created.setdefault(tag, cls.__new__(cls))
+            decoded[reference] = decoded[reference] if reference in decoded else AudioSection.decode(
+                audio[reference[0]], *reference[1:]) if reference[0] in audio else AudioSection(
+                abspath(project), *sections[reference[0]], *reference[1:], digest=reference[0])
+            return decoded[reference]
+
+        # reads a planet state or a sample of a record
+        def unpickle(value: bytes):
+            unpickler = Unpickler(BytesIO(value))
+            unpickler.persistent_load = persistent_load
+            return unpickler.load()
+
+        for end, written, delta in Journal.records(project + ".journal", project):
+            audio.update(written)
+            delta = loads(decompress(delta))
+
+            # applies the planets, planets referred to before their own state is read are created empty first
+            for tag, (cls, state) in delta["planets"].items():
+                state = unpickle(state)
+                planet = planets[tag] if tag in planets else created.pop(tag, None) or cls.__new__(cls)
+                planet.__class__ = cls
+                planet.__setstate__(state)
+                data["planets"].append(planet) if tag not in planets else None
+                planets[tag] = planet
+
+            # applies the removed planets and the samples, a record of the whole project removes everything it lacks
+            removed = [tag for tag in planets if tag not in delta["planets"]] if delta["complete"] else delta["removed"]
+            for tag in removed:
+                data["planets"].remove(planets.pop(tag)) if tag in planets else None
+            deleted = [name for name in data["samples"] if name not in delta["samples"]] if delta["complete"] else \
+                delta["deleted"]
+            [data["samples"].pop(name, None) for name in deleted]
+            data["samples"].update({name: unpickle(sample) for name, sample in delta["samples"].items()})
+            count += 1
+
+        # keeps only the moons that still orbit each planet, moons can move between records of different planets
+        present = {id(planet) for planet in data["planets"]}
+        for planet in data["planets"]:
+            planet.moons = [moon for moon in planet.moons if id(moon) in present and moon.parent is planet]
+        for planet in data["planets"]:
+            if planet.parent is not None and id(planet.parent) in present and planet not in planet.parent.moons:
+                planet.parent.moons.append(planet)
+
+        return count
@@ -0,0 +1,270 @@
+from FileManagement.AudioSection import AudioSection
+from pickle import loads, Pickler, Unpickler
+from zlib import compress, decompress
+from struct import Struct
+from io import BytesIO
+from os.path import abspath
+from os import fsync, replace
+from hashlib import blake2b
+from numpy import ndarray
+from copyreg import __newobj__
+
+
+class ProjectFile:
+    """
+    reads and writes .orbres project files without depending on the GUI or audio playback so that projects can be
+    loaded and simulated headless
+
+    version 3 files are a container of three parts so that a project can be shown before its audio is read
+        --> header: the magic bytes, the version and the length of the structure
+        --> structure: the compressed pickle of the section table followed by the pickle of every planet and sample with
+            their audio left out
+        --> sections: each distinct large binary value (wav files of planets, signal arrays of samples) compressed on
+            its own and stored once under the hash of its contents, planets and samples refer to it by its hash and the
+            section table gives its offset from the end of the structure
+    on load only the header and structure are read, the audio is read when it is first used (see AudioSection)
+
+    older files can still be read and are converted by writing them again
+        --> version 2 files are the same container without the section table, sections are referred to by offset and
+            are stored once per reference
+        --> version 1 files are the compressed pickle of every planet and sample
+    """
+
+    MAGIC = b"ORBRES"
+    VERSION = 3
+    HEADER = Struct("<6sHQ")  # magic, version, length of the structure
+    SECTION_SIZE = 4096  # bytes, binary values at least this large are stored in their own section
+
+    @staticmethod
+    def version(path: str) -> int:
+        """
+        finds the version of a project file from its header
+
+        :param path: the file path to the project
+
+        :return: the version of the file, files without a header are version 1
+        """
+
+        with open(path, "rb") as file:
+            header = file.read(ProjectFile.HEADER.size)
+        return ProjectFile.HEADER.unpack(header)[1] if header.startswith(ProjectFile.MAGIC) else 1
+
+    @staticmethod
+    def read(path: str) -> dict:
+        """
+        decompresses and loads a project file, the audio of version 2 and 3 files is left in the file until it is used
+
+        :param path: the file path to the project
+
+        :return: the project data in the form {"planets": [...], "samples": {...}} which can be passed to PlanetManager
+        """
+
+        # reads version 1 files whole
+        with open(path, "rb") as file:
+            header = file.read(ProjectFile.HEADER.size)
+            if not header.startswith(ProjectFile.MAGIC):
+                return loads(decompress(header + file.read()))
+
+            # reads the structure of container files
+            magic, version, length = ProjectFile.HEADER.unpack(header)
+            if version > ProjectFile.VERSION:
+                raise ValueError(f"{path} was saved by a newer version of the program (file version {version})")
+            structure = decompress(file.read(length))
+
+        # replaces references to sections with sections that are read when used, references to the same contents share
+        # a section so that it is only read once
+        start, path, sections, structure = ProjectFile.HEADER.size + length, abspath(path), {}, BytesIO(structure)
+        table = Unpickler(structure).load() if version >= 3 else None  # its own unpickler since memos are not shared
+        unpickler = Unpickler(structure)
+        if version == 2:
+            unpickler.persistent_load = lambda section: AudioSection(path, start + section[0], *section[1:])
+        else:
+            unpickler.persistent_load = lambda section: sections[section] if section in sections else \
+                sections.setdefault(section, AudioSection(path, start + table[section[0]][0], table[section[0]][1],
+                                                          *section[1:], digest=section[0]))
+        return unpickler.load()
+
+    @staticmethod
+    def table(path: str) -> dict:
+        """
+        reads the section table of a project file without loading the project
+
+        :param path: the file path to the project
+
+        :return: the position of each section in the form {hash: (offset from the start of the file, length)}, empty for
+            files older than version 3
+        """
+
+        with open(path, "rb") as file:
+            header = file.read(ProjectFile.HEADER.size)
+            if not header.startswith(ProjectFile.MAGIC) or ProjectFile.HEADER.unpack(header)[1] < 3:
+                return {}
+            length = ProjectFile.HEADER.unpack(header)[2]
+            table = Unpickler(BytesIO(decompress(file.read(length)))).load()
+
+        start = ProjectFile.HEADER.size + length
+        return {digest: (start + offset, size) for digest, (offset, size) in table.items()}
+
+    @staticmethod
+    def write(path: str, planets: list, samples: dict):
+        """
+        compresses and saves a project to a version 3 file, each distinct sound is hashed and compressed once no matter
+        how many planets and samples use it
+
+        :param path: the file path to save the project to
+        :param planets: the planets of the project
+        :param samples: the samples of the project
+        """
+
+        ProjectFile.store(path, ProjectFile.snapshot(planets, samples))
+
+    @staticmethod
+    def snapshot(planets: list, samples: dict) -> dict:
+        """
+        takes a copy of a project that can be stored on another thread while the project keeps being edited, only the
+        containers of the project and the state of each planet are copied so that taking it is cheap
+            --> large binary values are only referenced, they are replaced rather than edited in place
+            --> sound files are read and every large binary value is hashed when the snapshot is stored
+
+        :param planets: the planets of the project
+        :param samples: the samples of the project
+
+        :return: the snapshot in the form {"project": copied project, "states": {id: (planet, copied state)}}
+        """
+
+        states = {}
+        project = ProjectFile.copy({"planets": planets, "samples": samples}, states)
+        return {"project": project, "states": states}
+
+    @staticmethod
+    def copy(value, states: dict):
+        """
+        copies the containers of a value so that later edits can't change it, objects that can copy their state (such
+        as planets, see Planet.copy_state) are kept and their state is copied once into states
+
+        :param value: the value to copy
+        :param states: the states copied so far in the form {id: (object, copied state)}
+
+        :return: the copy of the value
+        """
+
+        if isinstance(value, dict):
+            return {key: ProjectFile.copy(item, states) for key, item in value.items()}
+        if isinstance(value, (list, tuple, set)):
+            return type(value)(ProjectFile.copy(item, states) for item in value)
+        if isinstance(value, ndarray) and (value.dtype.hasobject or value.nbytes < ProjectFile.SECTION_SIZE):
+            copied = value.copy()
+            for index, item in enumerate(value.flat) if value.dtype.hasobject else ():
+                copied.flat[index] = ProjectFile.copy(item, states)
+            return copied
+
+        # copies the state once, the object is stored before its state is copied since the state can refer back to it
+        if hasattr(type(value), "copy_state") and id(value) not in states:
+            states[id(value)] = (value, None)
+            states[id(value)] = (value, ProjectFile.copy(value.copy_state(), states))
+        return value
+
+    @staticmethod
+    def reference(value, sections: dict) -> tuple:
+        """
+        finds the reference a large binary value is pickled as, the contents are kept under their hash the first time
+        they are seen, sections that were read from a file with their hash and never loaded are kept as sections
+
+        :param value: any value being pickled
+        :param sections: the contents found so far in the form {hash: bytes or section}
+
+        :return: the reference in the form (hash, kind, dtype, shape), None if the value is pickled normally
+        """
+
+        if isinstance(value, AudioSection):
+            reference = (value.kind, value.dtype, value.shape)
+            contents = None if value.digest and value.value is None else ProjectFile.payload(value.load())
+        elif isinstance(value, bytes) and len(value) >= ProjectFile.SECTION_SIZE:
+            reference, contents = ("bytes", None, None), value
+        elif isinstance(value, ndarray) and not value.dtype.hasobject and value.nbytes >= ProjectFile.SECTION_SIZE:
+            reference, contents = ("array", value.dtype.str, value.shape), ProjectFile.payload(value)
+        else:
+            return None
+
+        # keeps the contents the first time they are seen
+        digest = value.digest if contents is None else blake2b(contents, digest_size=16).hexdigest()
+        sections.setdefault(digest, value if contents is None else contents)
+        setattr(value, "digest", digest) if isinstance(value, AudioSection) else None
+        return digest, *reference
+
+    @staticmethod
+    def store(path: str, snapshot: dict, progress=None):
+        """
+        pickles, hashes and compresses a snapshot and writes it to a version 3 file, the file is written next to the path
+        and moved over it once complete so a failed or interrupted save never leaves a partial project, can be run on
+        another thread
+
+        :param path: the file path to save the project to
+        :param snapshot: the snapshot of the project taken with ProjectFile.snapshot
+        :param progress: called with the fraction of sections compressed after each section
+        """
+
+        # replaces large binary values with the hash of their contents
+        found, moved, states = {}, [], snapshot["states"]
+
+        def persistent_id(value) -> tuple:
+            moved.append(value) if isinstance(value, AudioSection) else None
+            return ProjectFile.reference(value, found)
+
+        # pickles every planet from the state copied by the snapshot, their sound files are read here
+        def reduce(value) -> tuple:
+            return __newobj__, (type(value),), type(value).read_state(states[id(value)][1])
+
+        project = BytesIO()
+        pickler = Pickler(project)
+        pickler.persistent_id = persistent_id
+        pickler.dispatch_table = {type(value): reduce for value, state in states.values()}
+        pickler.dump(snapshot["project"])
+
+        # compresses each section, sections that were never loaded are copied without decompressing
+        sections, table, offset = [], {}, 0
+        for digest, value in found.items():
+            data = value.compressed() if isinstance(value, AudioSection) else compress(value)
+            table[digest] = (offset, len(data))
+            sections.append(data)
+            offset += len(data)
+            progress(len(sections) / len(found)) if progress else None
+
+        # the table is stored before the project so it can be read first
+        buffer = BytesIO()
+        Pickler(buffer).dump(table)
+        structure = compress(buffer.getvalue() + project.getvalue())
+
+        # writes the file
+        path, temporary = abspath(path), abspath(path) + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(ProjectFile.HEADER.pack(ProjectFile.MAGIC, ProjectFile.VERSION, len(structure)))
+            file.write(structure)
+            [file.write(section) for section in sections]
+            file.flush()
+            fsync(file.fileno())
+
+        # replaces the project and points saved sections at the new file, sections of the replaced file that weren't
+        # saved (such as those only kept by undo) are loaded first since their file is about to be replaced
+        start = ProjectFile.HEADER.size + len(structure)
+        with AudioSection.LOCK:
+            kept = {id(section) for section in moved}
+            [section.load() for section in list(AudioSection.SECTIONS) if section.path == path and
+             id(section) not in kept]
+            replace(temporary, path)
+            for section in moved:
+                section.path, section.offset, section.length = path, start + table[section.digest][0], \
+                    table[section.digest][1]
+
+    @staticmethod
+    def payload(value) -> bytes:
+        """
+        gets the contents of a section, which are hashed to find sections with the same contents and compressed to store
+        the section
+
+        :param value: the bytes or array
+
+        :return: the bytes of the value
+        """
+
+        return value if isinstance(value, bytes) else value.tobytes()
@@ -13,32 +13,44 @@ class StateManger:
         self.undo_actions = []
         self.redo_actions = []
         self.unsaved = False
+        self.edits = 0  # counts states added, undone and redone so a background save can tell if the project changed
+        self.journal = None  # records the planets and samples each state touches for crash recovery (see Journal)
 
     def add_state(self, functions: dict, modify: bool = False):
         """
         adds an undo action to the state manager. additionally clears the redo action list
 
         :param functions: the functions to perform when updating the state in the form:
-            {"undo": [(def, (*args), {**kwargs})], "redo": [(def, (*args), {**kwargs})]}
+            {"undo": [(def, (*args), {**kwargs})], "redo": [(def, (*args), {**kwargs})], "planets": [planet],
+             "samples": [sample name]}
             ** note: kwargs do not need to be passed but args are needed so if no args are to be passed an empty tuple
                 should be given like so: (def, (, ))
+            ** note: planets and samples list what the state edits so that it can be journaled (see Journal), a state
+                that lists neither is journaled as an edit of the whole project
         :param modify: determines if the functions should be added to the previous state rather than adding a new state
         """
 
-        # handles when max states has been reached
+        # records the edit
         self.unsaved = True
-        if len(self.undo_actions) >= StateManger.MAX_STATES:
-            self.undo_actions.pop(0)
-            self.add_state(functions)
-            return
+        self.edits += 1
+        self.journal.add(functions) if self.journal else None
 
         # handles modifying previous state
         if modify:
-            self.undo_actions[-1]["undo"].extend(functions["undo"])
-            self.undo_actions[-1]["redo"].extend(functions["redo"])
+            previous = self.undo_actions[-1]
+            previous["undo"].extend(functions["undo"])
+            previous["redo"].extend(functions["redo"])
 
-        # handles creating new state
+            # merges what the states edit, the whole project is edited when either state doesn't list it
+            touched = ("planets", "samples")
+            if any(key in previous for key in touched) and any(key in functions for key in touched):
+                [previous.setdefault(key, []).extend(functions.get(key, ())) for key in touched]
+            else:
+                [previous.pop(key, None) for key in touched]
+
+        # handles creating new state, the oldest state is dropped when max states has been reached
         else:
+            self.undo_actions.pop(0) if len(self.undo_actions) >= StateManger.MAX_STATES else None
             self.undo_actions.append(functions)
             self.redo_actions.clear()
 
@@ -51,6 +63,9 @@ class StateManger:
         if len(self.undo_actions) != 0:
             action = self.undo_actions.pop()
             self.redo_actions.append(action)
+            self.unsaved = True
+            self.edits += 1
+            self.journal.add(action) if self.journal else None
 
             # ensures remaining actions are performed if one fails
             for func in action["undo"]:
@@ -58,6 +73,7 @@ class StateManger:
                     func[0](*(func[1]), **func[2]) if len(func) == 3 else func[0](*(func[1]))
                 except:
                     pass
+            self.journal.record() if self.journal else None
 
     def redo(self):
         """
@@ -68,6 +84,9 @@ class StateManger:
         if len(self.redo_actions) != 0:
             action = self.redo_actions.pop()
             self.undo_actions.append(action)
+            self.unsaved = True
+            self.edits += 1
+            self.journal.add(action) if self.journal else None
 
             # ensures remaining actions are performed if one fails
             for func in action["redo"]:
@@ -75,3 +94,4 @@ class StateManger:
                     func[0](*(func[1]), **func[2]) if len(func) == 3 else func[0](*(func[1]))
                 except:
                     pass
+            self.journal.record() if self.journal else None
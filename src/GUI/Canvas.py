@@ -1,13 +1,22 @@
 from Physics.Planet import Planet
-from Physics.Moon import Moon
 from Physics.PlanetManager import PlanetManager
+from GUI.PlanetEditor import PlanetEditor
+from GUI.SpatialGrid import SpatialGrid
+from GUI.StarField import StarField
+from GUI.TkRenderer import TkRenderer
+from GUI.RasterRenderer import RasterRenderer
+from GUI.FrameScheduler import FrameScheduler
+from GUI.FrameProfiler import FrameProfiler
 from customtkinter import CTkCanvas
-from tkinter.messagebox import askokcancel
-from random import uniform, seed
-from numpy import array, floor, ceil, sort, vstack
+from tkinter.messagebox import askokcancel, showerror
+from tkinter.filedialog import asksaveasfilename
+from tkinter import PhotoImage
+from numpy import array, floor, ceil, sort, vstack, zeros, clip, maximum, flatnonzero, unique, where, arange, \
+    stack, meshgrid, concatenate, array_equal
 from numpy.linalg import norm
 from time import perf_counter
 from uuid import uuid1
+from pathlib import Path
 
 
 class Canvas(CTkCanvas):
@@ -18,11 +27,15 @@ class Canvas(CTkCanvas):
         --> conversion function: converting space to canvas coordinates and vice versa
         --> event handler functions: handles user events such as clicking buttons and keyboard/mouse events
         --> button function: functions for creating/updating the navigation buttons and menu visibility buttons
+        --> planet manager callbacks: functions the planet manager calls to keep the menus in sync with its data
 
     Class also contains class properties for modifying how the class will function/look
         --> navigation button properties
         --> state properties
         --> star generation properties
+        --> level of detail properties
+        --> quality properties
+        --> profiler properties
     """
 
     # properties for how navigation buttons should look and function
@@ -39,6 +52,10 @@ class Canvas(CTkCanvas):
     TOOLTIP_FILL = {"fill": "gray50", "outline": "black"}
     TOOLTIP_HOVER_TIME = 750
 
+    # properties for how the status of file actions (such as background saves) is shown next to the file buttons
+    STATUS_FILL = "white"
+    STATUS_TIME = 1500  # ms the status is shown after its last update
+
     # properties for how much class fields should update when state is updated
     ZOOM_AMT = array([[1.1], [1.003]])  # planet amt, star amt
     POS_AMT = 10
@@ -47,14 +64,35 @@ class Canvas(CTkCanvas):
     DEFAULT_ZOOM_PADDING = 2
 
     # misc properties for timing and chunk loading
-    FPS = 60
-    FPS = int(1000 / FPS) if int(1000 / FPS) != 0 else 1  # calculated ms between frames don't change this value
     FOCUS_FRAMES = 30
     FOCUS_DRAG_THRESHOLD = 10
     CHUNK_SIZE = 200
     STARS_PER_CHUNK = 3
+    RASTER_STARS = False  # draws the stars into a single image rather than one canvas item per star
+    STAR_IMAGE_ZOOM = 1.02  # how far the zoom can drift before the star image is drawn again
     TRIGGER_SIZE = .25
 
+    # renderers that can draw the solar system, the renderer is chosen when the canvas is created
+    RENDERERS = {"tk": TkRenderer, "raster": RasterRenderer}
+    RENDERER = "tk"
+
+    # properties for level of detail when zoomed out, sizes are radii on screen in pixels
+    LOD_POINT_RADIUS = .5  # bodies smaller than this are drawn as single pixel points
+    LOD_MERGE_SIZE = 2  # points that land in the same square of this size are merged into one
+    LOD_PATH_RADIUS = 3  # orbit paths smaller than this are hidden
+
+    # properties for lowering quality when frames take too long, see FrameScheduler, each step keeps the ones before it
+    QUALITY_STAR_FRAMES = 4  # 1st step: stars are only loaded every this many frames while following a planet
+    QUALITY_LOD_SCALE = 4  # 2nd step: level of detail sizes are multiplied by this
+    # 3rd step: orbit paths of moons, which are placed again every frame, are not drawn
+
+    # properties for the frame profiler and its overlay, stages are timed in the order they run within a frame
+    PROFILE_STAGES = ("midi", "physics", "stars", "cull", "buffers", "redraw", "triggers")
+    PROFILE_FRAMES = 15  # frames between updates of the overlay
+    FPS_TARGETS = (30, 60, 120, 144, 240)  # target frame rates the user can step through
+    PROFILE_OPTIONS = {"initialdir": Path("saves"), "initialfile": "profile.csv", "defaultextension": ".csv",
+                       "filetypes": [("CSV", "*.csv"), ("JSON", "*.json")]}
+
     def __init__(self, *args, **kwargs):
         """
         creates the canvas widget
@@ -83,6 +121,7 @@ class Canvas(CTkCanvas):
         self.initialized = False
         self.after_click = self.after(0, lambda: None)
         self.after_tooltip = self.after(0, lambda: None)
+        self.after_status = self.after(0, lambda: None)
 
         # pauses fps updates when user is moving the window
         self.after_config = self.after(0, lambda: None)
@@ -105,6 +144,23 @@ class Canvas(CTkCanvas):
         # sets star render fields
         self.star_seed = uuid1()
         self.star_render_range = array([[0, 0], [0, 0]])
+        self.star_field = StarField(self.star_seed.int, Canvas.CHUNK_SIZE, Canvas.STARS_PER_CHUNK)
+        self.star_items = {}  # the canvas items of each loaded chunk in the form (x, y): item ids
+        self.star_image = None  # the image of the stars in the form (photo image, item, zoom) when stars are rasterized
+
+        # sets culling and picking fields
+        self.grid = SpatialGrid()  # screen positions of every body, rebuilt each frame
+        self.hover_cursor = ""
+
+        # sets frame fields, the update function is looked up every frame so that it can be wrapped
+        self.scheduler = FrameScheduler(self, lambda: self.update_planets())
+        self.profiler = FrameProfiler(Canvas.PROFILE_STAGES)
+        self.profile_item = None  # the text item of the overlay when it is shown
+        self.synced = {}  # the planets modified since the last frame that was drawn, ordered like a set
+
+        # sets rendering fields
+        self.renderer = Canvas.RENDERERS[Canvas.RENDERER](self)
+        self.lod_counts = {"shapes": 0, "points": 0, "merged": 0, "skipped": 0, "paths": 0}  # drawn last frame
 
         # creates navigation buttons
         width, height = self.canvas_size
@@ -169,6 +225,8 @@ class Canvas(CTkCanvas):
         self.bind("<Button-1>", lambda e: setattr(self, "drag_event", array([e.x, e.y])))
         self.bind("<Button-1>", lambda e: setattr(self, "drag_amt", 0), add="+")
         self.bind("<B1-Motion>", lambda e: self.position_event(self.drag_event - array([e.x, e.y]), event=e))
+        self.bind("<ButtonRelease-1>", self.click_event)
+        self.bind("<Motion>", self.hover_event)
 
     # ================================================ PLANET FUNCTIONS ================================================
 
@@ -226,128 +284,132 @@ class Canvas(CTkCanvas):
             self.position_event((self.focus_step["position"] + space_pos_diff) * self.zoom[0], unfocus=False)
             self.focus_frames += 1
 
-        self.draw_stars()
-
     def update_planets(self):
         """
         applies changes to the planet manger to the view
             --> clears the planet manager deleted buffer and removes planets from the view
             --> clears the planet manager added buffer and adds planets to the view
             --> updates the positioning of the remaining planets
+            ** frames are run by the frame scheduler, only physics and sounds are updated while the canvas is hidden,
+               the planets modified while hidden are drawn by the next frame that is shown **
+            ** drawing is done by the renderer chosen with RENDERER, see TkRenderer and RasterRenderer **
+            ** each stage of the frame is timed by the frame profiler, see PROFILE_STAGES **
         """
 
         # handles when fps updates should be paused
-        if (not self.running) and (not any(planet.update for planet in self.planet_manager.planets)):
-            return self.after(Canvas.FPS, self.update_planets)
+        if (not self.running) and (not self.planet_manager.orbits.dirty):
+            return
 
-        # schedules the next frame and updates the midi editor
-        self.after(Canvas.FPS, self.update_planets)
+        # updates the midi editor
+        self.profiler.begin()
         self.menu_visibility["AI"]["menu"].midi.playback(Canvas.NAV_BUTTON_CLICK_TIME)
+        self.profiler.mark("midi")
 
         # updates physics and focus
         dt = perf_counter()
         old_pos = self.planet_manager.focused_planet.position.copy() if self.planet_manager.focused_planet else None
-        triggered = self.planet_manager.update_planet_physics((dt - self.dt) * self.speed)
+        triggered = self.planet_manager.update_planet_physics((dt - self.dt) * self.speed, self.speed)
         self.dt = dt
         self.maintain_focus(old_pos)
+        self.synced.update(dict.fromkeys(self.planet_manager.synced_planets))
+        self.profiler.mark("physics")
+        if self.scheduler.hidden:
+            return
+
+        # loads the stars around the focused planet, less often when the quality has been lowered
+        skip = Canvas.QUALITY_STAR_FRAMES if self.scheduler.degradation >= 1 else 1
+        self.draw_stars() if self.planet_manager.focused_planet and self.scheduler.frame % skip == 0 else None
+        self.profiler.mark("stars")
+
+        # finds what is on screen
+        visible, paths, points = self.cull()
+        self.profiler.mark("cull")
+
+        # applies the removed and added buffers
+        removed, added = self.planet_manager.get_removed_buffer(), self.planet_manager.get_added_buffer()
+        self.renderer.sync(removed, added)
+        self.profiler.mark("buffers")
+
+        # draws the frame with the planets modified since the last frame that was drawn, even while the canvas was
+        # hidden, planets removed in the meantime are left out
+        orbits, synced, self.synced = self.planet_manager.orbits, self.synced, {}
+        updated = [planet for planet in synced if planet.update and planet.store is orbits]
+        [setattr(planet, "update", False) for planet in updated]
+        self.renderer.draw(updated, visible, paths, points)
+        self.profiler.mark("redraw")
+
+        # flashes triggered planets
+        self.renderer.flash(triggered)
+        self.profiler.mark("triggers")
+        self.profiler.end()
+        self.draw_profile() if self.profile_item and self.scheduler.frame % Canvas.PROFILE_FRAMES == 0 else None
+
+    def cull(self) -> tuple[set, set, array]:
+        """
+        finds what is on screen from the positions in the orbit store and picks the level of detail of each body from
+        its size on screen
+            --> moons whose orbit fits inside their parent as drawn are skipped along with anything orbiting them
+            --> bodies smaller than LOD_POINT_RADIUS are drawn as points, points in the same LOD_MERGE_SIZE square are
+                merged into one
+            --> planets are found with the spatial grid, which is rebuilt so that it can also be used for picking
+            --> paths are on screen when their outline crosses the screen and is at least LOD_PATH_RADIUS, paths that
+                are entirely off screen or that surround the whole screen are not
+            --> the level of detail sizes are larger and moon paths are not drawn when the frame scheduler has lowered
+                the quality
+            --> the number of items drawn by each level of detail is kept in lod_counts
+
+        :return: the set of planets drawn as shapes, the set of planets whose path is drawn and the orbit store index
+            of each body drawn as a point
+        """
+
+        # gets the level of detail sizes for the current quality
+        degradation = self.scheduler.degradation
+        sizes = array([Canvas.LOD_POINT_RADIUS, Canvas.LOD_MERGE_SIZE, Canvas.LOD_PATH_RADIUS])
+        point_radius, merge_size, path_radius = sizes * (Canvas.QUALITY_LOD_SCALE if degradation >= 2 else 1)
+
+        # skips moons that would be drawn inside their parent
+        store = self.planet_manager.orbits
+        size, zoom = len(store), self.zoom[0, 0]
+        parent = store.parent[:size]
+        centers = (store.position[:size] - self.space_position[0]) * zoom
+        radii, path_radii = store.radius[:size] * zoom, store.orbital_radius[:size] * zoom
+        skipped = (parent >= 0) & (path_radii < maximum(radii[parent], point_radius))
+        for level in store.levels or []:
+            skipped[level] |= skipped[parent[level]]
+
+        # rebuilds the spatial grid and splits the planets on screen into shapes and points
+        self.grid.build(centers, radii, ~skipped)
+        on_screen = self.grid.query(zeros(2), self.canvas_size)
+        small = radii[on_screen] < point_radius
+        visible = {store.bodies[index] for index in on_screen[~small]}
+
+        # merges points that land in the same square
+        points = on_screen[small]
+        points = points[unique(floor(centers[points] / merge_size), axis=0, return_index=True)[1]]
+
+        # finds the paths that cross the screen, paths of planets are centered on the origin
+        path_centers = where(parent[:, None] >= 0, centers[parent], -self.space_position[0] * zoom)
+        nearest = norm(clip(path_centers, 0, self.canvas_size) - path_centers, axis=1)
+        farthest = norm(maximum(abs(path_centers), abs(path_centers - self.canvas_size)), axis=1)
+        paths = flatnonzero((~skipped) & (path_radii >= path_radius) & (nearest <= path_radii) &
+                            (farthest >= path_radii) & ((parent < 0) | (degradation < 3)))
+
+        self.lod_counts = {"shapes": len(visible), "points": len(points), "merged": int(small.sum()) - len(points),
+                           "skipped": int(skipped.sum()), "paths": len(paths)}
+        return visible, {store.bodies[index] for index in paths}, points
+
+    def find_planet(self, point: array) -> Planet:
+        """
+        finds the planet under a point on the canvas using the spatial grid
 
-        # deletes planets in delete buffer
-        for planet in self.planet_manager.get_removed_buffer():
-            self.delete(planet.tag, f"path {planet.tag}", f"trigger {planet.tag}")
-
-        # adds newly added planets to the display
-        added_buffer = self.planet_manager.get_added_buffer()
-        for planet in added_buffer:
-
-            # draws moon orbit path
-            if type(planet) == Moon:
-                p1 = self.space_to_canvas(planet.planet.position + array([planet.orbital_radius] * 2))[0]
-                p2 = self.space_to_canvas(planet.planet.position + array([-planet.orbital_radius] * 2))[0]
-                self.create_oval(*p1, *p2, outline="gray", width=1, tags=("paths", f"path {planet.tag}"))
-
-            # draws orbit path
-            elif planet != self.planet_manager.get_sun():
-                p1 = self.space_to_canvas(array([planet.orbital_radius] * 2))[0]
-                p2 = self.space_to_canvas(array([-planet.orbital_radius] * 2))[0]
-                self.create_oval(*p1, *p2, outline="gray", width=1, tags=("paths", f"path {planet.tag}"))
-
-                # draws sound trigger
-                p1 = self.space_to_canvas(array([0, -planet.orbital_radius + (planet.radius * Canvas.TRIGGER_SIZE)]))[0]
-                p2 = self.space_to_canvas(array([0, -planet.orbital_radius - (planet.radius * Canvas.TRIGGER_SIZE)]))[0]
-                self.create_line(*p1, *p2, fill="gray", width=1, tags=("triggers", f"trigger {planet.tag}"))
-
-            # binds click function to planet
-            self.tag_bind(planet.tag, "<ButtonRelease-1>", lambda e, p=planet: self.set_focus(
-                p, e.state & 0x0004) if self.drag_amt < Canvas.FOCUS_DRAG_THRESHOLD else None)
-
-        # updates planet state
-        for planet in self.planet_manager.planets:
-            if planet.update:
-                added_buffer = True
-                self.itemconfig(planet.tag, fill=planet.color)
-                planet.update = False
-
-                # updates path
-                p1 = self.space_to_canvas(array([planet.orbital_radius] * 2))[0]
-                p2 = self.space_to_canvas(array([- planet.orbital_radius] * 2))[0]
-                self.coords(f"path {planet.tag}", *p1, *p2)
-
-                # updates trigger
-                p1 = self.space_to_canvas(array([0, -planet.orbital_radius + (planet.radius * Canvas.TRIGGER_SIZE)]))[0]
-                p2 = self.space_to_canvas(array([0, -planet.orbital_radius - (planet.radius * Canvas.TRIGGER_SIZE)]))[0]
-                self.coords(f"trigger {planet.tag}", *p1, *p2)
-                if type(planet) == Planet and (not self.find_withtag(f"trigger {planet.tag}")):
-                    self.create_line(*p1, *p2, fill="gray", width=1, tags=("triggers", f"trigger {planet.tag}"))
-                elif type(planet) != Planet:
-                    self.delete(f"trigger {planet.tag}")
-
-                # handles drawing planet shape
-                self.delete(planet.tag)
-                pos = self.space_to_canvas(planet.position)[0]
-                radius = planet.radius * self.zoom[0, 0]
-
-                # circle shape
-                if planet.shape == "Circle":
-                    args = (pos[0] - radius, pos[1] - radius, pos[0] + radius, pos[1] + radius)
-                    self.create_oval(*args, fill=planet.color, tags=("planets", planet.tag))
-
-                # square shape
-                elif planet.shape == "Square":
-                    args = (pos[0] - radius, pos[1] - radius, pos[0] + radius, pos[1] + radius)
-                    self.create_rectangle(*args, fill=planet.color, tags=("planets", planet.tag))
-
-                # triangle shape
-                elif planet.shape == "Triangle":
-                    args = (pos[0], pos[1] - radius, pos[0] - radius, pos[1] + radius, pos[0] + radius, pos[1] + radius)
-                    self.create_polygon(*args, fill=planet.color, tags=("planets", planet.tag))
-
-                # rectangle shape
-                elif planet.shape == "Rectangle":
-                    args = (pos[0] - radius, pos[1] - radius / 2, pos[0] + radius, pos[1] + radius / 2)
-                    self.create_rectangle(*args, fill=planet.color, tags=("planets", planet.tag))
-
-            # moves planet
-            bbox = self.bbox(planet.tag)
-            bbox = array([bbox[2] - bbox[0], bbox[3] - bbox[1]]) / 2
-            pos = floor(self.space_to_canvas(planet.position)[0] - bbox)
-            self.moveto(planet.tag, pos[0], pos[1])
-
-            # moves planet moon path
-            if type(planet) == Moon:
-                p1 = self.space_to_canvas(planet.planet.position + array([planet.orbital_radius] * 2))[0]
-                p2 = self.space_to_canvas(planet.planet.position + array([-planet.orbital_radius] * 2))[0]
-                self.coords(f"path {planet.tag}", *p1, *p2)
-
-        # updates color of triggered planets
-        for planet in triggered:
-            self.itemconfig(planet.tag, fill="white")
-            self.after(Canvas.NAV_BUTTON_CLICK_TIME, lambda p=planet: self.itemconfig(p.tag, fill=p.color))
-
-        # ensures proper leveling of canvas items
-        if added_buffer:
-            self.tag_lower("planets", "buttons")
-            self.tag_lower("paths", "planets")
-            self.tag_lower("triggers", "planets")
+        :param point: the canvas position in the form [x, y]
+
+        :return: the planet under the point, None if there isn't one
+        """
+
+        index = self.grid.pick(point)
+        bodies = self.planet_manager.orbits.bodies
+        return bodies[index] if index is not None and index < len(bodies) else None
 
     # ================================================= STAR FUNCTIONS =================================================
 
@@ -393,10 +455,27 @@ class Canvas(CTkCanvas):
 
         return difference
 
+    @staticmethod
+    def chunk_corners(regions: list[array]) -> array:
+        """
+        lists every chunk in a list of regions
+
+        :param regions: regions made of whole chunks in the form [[xmin, ymin], [xmax, ymax]]
+
+        :return: the top left corner of each chunk in the form [[x, y], ...]
+        """
+
+        corners = [stack(meshgrid(arange(x_min, x_max, Canvas.CHUNK_SIZE), arange(y_min, y_max, Canvas.CHUNK_SIZE),
+                                  indexing="ij"), axis=-1).reshape(-1, 2) for (x_min, y_min), (x_max, y_max) in regions]
+        return concatenate(corners).astype(int) if corners else zeros((0, 2), dtype=int)
+
     def draw_stars(self):
         """
         generates new stars if the player "loads" more of the map that was not previously visible in a chunk based manor
         additionally unloads stars if they are outside of the players view
+            --> the stars of every newly visible chunk are taken from the star field at once and created with a single
+                tcl evaluation
+            --> the canvas items of each loaded chunk are remembered so that every unloaded chunk is deleted in one call
         """
 
         # gets the sizing of the canvas in space coordinates
@@ -404,33 +483,60 @@ class Canvas(CTkCanvas):
         space_end = ceil(self.canvas_to_space(self.canvas_size)[1] / Canvas.CHUNK_SIZE) * Canvas.CHUNK_SIZE
         space = array([space_start, space_end])
 
-        # loads the chunks that need to be loaded
-        chunk_load_difference = Canvas.chunk_difference(space, self.star_render_range)
-        for chunks in chunk_load_difference:
-            for chunk_x in range(int(chunks[0, 0]), int(chunks[1, 0]), Canvas.CHUNK_SIZE):
-                for chunk_y in range(int(chunks[0, 1]), int(chunks[1, 1]), Canvas.CHUNK_SIZE):
-
-                    # prepares seed for chunk so every time it is rendered it renders the same star pattern
-                    seed(hash((self.star_seed, chunk_x, chunk_y)))
-                    for star in range(Canvas.STARS_PER_CHUNK):
-                        # generates stars in the chunk
-                        x = uniform(chunk_x, chunk_x + Canvas.CHUNK_SIZE)
-                        y = uniform(chunk_y, chunk_y + Canvas.CHUNK_SIZE)
-                        x, y = self.space_to_canvas(array([x, y]))[1]
-                        kwargs = {"tags": ("stars", f"({chunk_x}, {chunk_y})"), "outline": "white"}
-                        self.create_rectangle(x, y, x, y, **kwargs)
+        # handles when stars are drawn as a single image
+        if Canvas.RASTER_STARS:
+            return self.draw_star_image(space)
+
+        # loads the chunks that need to be loaded, items created in one evaluation have consecutive ids
+        chunks = Canvas.chunk_corners(Canvas.chunk_difference(space, self.star_render_range))
+        if len(chunks):
+            stars = self.star_field.get(chunks)
+            coords = (stars.reshape(-1, 2) - self.space_position[1]) * self.zoom[1, 0]
+            command = f"{self._w} create rectangle %.1f %.1f %.1f %.1f -outline white -tags stars"
+            last = int(self.tk.eval("\n".join(command % (x, y, x, y) for x, y in coords.tolist())))
+            first = last - len(coords) + 1
+            for index, chunk in enumerate(map(tuple, chunks.tolist())):
+                self.star_items[chunk] = range(first + index * Canvas.STARS_PER_CHUNK,
+                                               first + (index + 1) * Canvas.STARS_PER_CHUNK)
 
         # unloads chunks that are not visible
-        for chunks in Canvas.chunk_difference(self.star_render_range, space):
-            for chunk_x in range(int(chunks[0, 0]), int(chunks[1, 0]), Canvas.CHUNK_SIZE):
-                for chunk_y in range(int(chunks[0, 1]), int(chunks[1, 1]), Canvas.CHUNK_SIZE):
-                    self.delete(f"({chunk_x}, {chunk_y})")
+        unloaded = Canvas.chunk_corners(Canvas.chunk_difference(self.star_render_range, space))
+        items = [item for chunk in map(tuple, unloaded.tolist()) for item in self.star_items.pop(chunk, ())]
+        self.delete(*items) if items else None
 
         # updates render range and ensures stars are at the bottom
         self.star_render_range = space
-        if chunk_load_difference:
+        if len(chunks):
             self.tag_lower("stars")
 
+    def draw_star_image(self, space: array):
+        """
+        draws every star in view into one image, panning and zooming only move the image so their cost does not depend
+        on the number of stars
+            --> the image is only drawn again when the view crosses into a new chunk or the zoom has drifted by more
+                than STAR_IMAGE_ZOOM since it was drawn
+
+        :param space: the chunks in view in the form [[xmin, ymin], [xmax, ymax]]
+        """
+
+        # keeps the current image while it still covers the view
+        zoom = self.zoom[1, 0]
+        if self.star_image and array_equal(space, self.star_render_range) and \
+                max(zoom / self.star_image[2], self.star_image[2] / zoom) < Canvas.STAR_IMAGE_ZOOM:
+            return
+
+        # rasterizes the stars and replaces the old image
+        pixels = self.star_field.rasterize(space, zoom)
+        header = f"P5 {pixels.shape[1]} {pixels.shape[0]} 255\n".encode()
+        image = PhotoImage(master=self, data=header + pixels.tobytes(), format="PPM")
+        self.delete(self.star_image[1]) if self.star_image else None
+        corner = self.space_to_canvas(space[0])[1]
+        self.star_image = (image, self.create_image(*corner, image=image, anchor="nw", tags="stars"), zoom)
+
+        # updates render range and ensures stars are at the bottom
+        self.star_render_range = space
+        self.tag_lower("stars")
+
     # =================================================== CONVERSIONS ==================================================
 
     def space_to_canvas(self, coordinates: array) -> array:
@@ -490,9 +596,7 @@ class Canvas(CTkCanvas):
         self.space_position += (position - mouse) / self.zoom
 
         # handles star/planet rendering
-        self.scale("planets", mouse[0], mouse[1], amount[0, 0], amount[0, 0])
-        self.scale("triggers", mouse[0], mouse[1], amount[0, 0], amount[0, 0])
-        self.scale("paths", mouse[0], mouse[1], amount[0, 0], amount[0, 0])
+        self.renderer.scale(mouse, amount[0, 0])
         self.scale("stars", mouse[0], mouse[1], amount[1, 0], amount[1, 0])
         self.draw_stars() if render else None
 
@@ -522,9 +626,7 @@ class Canvas(CTkCanvas):
         # handles updating position and star rendering
         amount = vstack((amount, amount * Canvas.STAR_POS_FACTOR))
         self.space_position += (amount / self.zoom)
-        self.move("planets", *-amount[0])
-        self.move("triggers", *-amount[0])
-        self.move("paths", *-amount[0])
+        self.renderer.move(-amount[0])
         self.move("stars", *-amount[1])
 
         # handles call is not from update planets
@@ -532,6 +634,30 @@ class Canvas(CTkCanvas):
             self.set_focus(None)
             self.draw_stars()
 
+    def click_event(self, event):
+        """
+        focuses the planet that was clicked, holding control also zooms to the planet
+            ** clicks that end a drag or that are on a button are ignored **
+
+        :param event: the mouse release event
+        """
+
+        if self.drag_amt >= Canvas.FOCUS_DRAG_THRESHOLD or "buttons" in self.gettags("current"):
+            return
+        planet = self.find_planet(array([event.x, event.y]))
+        self.set_focus(planet, event.state & 0x0004) if planet else None
+
+    def hover_event(self, event):
+        """
+        shows a hand cursor while the mouse is over a planet
+
+        :param event: the mouse motion event
+        """
+
+        cursor = "hand2" if self.find_planet(array([event.x, event.y])) else ""
+        self.configure(cursor=cursor) if cursor != self.hover_cursor else None
+        self.hover_cursor = cursor
+
     def resize_event(self, size: array):
         """
         handles when the user resizes the canvas object
@@ -559,7 +685,60 @@ class Canvas(CTkCanvas):
             self.initialized = True
             self.planet_manager.set_sample(self.planet_manager.sample)
             self.set_focus(self.planet_manager.get_sun(), True, False)
-            self.update_planets()
+            self.scheduler.start()
+
+    # =============================================== PROFILER FUNCTIONS ===============================================
+
+    def step_fps(self, step: int):
+        """
+        changes the target frame rate of the frame scheduler to the next higher or lower rate in FPS_TARGETS and shows
+        the new target in the status
+
+        :param step: 1 for the next higher rate, -1 for the next lower rate
+        """
+
+        targets = Canvas.FPS_TARGETS
+        index = min(range(len(targets)), key=lambda i: abs(targets[i] - self.scheduler.fps))
+        self.scheduler.fps = targets[min(max(index + step, 0), len(targets) - 1)]
+        self.show_status(f"Target {self.scheduler.fps:.0f} fps")
+
+    def toggle_profile(self):
+        """
+        shows or hides the overlay of the frame profiler
+        """
+
+        if self.profile_item:
+            self.delete(self.profile_item)
+            self.profile_item = None
+        else:
+            self.profile_item = self.create_text(self.canvas_size[0] - 40, 20, fill="white", tags="planet_settings",
+                                                 font=("Courier", 10), anchor="ne", justify="left")
+            self.draw_profile()
+
+    def draw_profile(self):
+        """
+        updates the overlay of the frame profiler
+            --> the actual and target fps, dropped frames and lowered quality steps of the frame scheduler
+            --> the p50/p95/p99 time of each stage in milliseconds
+            --> the number of items drawn by each level of detail
+        """
+
+        stats = self.scheduler.stats()
+        lines = [f"FPS {stats['fps']:.0f}/{self.scheduler.fps:.0f}  dropped {stats['dropped']}  "
+                 f"quality -{stats['degradation']}", f"{'stage':<10}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        lines += [f"{stage:<10}" + "".join(f"{time:7.2f}" for time in times.values())
+                  for stage, times in self.profiler.summary().items()]
+        lines += [" ".join(f"{tier} {count}" for tier, count in self.lod_counts.items())]
+        self.itemconfig(self.profile_item, text="\n".join(lines))
+        self.tag_raise(self.profile_item)
+
+    def export_profile(self):
+        """
+        asks for a file and exports the times recorded by the frame profiler to it as csv or json
+        """
+
+        path = asksaveasfilename(parent=self, **Canvas.PROFILE_OPTIONS)
+        self.profiler.export(path) if path else None
 
     # ==================================================== BUTTONS =====================================================
 
@@ -798,6 +977,7 @@ class Canvas(CTkCanvas):
 
         # asks user if they are sure they want to exit
         elif tag == "exit" and askokcancel(*args):
+            self.file_manager.close()
             return "exit"
 
         # handles if new or load are clicked
@@ -810,3 +990,105 @@ class Canvas(CTkCanvas):
             self.file_manager.save_path = None
             self.file_manager.save(self)
             self.file_manager.save_path = old_path if not self.file_manager.save_path else self.file_manager.save_path
+
+    def show_status(self, text: str):
+        """
+        shows the status of a file action next to the file buttons, the status is cleared once it hasn't been updated
+        for STATUS_TIME
+
+        :param text: the status to show
+        """
+
+        self.delete("status")
+        self.after_cancel(self.after_status)
+        self.create_text(207, 20, text=text, fill=Canvas.STATUS_FILL, font=("Arial", 10), anchor="w", tags="status")
+        self.after_status = self.after(Canvas.STATUS_TIME, lambda: self.delete("status"))
+
+    # ============================================ PLANET MANAGER CALLBACKS ============================================
+
+    def reload_menus(self):
+        """
+        reloads the menus after the planet manager has been re-initialized
+            --> rebuilds the sample list
+            --> sets the sun settings
+            --> closes any open planet editors
+        """
+
+        # adds samples to sample list
+        planet_settings = self.menu_visibility["planet"]["menu"]
+        [frame.destroy() for frame in planet_settings.sample_frames.values()]
+        for name, sample in self.planet_manager.samples.items():
+            planet_settings.add_sample(name, sample)
+
+        # sets sun settings
+        planet_settings.old_sun_r = self.planet_manager.get_sun().radius
+        planet_settings.size_slider.set(self.planet_manager.get_sun().radius)
+        planet_settings.shape_options.set(self.planet_manager.get_sun().shape)
+
+        # removed old planet editors
+        for editor in PlanetEditor.planets.values():
+            editor.destroy()
+        PlanetEditor.planets.clear()
+
+    def sample_added(self, name: str, sample: dict):
+        """
+        adds a sample to the sample list
+
+        :param name: the name of the sample
+        :param sample: the sample that was added
+        """
+
+        self.menu_visibility["planet"]["menu"].add_sample(name, sample)
+
+    def sample_deleted(self, name: str):
+        """
+        removes a sample from the sample list
+
+        :param name: the name of the sample
+        """
+
+        self.menu_visibility["planet"]["menu"].sample_frames[name].destroy()
+
+    def sample_selected(self, name: str):
+        """
+        selects a sample in the sample list and loads it into the sample and sequence editors
+
+        :param name: the name of the sample
+        """
+
+        self.menu_visibility["planet"]["menu"].sample.set(name)
+        self.menu_visibility["AI"]["menu"].load_sample(name)
+
+    def timeline_built(self, loop_length: float, density: float):
+        """
+        shows the statistics of the trigger table in the sun settings
+
+        :param loop_length: the length of one repeat of the solar system in seconds, None when it has no repeat
+        :param density: the number of sounds played per second
+        """
+
+        self.menu_visibility["planet"]["menu"].display_loop(loop_length, density)
+
+    @staticmethod
+    def confirm(title: str, message: str) -> bool:
+        """
+        asks the user to confirm an action
+
+        :param title: the title of the dialog
+        :param message: the message to display
+
+        :return: True if the user confirmed the action
+        """
+
+        return askokcancel(title, message)
+
+    @staticmethod
+    def show_error(title: str, message: str):
+        """
+        shows an error to the user
+
+        :param title: the title of the dialog
+        :param message: the message to display
+        """
+
+        showerror(title, message)
@@ -0,0 +1,117 @@
+from numpy import zeros, percentile
+from time import perf_counter
+from pathlib import Path
+from json import dump
+from csv import writer
+
+
+class FrameProfiler:
+    """
+    times each stage of a frame so that the cost of a frame can be broken down while the program runs
+        --> a frame is started with begin and each stage is ended with mark, the time of a stage is the time since the
+            last mark so stages are timed without wrapping any of the code they run
+        --> the times of each stage are kept in a fixed size ring buffer so recording never allocates
+        --> stages that are skipped in a frame are not recorded, percentiles are of the frames that ran the stage
+        --> the recorded times can be summarized as percentiles and exported to csv or json
+    """
+
+    HISTORY = 600  # number of times kept for each stage
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, stages: tuple, history: int = HISTORY):
+        """
+        creates the profiler
+
+        :param stages: the names of the stages of a frame, a "frame" stage for the whole frame is added to them
+        :param history: the number of times kept for each stage
+        """
+
+        self.stages = {stage: index for index, stage in enumerate(stages + ("frame",))}
+        self.history = history
+        self.times = zeros((len(self.stages), history))  # ring buffer of the seconds taken by each stage
+        self.counts = [0] * len(self.stages)  # the number of times each stage has been recorded
+        self.start = self.last = perf_counter()
+
+    def begin(self):
+        """
+        starts timing a frame
+        """
+
+        self.start = self.last = perf_counter()
+
+    def mark(self, stage: str):
+        """
+        ends a stage, its time is the time since the frame began or the last stage ended
+
+        :param stage: the name of the stage
+        """
+
+        now = perf_counter()
+        self.record(stage, now - self.last)
+        self.last = now
+
+    def end(self):
+        """
+        ends the frame, the time of the whole frame is recorded as the "frame" stage
+        """
+
+        self.record("frame", perf_counter() - self.start)
+
+    def record(self, stage: str, time: float):
+        """
+        adds a time to the ring buffer of a stage, overwriting the oldest time once the buffer is full
+
+        :param stage: the name of the stage
+        :param time: the time in seconds
+        """
+
+        index = self.stages[stage]
+        self.times[index, self.counts[index] % self.history] = time
+        self.counts[index] += 1
+
+    def samples(self, stage: str):
+        """
+        gets the recorded times of a stage from oldest to newest
+
+        :param stage: the name of the stage
+
+        :return: the times in milliseconds
+        """
+
+        index, count = self.stages[stage], self.counts[self.stages[stage]]
+        times = self.times[index, :count] if count <= self.history else \
+            self.times[index].take(range(count, count + self.history), mode="wrap")
+        return times * 1000
+
+    def summary(self) -> dict:
+        """
+        finds the percentiles of each stage
+
+        :return: the percentiles in milliseconds in the form {stage: {"p50": time, ...}}, stages that were never
+            recorded are left out
+        """
+
+        return {stage: {f"p{p}": float(time) for p, time in
+                        zip(FrameProfiler.PERCENTILES, percentile(self.samples(stage), FrameProfiler.PERCENTILES))}
+                for stage in self.stages if self.counts[self.stages[stage]]}
+
+    def export(self, path: str):
+        """
+        writes the recorded times to a file for offline analysis, the format is chosen by the extension of the path
+            --> csv: a row per recorded time in the form stage, sample, milliseconds
+            --> json: the percentiles and recorded times of each stage
+
+        :param path: the path of the file, ending in .csv or .json
+        """
+
+        path = Path(path)
+        with open(path, "w", newline="") as file:
+            if path.suffix.lower() == ".csv":
+                rows = writer(file)
+                rows.writerow(["stage", "sample", "ms"])
+                for stage in self.stages:
+                    rows.writerows([stage, sample, time] for sample, time in enumerate(self.samples(stage).tolist()))
+            else:
+                summary = self.summary()
+                dump({stage: {**summary.get(stage, {}), "samples": self.samples(stage).tolist()}
+                      for stage in self.stages}, file, indent=2)
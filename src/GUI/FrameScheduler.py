@@ -0,0 +1,133 @@
+from collections import deque
+from numpy import array, mean, percentile
+from time import perf_counter
+
+
+class FrameScheduler:
+    """
+    runs the frames of a widget against absolute deadlines rather than a fixed delay after each frame
+        --> the deadline of each frame is the deadline of the last frame plus the frame interval so the time spent
+            working on a frame does not push every later frame back
+        --> frames that are more than a whole interval late are dropped rather than run back to back
+        --> the work time of each frame is measured, when recent frames use too much of the interval the quality is
+            lowered one step at a time and raised again once frames are cheap enough
+        --> a low rate is used while the widget is not visible (minimized or hidden)
+        --> the work time and spacing of recent frames are kept for statistics
+    """
+
+    FPS = 60  # frames per second when the target is not given
+    HIDDEN_FPS = 15  # frames per second while hidden, the interval must stay under Mixer.LATENCY so sounds are on time
+    HISTORY = 120  # number of frames kept for statistics
+    QUALITY_STEPS = 3  # how many times the quality can be lowered
+    DEGRADE_LOAD = .9  # the quality is lowered when frames use more than this fraction of the interval
+    RESTORE_LOAD = .5  # the quality is raised when frames use less than this fraction of the interval
+    ADJUST_FRAMES = 30  # frames between quality changes so each change is measured before the next one
+
+    def __init__(self, widget, callback, fps: float = FPS):
+        """
+        creates the scheduler, frames are not run until it is started
+
+        :param widget: the widget whose event loop runs the frames
+        :param callback: the function that does the work of a frame
+        :param fps: the target number of frames per second
+        """
+
+        self.widget = widget
+        self.callback = callback
+        self.fps = fps
+        self.after_frame = None
+        self.frame = 0  # the number of frames run
+        self.deadline = perf_counter()  # when the current frame should have started
+        self.last_start = None  # when the last frame started
+        self.hidden = False  # whether the widget was not visible at the start of the current frame
+
+        # quality fields, degradation is the number of steps the quality has been lowered by
+        self.degradation = 0
+        self.frames = 0  # frames since the quality last changed
+        self.dropped = 0  # frames dropped since the quality last changed
+
+        # statistic fields
+        self.work = deque(maxlen=FrameScheduler.HISTORY)  # seconds spent in the callback of each frame
+        self.spacing = deque(maxlen=FrameScheduler.HISTORY)  # seconds between the start of each frame and the last
+        self.total_dropped = 0
+
+    fps = property(lambda self: self._fps, lambda self, fps: setattr(self, "_fps", max(float(fps), 1)))
+
+    def start(self):
+        """
+        starts running frames, the first frame is run as soon as possible
+        """
+
+        self.stop()
+        self.deadline, self.last_start = perf_counter(), None
+        self.after_frame = self.widget.after(0, self.run)
+
+    def stop(self):
+        """
+        stops running frames
+        """
+
+        self.widget.after_cancel(self.after_frame) if self.after_frame else None
+        self.after_frame = None
+
+    def run(self):
+        """
+        runs a frame
+            --> drops the frames that were missed and schedules the next frame for the next deadline
+            --> runs the callback and measures how long it took
+            --> lowers or raises the quality from the recent work times
+        """
+
+        # measures the spacing of frames and checks if the widget can be seen
+        start = perf_counter()
+        self.spacing.append(start - self.last_start) if self.last_start else None
+        self.last_start = start
+        self.hidden = not self.widget.winfo_viewable()
+        interval = 1 / (FrameScheduler.HIDDEN_FPS if self.hidden else self.fps)
+
+        # drops missed frames and schedules the next frame before the work so a slow frame can't delay it further
+        missed = int((start - self.deadline) // interval)
+        self.deadline += (missed + 1) * interval if missed >= 1 else interval
+        self.dropped += max(missed, 0)
+        self.total_dropped += max(missed, 0)
+        self.after_frame = self.widget.after(max(round((self.deadline - perf_counter()) * 1000), 0), self.run)
+
+        # runs the frame
+        self.frame += 1
+        self.callback()
+        self.work.append(perf_counter() - start)
+        self.adjust(interval) if not self.hidden else None
+
+    def adjust(self, interval: float):
+        """
+        lowers the quality by a step when recent frames used too much of the interval or were dropped and raises it by
+        a step when they used little of it
+
+        :param interval: the seconds between frames
+        """
+
+        # waits for enough frames to measure the last change
+        self.frames += 1
+        if self.frames < FrameScheduler.ADJUST_FRAMES:
+            return
+
+        # changes the quality
+        load = mean(list(self.work)[-FrameScheduler.ADJUST_FRAMES:]) / interval
+        if (load > FrameScheduler.DEGRADE_LOAD or self.dropped) and self.degradation < FrameScheduler.QUALITY_STEPS:
+            self.degradation += 1
+        elif load < FrameScheduler.RESTORE_LOAD and not self.dropped and self.degradation > 0:
+            self.degradation -= 1
+        self.frames, self.dropped = 0, 0
+
+    def stats(self) -> dict:
+        """
+        summarizes the recent frames
+
+        :return: the actual frames per second, the average, 95th percentile and maximum work time in milliseconds,
+            the number of dropped frames and the number of quality steps lowered
+        """
+
+        work, spacing = array(self.work) * 1000, array(self.spacing)
+        return {"fps": 1 / mean(spacing) if len(spacing) else 0, "work": mean(work) if len(work) else 0,
+                "work_p95": percentile(work, 95) if len(work) else 0, "work_max": work.max() if len(work) else 0,
+                "dropped": self.total_dropped, "degradation": self.degradation}
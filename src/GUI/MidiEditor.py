@@ -2,12 +2,12 @@ from os.path import exists
 from scipy.io.wavfile import write
 from Physics.Planet import Planet
 from customtkinter import CTkCanvas, CTkFrame, CTkButton, CTkLabel, ScalingTracker
-from numpy import full, append, delete, int16
+from numpy import full, append, delete
 from random import randint
 from math import floor
 from librosa import midi_to_note
-from librosa.effects import pitch_shift
 from GUI.PlanetEditor import PlanetEditor
+from AudioEngine.PitchShifter import PitchShifter
 
 
 # noinspection PyPropertyDefinition
@@ -52,16 +52,19 @@ class MidiEditor(CTkFrame):
         remove_column = CTkButton(self, text="Remove Column", command=lambda: self.modify_editor(1, "remove"))
         add_row = CTkButton(self, text="Add Row", command=lambda: self.modify_editor(0, "add"))
         remove_row = CTkButton(self, text="Remove Row", command=lambda: self.modify_editor(0, "remove"))
+        self.nest_button = CTkButton(self, text="Nest Moons", command=lambda: self.nest_moons(self.sample, not (
+            self.planet_manager.samples[self.sample].get("nested", False))))
 
         # places buttons
         add_column.grid(row=0, column=1, sticky="ew")
         remove_column.grid(row=0, column=2, sticky="ew")
         add_row.grid(row=0, column=3, sticky="ew")
         remove_row.grid(row=0, column=4, sticky="ew")
+        self.nest_button.grid(row=0, column=5, sticky="ew")
 
         # creates canvas
         self.canvas = CTkCanvas(self, bg=self.cget("fg_color"), highlightthickness=0)
-        self.canvas.grid(row=1, column=1, columnspan=4, sticky="nsew")
+        self.canvas.grid(row=1, column=1, columnspan=5, sticky="nsew")
         self.canvas.bind("<Configure>", lambda e: self.load_sample(self.sample))
 
         # configures resizing
@@ -70,8 +73,9 @@ class MidiEditor(CTkFrame):
         self.columnconfigure(2, weight=1)
         self.columnconfigure(3, weight=1)
         self.columnconfigure(4, weight=1)
+        self.columnconfigure(5, weight=1)
 
-    def update_column(self, column_num):
+    def update_column(self, column_num: int, sample: str = None):
         """
         updates a column to ensure the following:
             --> nothing happens if column is empty
@@ -79,14 +83,18 @@ class MidiEditor(CTkFrame):
             --> remaining celestial bodies are moons
             --> converts a moon to a planet if no planets exists
             --> planet is at the lowest index
+            --> moons orbit the planet, or the body above them when the sample has nested moons
 
         :param column_num: the index of the column to update
+        :param sample: the name of the sample the column belongs to, defaults to the loaded sample
         """
 
         # gets the column as a 1d array without null values
-        column = self.planet_manager.samples[self.sample]["midi_array"][:, column_num]
+        sample = self.planet_manager.samples[sample if sample else self.sample]
+        column = sample["midi_array"][:, column_num]
         moon_period = (len(column) - 1) * MidiEditor.PERIOD_FACTOR
-        planet_period = len(self.planet_manager.samples[self.sample]["midi_array"][0])
+        planet_period = len(sample["midi_array"][0])
+        nested = sample.get("nested", False)
         column = [elem for elem in column if elem is not None]
 
         # handles when column is empty
@@ -95,14 +103,41 @@ class MidiEditor(CTkFrame):
 
         # ensures first element is a planet
         if type(column[0]) != Planet:
+            column[0].planet.moons.remove(column[0]) if column[0] in column[0].planet.moons else None
             column[0].convert(planet_period, column_num / planet_period)
 
-        # ensures remaining elements are moons
+        # ensures remaining elements are moons of the planet or of the moon above them
         for i, elem in enumerate(column[1:]):
-            elem.convert(column[0], moon_period, (i * MidiEditor.PERIOD_FACTOR) / moon_period) if type(elem) == Planet \
-                else elem.__init__(column[0], elem.period, elem.radius, elem.color, elem.pitch, elem.sound_path, (
-                    i * MidiEditor.PERIOD_FACTOR) / moon_period)
-            column[0].moons.append(elem) if elem not in column[0].moons else None
+            parent = column[i] if nested else column[0]
+            period = moon_period / (i + 1) if nested else moon_period
+            offset = (i * MidiEditor.PERIOD_FACTOR) / moon_period
+            if type(elem) != Planet and elem.planet is not parent and elem in elem.planet.moons:
+                elem.planet.moons.remove(elem)
+            elem.convert(parent, period, offset) if type(elem) == Planet \
+                else elem.__init__(parent, period, elem.radius, elem.color, elem.pitch, elem.sound_path, offset)
+            parent.moons.append(elem) if elem not in parent.moons else None
+
+    def nest_moons(self, sample: str, nested: bool, add_state: bool = True):
+        """
+        sets if the moons of each column in a sample should orbit the moon above them rather than the planet and updates
+        every column of the sample
+
+        :param sample: the name of the sample to update
+        :param nested: determines if the moons should be nested
+        :param add_state: determines if the action should be added to the state manager
+        """
+
+        # adds state to state manager
+        undo = [(self.nest_moons, (sample, self.planet_manager.samples[sample].get("nested", False), False))]
+        redo = [(self.nest_moons, (sample, nested, False))]
+        self.planet_manager.state_manager.add_state({"undo": undo, "redo": redo, "samples": [sample]}) if add_state \
+            else None
+
+        # updates the sample
+        self.planet_manager.samples[sample]["nested"] = nested
+        for column_num in range(len(self.planet_manager.samples[sample]["midi_array"][0])):
+            self.update_column(column_num, sample)
+        self.nest_button.configure(text="Flatten Moons" if nested else "Nest Moons") if sample == self.sample else None
 
     def click(self, row: int, col: int, right: bool = False, planet: Planet = None):
         """
@@ -126,7 +161,8 @@ class MidiEditor(CTkFrame):
                 sample[row, col], modify_state=self.click_and_drag) if not planet else None
 
             # updates state and midi editor
-            self.planet_manager.state_manager.add_state({"undo": state, "redo": state}, True) if not planet else None
+            state = {"undo": state, "redo": state, "samples": [self.sample]}
+            self.planet_manager.state_manager.add_state(state, True) if not planet else None
             self.canvas.itemconfig(tag, fill=self.canvas.cget("bg"))
             sample[row, col] = None
             self.update_column(col)
@@ -147,13 +183,8 @@ class MidiEditor(CTkFrame):
 
                 # Make the pitch shifted file
                 steps_to_shift = pitch - self.planet_manager.samples[self.sample]["pitch"]
-                signal = self.planet_manager.samples[self.sample]["shifted_signal_array"]
                 sr = self.planet_manager.samples[self.sample]["sample_rate"]
-                left, right = self.planet_manager.samples[self.sample]["crops"]
-                shifted_signal = pitch_shift(y=signal.astype(float),
-                                                             sr=sr,
-                                                             n_steps=steps_to_shift)
-                write(sample_path, sr, shifted_signal[left:right].astype(int16))
+                write(sample_path, sr, PitchShifter.shift(self.planet_manager.samples[self.sample], steps_to_shift))
 
             # updates midi color, adds state and planet
             sample_path = sample_path if ("shifted_signal_array" in self.planet_manager.samples[self.sample]) and (self.planet_manager.samples[self.sample]["shifted_signal_array"] is not None) else None
@@ -163,7 +194,8 @@ class MidiEditor(CTkFrame):
             self.canvas.itemconfig(tag, fill=sample[row, col].color)
             state = [(self.click, (row, col, right, sample[row, col]))]
             self.planet_manager.add_planet(sample[row, col], modify_state=self.click_and_drag) if not planet else None
-            self.planet_manager.state_manager.add_state({"undo": state, "redo": state}, True) if not planet else None
+            state = {"undo": state, "redo": state, "samples": [self.sample]}
+            self.planet_manager.state_manager.add_state(state, True) if not planet else None
             self.update_column(col)
 
     def load_sample(self, sample: str, update: bool = False):
@@ -184,6 +216,8 @@ class MidiEditor(CTkFrame):
             self.planet_manager.samples[sample]["midi_array"] = self.DEFAULT_EDITOR
 
         # loads the sample
+        nested = self.planet_manager.samples[sample].get("nested", False)
+        self.nest_button.configure(text="Flatten Moons" if nested else "Nest Moons")
         [label.destroy() for label in self.pitch_labels]
         self.canvas.delete("all")
         self.sample = sample
@@ -240,9 +274,9 @@ class MidiEditor(CTkFrame):
             # adds midi state to state manager
             redo = [(self.planet_manager.samples[self.sample].update, (
                 {"midi_array": self.planet_manager.samples[self.sample]["midi_array"]}, ))]
-            self.planet_manager.state_manager.add_state({"undo": undo, "redo": redo})
+            self.planet_manager.state_manager.add_state({"undo": undo, "redo": redo, "samples": [self.sample]})
             state = [(self.load_sample, (self.sample, True), {})]
-            self.planet_manager.state_manager.add_state({"undo": state, "redo": state}, True)
+            self.planet_manager.state_manager.add_state({"undo": state, "redo": state, "samples": [self.sample]}, True)
 
         # handles removing from the editor
         else:
@@ -258,14 +292,14 @@ class MidiEditor(CTkFrame):
             # adds midi state to state manager
             redo = [(self.planet_manager.samples[self.sample].update, (
                 {"midi_array": self.planet_manager.samples[self.sample]["midi_array"]}, ))]
-            self.planet_manager.state_manager.add_state({"undo": undo, "redo": redo})
+            self.planet_manager.state_manager.add_state({"undo": undo, "redo": redo, "samples": [self.sample]})
             state = [(self.load_sample, (self.sample, True))]
-            self.planet_manager.state_manager.add_state({"undo": state, "redo": state}, True)
+            self.planet_manager.state_manager.add_state({"undo": state, "redo": state, "samples": [self.sample]}, True)
 
             # removes planets from planet manager and adds manager state to state manager
             undo = [(lambda: [self.planet_manager.add_planet(p, False) for p in pop], ())]
             redo = [(lambda: [self.planet_manager.remove_planet(p, False) for p in pop], ())]
-            self.planet_manager.state_manager.add_state({"undo": undo, "redo": redo}, True)
+            self.planet_manager.state_manager.add_state({"undo": undo, "redo": redo, "planets": pop}, True)
             for planet in pop:
                 self.planet_manager.remove_planet(planet, False)
 
@@ -287,12 +321,14 @@ class MidiEditor(CTkFrame):
                     old_args.insert(0, planet.planet)
                     new_args.insert(0, planet.planet)
                     period = len(self.planet_manager.samples[self.sample]["midi_array"]) - 1
-                    new_args[1] = period * MidiEditor.PERIOD_FACTOR
-                    new_args[-1] = (row_num * MidiEditor.PERIOD_FACTOR) / new_args[1]
+                    period *= MidiEditor.PERIOD_FACTOR
+                    new_args[1] = period / planet.depth
+                    new_args[-1] = (row_num * MidiEditor.PERIOD_FACTOR) / period
 
                 # updates the planet
                 planet.__init__(*new_args)
-                state = {"undo": [(planet.__init__, old_args)], "redo": [(planet.__init__, new_args)]}
+                state = {"undo": [(planet.__init__, old_args)], "redo": [(planet.__init__, new_args)],
+                         "planets": [planet]}
                 self.planet_manager.state_manager.add_state(state, True)
 
         # reapplies focus
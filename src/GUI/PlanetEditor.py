@@ -72,7 +72,7 @@ class PlanetEditor(CTkToplevel):
         self.planet.update = False
         self.planet.radius = self.size_slider.get()
         state = {"undo": [(self.size_slider.set, (self.old_r, ))],
-                 "redo": [(self.size_slider.set, (self.size_slider.get(), ))]}
+                 "redo": [(self.size_slider.set, (self.size_slider.get(), ))], "planets": [self.planet]}
         self.planet.state_manager.add_state(state, True)
         self.old_r = self.planet.radius
 
@@ -84,7 +84,7 @@ class PlanetEditor(CTkToplevel):
         """
 
         state = {"undo": [(self.shape_options.set, (self.planet.shape, ))],
-                 "redo": [(self.shape_options.set, (shape, ))]}
+                 "redo": [(self.shape_options.set, (shape, ))], "planets": [self.planet]}
         self.planet.shape = shape
         self.planet.state_manager.add_state(state, True)
 
@@ -100,5 +100,5 @@ class PlanetEditor(CTkToplevel):
             redo = [(self.midi.canvas.itemconfig, (self.tag,), {"fill": self.planet.color})]
 
             # adds state update and updates color of midi editor
-            self.planet.state_manager.add_state({"undo": undo, "redo": redo}, True)
+            self.planet.state_manager.add_state({"undo": undo, "redo": redo, "planets": [self.planet]}, True)
             self.midi.canvas.itemconfig(self.tag, fill=self.planet.color)
@@ -3,7 +3,8 @@ from os.path import isdir
 from os import mkdir
 from copy import deepcopy
 from customtkinter import CTkFrame, CTkLabel, CTkSlider, CTkButton, CTkTabview, CTkComboBox, CTkScrollableFrame, \
-    CTkRadioButton, StringVar
+    CTkRadioButton, StringVar, CTkSwitch
+from Physics.PlanetManager import PlanetManager
 
 
 class PlanetSettings(CTkFrame):
@@ -81,7 +82,7 @@ class PlanetSettings(CTkFrame):
         radio_button.configure(command=lambda: self.planet_manager.set_sample(self.sample.get()))
         copy.configure(command=lambda: self.copy_sample(name))
         delete.configure(command=lambda: self.planet_manager.delete_sample(name))
-        slider.bind("<ButtonRelease-1>", lambda e: self.set_volume(sample, slider))
+        slider.bind("<ButtonRelease-1>", lambda e: self.set_volume(name, sample, slider))
         slider.configure(command=lambda e: [planet.sound.set_volume(e) if planet.sound else None for
                                             planet in sample["midi_array"].flatten() if planet is not None] if
         "midi_array" in sample else None)
@@ -90,10 +91,11 @@ class PlanetSettings(CTkFrame):
         if name == "Default (No Audio)":
             delete.configure(state="disabled", fg_color="gray25")
 
-    def set_volume(self, sample, slider):
+    def set_volume(self, name: str, sample, slider):
         """
         sets the volume of a sample
 
+        :param name: the name of the sample
         :param sample: the sample to adjust
         :param slider: the slider object that controls the volume
         """
@@ -108,7 +110,8 @@ class PlanetSettings(CTkFrame):
                           (lambda: [planet.sound.set_volume(sample["volume"]) if planet.sound else None for planet in
                                     sample["midi_array"].flatten() if planet is not None] if "midi_array" in sample
                           else None, ()),
-                          (slider.set, (slider.get(), ))]}
+                          (slider.set, (slider.get(), ))],
+                 "samples": [name]}
         self.planet_manager.state_manager.add_state(state)
 
         # updates volume
@@ -194,6 +197,17 @@ class PlanetSettings(CTkFrame):
                                       command=self.reset_settings)
         self.reset_button.pack(pady=5)
 
+        #loop length and trigger density
+        self.loop_label = CTkLabel(parent, text="")
+        self.loop_label.pack(pady=(10, 0))
+
+        #plays the loop from a pre-rendered buffer once edits settle
+        self.bounce_switch = CTkSwitch(parent, text="Bounce Loop", command=lambda: setattr(
+            PlanetManager.BOUNCER, "enabled", bool(self.bounce_switch.get())))
+        self.bounce_switch.select() if PlanetManager.BOUNCER and PlanetManager.BOUNCER.enabled else None
+        self.bounce_switch.configure(state="normal" if PlanetManager.BOUNCER else "disabled")
+        self.bounce_switch.pack(pady=5)
+
         # #save button todo redundant
         # self.save_button = CTkButton(parent, text="Save",command=self.save_settings)
         # self.save_button.pack(pady=10)
@@ -206,6 +220,17 @@ class PlanetSettings(CTkFrame):
         if color:  # If a color is selected (not canceled)
             self.change_sun_color(color)
 
+    def display_loop(self, loop_length: float, density: float):
+        """
+        displays how long the solar system takes to repeat and how many sounds it plays per second
+
+        :param loop_length: the length of one repeat in seconds, None when the solar system has no repeat
+        :param density: the number of sounds played per second
+        """
+
+        text = f"Loop: {loop_length:g}s ({density:.1f} sounds/s)" if loop_length else "Loop: none"
+        self.loop_label.configure(text=text)
+
     def display_sun_size(self, r: int):
         """
         updates the UI to display the new sun size while sliding, but doesnt add the change to the state manager
@@ -221,7 +246,8 @@ class PlanetSettings(CTkFrame):
         self.planet_manager.get_sun().update = False
         self.planet_manager.get_sun().radius = self.size_slider.get()
         state = {"undo": [(self.size_slider.set, (self.old_sun_r, ))],
-                 "redo": [(self.size_slider.set, (self.size_slider.get(), ))]}
+                 "redo": [(self.size_slider.set, (self.size_slider.get(), ))],
+                 "planets": [self.planet_manager.get_sun()]}
         self.planet_manager.state_manager.add_state(state, True)
         self.old_sun_r = self.planet_manager.get_sun().radius
 
@@ -242,7 +268,7 @@ class PlanetSettings(CTkFrame):
         # if hasattr(self, "planet_manager") and self.planet_manager: todo redundant
         sun = self.planet_manager.get_sun()
         state = {"undo": [(self.shape_options.set, (sun.shape, ))],
-                 "redo": [(self.shape_options.set, (shape, ))]}
+                 "redo": [(self.shape_options.set, (shape, ))], "planets": [sun]}
         sun.shape = shape  # Store the shape in the sun object
         self.planet_manager.state_manager.add_state(state, True)
         # sun.update = True  # Mark the sun for UI update todo already handled by planet class
@@ -0,0 +1,167 @@
+from Physics.Planet import Planet
+from PIL import Image, ImageDraw, ImageTk
+from numpy import array, arctan2, linspace, cos, sin, pi, clip, floor
+from time import perf_counter
+
+
+class RasterRenderer:
+    """
+    draws the whole solar system into an off-screen image every frame and shows it on the canvas as a single photo
+    image, the cost of the canvas no longer depends on the number of bodies
+        --> the frame has a transparent background so the stars and buttons of the canvas are still drawn around it
+        --> nothing is kept between frames, every visible path, trigger, body and point is drawn again each frame
+        --> circles too large to draw directly are drawn as the part of their outline that can be on screen
+    """
+
+    # drawing function and vertices of each planet shape, vertices are multiples of the radius in the form [x1, y1, ...]
+    SHAPES = {"Circle": ("ellipse", (-1, -1, 1, 1)), "Square": ("rectangle", (-1, -1, 1, 1)),
+              "Triangle": ("polygon", (0, -1, -1, 1, 1, 1)), "Rectangle": ("rectangle", (-1, -.5, 1, .5))}
+    ARC_RADIUS = 8192  # pixels, larger circles are drawn from the part of their outline that is on screen
+    ARC_STEP = 8  # pixels between the points of a large circle
+
+    def __init__(self, canvas):
+        """
+        creates the renderer
+
+        :param canvas: the canvas to draw on
+        """
+
+        self.canvas = canvas
+        self.image = None  # the photo image shown on the canvas
+        self.item = None  # the canvas item of the photo image
+        self.flashes = {}  # when each triggered planet stops being drawn white in the form planet: time
+
+    def sync(self, removed: list, added: list):
+        """
+        forgets the flashes of removed planets, nothing else is kept between frames
+
+        :param removed: the planets that were removed since the last frame
+        :param added: the planets that were added since the last frame
+        """
+
+        [self.flashes.pop(planet, None) for planet in removed]
+
+    def draw(self, updated: list, planets: set, paths: set, points: array):
+        """
+        draws a frame, see TkRenderer.draw for the parameters
+        """
+
+        # draws the frame and shows it on the canvas
+        frame = self.render(planets, paths, points)
+        if self.image is None or (self.image.width(), self.image.height()) != frame.size:
+            self.canvas.delete(self.item) if self.item else None
+            self.image = ImageTk.PhotoImage(frame, master=self.canvas)
+            self.item = self.canvas.create_image(0, 0, image=self.image, anchor="nw", tags="frame")
+            self.canvas.tag_lower("frame", "buttons")
+        else:
+            self.image.paste(frame)
+            self.canvas.coords(self.item, 0, 0)
+
+    def render(self, planets: set, paths: set, points: array) -> Image.Image:
+        """
+        draws every visible path, trigger, body and point into an image the size of the canvas
+
+        :param planets: the planets drawn as shapes
+        :param paths: the planets whose orbit path is drawn
+        :param points: the orbit store index of each body drawn as a point
+
+        :return: the frame as an RGBA image with a transparent background
+        """
+
+        canvas, store = self.canvas, self.canvas.planet_manager.orbits
+        zoom, origin = canvas.zoom[0, 0], -canvas.space_position[0] * canvas.zoom[0, 0]
+        size = tuple(int(length) for length in canvas.canvas_size)
+        frame = Image.new("RGBA", (max(size[0], 1), max(size[1], 1)))
+        draw = ImageDraw.Draw(frame)
+
+        # draws paths and triggers, paths of moons are centered on their parent and paths of planets on the origin
+        for planet in paths:
+            parent = store.parent[planet.index]
+            center = (store.position[parent] - canvas.space_position[0]) * zoom if parent >= 0 else origin
+            self.circle(draw, center, store.orbital_radius[planet.index] * zoom, outline="gray")
+            if type(planet) == Planet:
+                length, radius = planet.radius * canvas.TRIGGER_SIZE * zoom, planet.orbital_radius * zoom
+                draw.line([origin[0], origin[1] - radius + length, origin[0], origin[1] - radius - length], fill="gray")
+
+        # draws planets, triggered planets are white for a moment
+        now = perf_counter()
+        self.flashes = {planet: end for planet, end in self.flashes.items() if end > now}
+        for planet in planets:
+            center = (store.position[planet.index] - canvas.space_position[0]) * zoom
+            radius, color = store.radius[planet.index] * zoom, "white" if planet in self.flashes else planet.color
+            function, vertices = RasterRenderer.SHAPES[planet.shape]
+            if function == "ellipse":
+                self.circle(draw, center, radius, fill=color)
+            else:
+                getattr(draw, function)((array(vertices).reshape(-1, 2) * radius + center).ravel().tolist(), fill=color)
+
+        # draws points
+        positions = floor((store.position[points] - canvas.space_position[0]) * zoom).tolist()
+        for (x, y), index in zip(positions, points.tolist()):
+            draw.point((x, y), fill=store.bodies[index].color)
+
+        return frame
+
+    def circle(self, draw: ImageDraw.ImageDraw, center: array, radius: float, **kwargs):
+        """
+        draws a circle, circles larger than ARC_RADIUS are drawn from the part of their outline that faces the screen
+        since drawing them whole takes time proportional to their size
+
+        :param draw: the drawing context of the frame
+        :param center: the center of the circle on the canvas in the form [x, y]
+        :param radius: the radius of the circle in pixels
+        :param kwargs: the fill or outline of the circle
+        """
+
+        # handles circles that are small enough to draw directly
+        if radius <= RasterRenderer.ARC_RADIUS:
+            return draw.ellipse([*(center - radius), *(center + radius)], **kwargs)
+
+        # handles filled circles that cover the whole screen
+        size = self.canvas.canvas_size
+        if (center >= 0).all() and (center <= size).all():
+            return draw.rectangle([0, 0, *size], fill=kwargs["fill"]) if "fill" in kwargs else None
+
+        # finds the range of angles that can be on screen from the angles of the corners of the screen
+        corners = array([[0, 0], [size[0], 0], [0, size[1]], size]) - center
+        angles = arctan2(corners[:, 1], corners[:, 0])
+        angles = angles[0] + (angles - angles[0] + pi) % (2 * pi) - pi
+        steps = int(clip(radius * (angles.max() - angles.min()) / RasterRenderer.ARC_STEP, 8, 4096))
+        arc = linspace(angles.min(), angles.max(), steps)
+        outline = (center + radius * array([cos(arc), sin(arc)]).T).ravel().tolist()
+
+        # draws the arc, filled circles are drawn as a slice so that the inside of the arc is filled
+        if "fill" in kwargs:
+            return draw.polygon(outline + center.tolist(), fill=kwargs["fill"])
+        draw.line(outline, fill=kwargs["outline"])
+
+    def flash(self, triggered: list):
+        """
+        draws the planets that crossed their trigger this frame white for a moment starting with the next frame
+
+        :param triggered: the planets that crossed their trigger this frame
+        """
+
+        end = perf_counter() + self.canvas.NAV_BUTTON_CLICK_TIME / 1000
+        self.flashes.update((planet, end) for planet in triggered)
+
+    def move(self, amount: array):
+        """
+        moves the frame with the view, called by position events between frames
+
+        :param amount: how far to move in the form [dx, dy]
+        """
+
+        self.canvas.move(self.item, *amount) if self.item else None
+
+    def scale(self, center: array, amount: float):
+        """
+        scaling is left to the next frame since the frame is an image
+        """
+
+    def clear(self):
+        """
+        forgets every planet, used when a new project is loaded
+        """
+
+        self.flashes.clear()
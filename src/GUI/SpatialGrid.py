@@ -0,0 +1,105 @@
+from numpy import array, zeros, full, floor, clip, argsort, searchsorted, concatenate, arange, flatnonzero, int64
+
+
+class SpatialGrid:
+    """
+    a uniform grid over the screen positions of the bodies so that the bodies in a region or under the mouse can be
+    found without checking every body
+        --> bodies are bucketed by the cell of their center, the buckets are one array of cell keys sorted so that each
+            column of cells is a contiguous range
+        --> bodies larger than a cell are kept in a separate list that is always checked so that one large body does
+            not widen every query
+        --> the grid is rebuilt every frame from the positions in the orbit store
+    """
+
+    CELL_SIZE = 64  # pixels
+    CELL_LIMIT = 2 ** 29  # cells are clamped to this range so that keys never overflow
+
+    def __init__(self, cell_size: int = CELL_SIZE):
+        """
+        creates an empty grid
+
+        :param cell_size: the width and height of each cell in pixels
+        """
+
+        self.cell_size = cell_size
+        self.centers = zeros((0, 2))
+        self.radii = zeros(0)
+        self.keys = zeros(0, dtype=int64)  # sorted cell key of each small body
+        self.order = zeros(0, dtype=int64)  # index of the body of each key
+        self.large = zeros(0, dtype=int64)  # indices of the bodies larger than a cell
+
+    @staticmethod
+    def key(x: array, y: array) -> array:
+        """
+        combines the column and row of cells into keys that sort by column and then row
+
+        :param x: the column of each cell
+        :param y: the row of each cell
+
+        :return: the key of each cell
+        """
+
+        return (x + SpatialGrid.CELL_LIMIT) * (4 * SpatialGrid.CELL_LIMIT) + (y + SpatialGrid.CELL_LIMIT)
+
+    def get_cells(self, coordinates: array) -> array:
+        """
+        :param coordinates: screen coordinates in the form [..., [x, y]]
+
+        :return: the column and row of the cell containing each coordinate
+        """
+
+        return clip(floor(coordinates / self.cell_size), -SpatialGrid.CELL_LIMIT, SpatialGrid.CELL_LIMIT).astype(int64)
+
+    def build(self, centers: array, radii: array, include: array = None):
+        """
+        replaces the contents of the grid
+
+        :param centers: the screen position of each body in the form [[x, y], ...]
+        :param radii: the screen radius of each body
+        :param include: which bodies to add to the grid, every body when not given
+        """
+
+        self.centers, self.radii = centers, radii
+        include = full(len(radii), True) if include is None else include
+        small = (radii <= self.cell_size) & include
+        self.large = flatnonzero(include & ~small)
+        indices = flatnonzero(small)
+        cells = self.get_cells(centers[indices])
+        keys = self.key(cells[:, 0], cells[:, 1])
+        order = argsort(keys, kind="stable")
+        self.keys, self.order = keys[order], indices[order]
+
+    def query(self, lower: array, upper: array) -> array:
+        """
+        finds every body whose bounding box overlaps a region of the screen
+
+        :param lower: the top left corner of the region in the form [x, y]
+        :param upper: the bottom right corner of the region in the form [x, y]
+
+        :return: the indices of the bodies in the region
+        """
+
+        # finds the range of keys of each column of cells, widened by one cell for bodies that overhang their cell
+        (x1, y1), (x2, y2) = self.get_cells(array([lower, upper]) + array([[-1], [1]]) * self.cell_size)
+        columns = arange(x1, x2 + 1)
+        starts = searchsorted(self.keys, self.key(columns, y1))
+        ends = searchsorted(self.keys, self.key(columns, y2), side="right")
+        candidates = concatenate([self.order[start:end] for start, end in zip(starts, ends) if end > start] +
+                                 [self.large])
+
+        # keeps the bodies that really overlap the region
+        centers, radii = self.centers[candidates], self.radii[candidates, None]
+        return candidates[((centers + radii >= lower) & (centers - radii <= upper)).all(axis=1)]
+
+    def pick(self, point: array) -> int:
+        """
+        finds the body under a point, when bodies overlap the smallest one is picked since it is the hardest to click
+
+        :param point: the screen position in the form [x, y]
+
+        :return: the index of the body, None if there is no body under the point
+        """
+
+        candidates = self.query(point, point)
+        return int(candidates[self.radii[candidates].argmin()]) if len(candidates) else None
@@ -0,0 +1,125 @@
+from numpy import array, zeros, arange, uint64, uint8, float64, stack, meshgrid, ceil, floor
+from collections import OrderedDict
+
+
+class StarField:
+    """
+    generates the positions of the background stars one chunk at a time
+        --> positions are a pure function of the seed, the chunk and the index of the star so a chunk always has the
+            same stars no matter when or in what order it is generated
+        --> every star of a batch of chunks is generated with a few vectorized integer operations by hashing a counter
+            (splitmix64) rather than by reseeding a random number generator per chunk
+        --> recently generated chunks are kept in a small LRU cache so that chunks scrolling back into view are not
+            generated again
+        --> a region of chunks can also be rasterized into a single image so the background can be drawn as one item
+    """
+
+    CACHE_SIZE = 1024  # chunks kept after they are unloaded
+    GAMMA = uint64(0x9E3779B97F4A7C15)  # golden ratio increment of splitmix64
+
+    def __init__(self, seed: int, chunk_size: float, stars_per_chunk: int, cache_size: int = CACHE_SIZE):
+        """
+        creates the star field
+
+        :param seed: the seed of the star field, only the lower 64 bits are used
+        :param chunk_size: the width and height of each chunk in space coordinates
+        :param stars_per_chunk: the number of stars in each chunk
+        :param cache_size: the number of chunks to keep in the cache
+        """
+
+        self.seed = uint64(seed & 0xFFFFFFFFFFFFFFFF)
+        self.chunk_size = chunk_size
+        self.stars_per_chunk = stars_per_chunk
+        self.cache_size = cache_size
+        self.chunks = OrderedDict()  # cached chunks in the form (x, y): star positions
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def mix(bits: array) -> array:
+        """
+        scrambles 64 bit integers so that nearby inputs give unrelated outputs (the splitmix64 finalizer)
+
+        :param bits: an array of 64 bit unsigned integers
+
+        :return: the scrambled integers
+        """
+
+        bits = (bits ^ (bits >> uint64(30))) * uint64(0xBF58476D1CE4E5B9)
+        bits = (bits ^ (bits >> uint64(27))) * uint64(0x94D049BB133111EB)
+        return bits ^ (bits >> uint64(31))
+
+    def generate(self, chunks: array) -> array:
+        """
+        generates the stars of a batch of chunks
+
+        :param chunks: the top left corner of each chunk in the form [[x, y], ...], corners are multiples of the chunk
+            size
+
+        :return: the position of each star in the form [[[x, y], ...stars of the chunk], ...chunks]
+        """
+
+        # gives each chunk its own key from its column and row
+        cells = (chunks // self.chunk_size).astype("int64").astype(uint64).reshape(-1, 2)
+        keys = StarField.mix(StarField.mix(self.seed + cells[:, 0] * StarField.GAMMA) + cells[:, 1])
+
+        # hashes a counter per coordinate of each star and keeps the top 53 bits as a float between 0 and 1
+        counters = (arange(self.stars_per_chunk * 2, dtype=uint64) + uint64(1)) * StarField.GAMMA
+        bits = StarField.mix(keys[:, None] + counters[None, :])
+        fractions = (bits >> uint64(11)).astype(float64) / 2 ** 53
+        return chunks.reshape(-1, 1, 2) + fractions.reshape(-1, self.stars_per_chunk, 2) * self.chunk_size
+
+    def get(self, chunks: array) -> array:
+        """
+        gets the stars of a batch of chunks from the cache, the chunks that are not cached are generated together
+
+        :param chunks: the top left corner of each chunk in the form [[x, y], ...]
+
+        :return: the position of each star in the form [[[x, y], ...stars of the chunk], ...chunks]
+        """
+
+        # finds the chunks that need to be generated
+        keys = [tuple(chunk) for chunk in chunks.tolist()]
+        missing = [index for index, key in enumerate(keys) if key not in self.chunks]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        # generates the missing chunks and evicts the least recently used ones
+        generated = self.generate(chunks[missing]) if missing else zeros((0, self.stars_per_chunk, 2))
+        for index, stars in zip(missing, generated):
+            self.chunks[keys[index]] = stars
+        stars = [self.chunks[key] for key in keys]
+        [self.chunks.move_to_end(key) for key in keys]
+        while len(self.chunks) > max(self.cache_size, len(keys)):
+            self.chunks.popitem(last=False)
+
+        return array(stars) if stars else zeros((0, self.stars_per_chunk, 2))
+
+    def rasterize(self, region: array, zoom: float) -> array:
+        """
+        draws every star in a region into a grayscale image, each star is a single white pixel
+
+        :param region: a region made of whole chunks in the form [[xmin, ymin], [xmax, ymax]]
+        :param zoom: the number of pixels per unit of space
+
+        :return: the image as rows of 8 bit pixels, the top left pixel is the top left corner of the region
+        """
+
+        # finds the pixel of each star in the region
+        columns, rows = (arange(region[0, axis], region[1, axis], self.chunk_size) for axis in (0, 1))
+        chunks = stack(meshgrid(columns, rows, indexing="ij"), axis=-1).reshape(-1, 2)
+        pixels = floor((self.get(chunks).reshape(-1, 2) - region[0]) * zoom).astype(int)
+
+        # lights the pixels that land inside the image
+        width, height = ceil((region[1] - region[0]) * zoom).astype(int)
+        image = zeros((height, width), dtype=uint8)
+        inside = (pixels[:, 0] >= 0) & (pixels[:, 0] < width) & (pixels[:, 1] >= 0) & (pixels[:, 1] < height)
+        image[pixels[inside, 1], pixels[inside, 0]] = 255
+        return image
+
+    def clear(self):
+        """
+        empties the cache
+        """
+
+        self.chunks.clear()
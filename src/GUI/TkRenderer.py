@@ -0,0 +1,265 @@
+from Physics.Planet import Planet
+from Physics.Moon import Moon
+from numpy import array, floor, tile
+
+
+class TkRenderer:
+    """
+    draws the solar system with a canvas item for every planet, path and trigger (the default renderer of the canvas)
+        --> items are kept between frames, only the attributes of a planet that changed since it was last drawn are
+            applied to its items
+        --> items that leave the screen or become too small are hidden rather than deleted
+        --> every item that moves is placed with a single batched tcl evaluation per frame
+        --> bodies drawn as points use a pool of items that is reused every frame
+    """
+
+    # canvas item and vertices of each planet shape, vertices are multiples of the radius in the form [x1, y1, x2, ...]
+    SHAPES = {"Circle": ("create_oval", (-1, -1, 1, 1)), "Square": ("create_rectangle", (-1, -1, 1, 1)),
+              "Triangle": ("create_polygon", (0, -1, -1, 1, 1, 1)), "Rectangle": ("create_rectangle", (-1, -.5, 1, .5))}
+
+    def __init__(self, canvas):
+        """
+        creates the renderer
+
+        :param canvas: the canvas to draw on
+        """
+
+        self.canvas = canvas
+        self.drawn = {}  # the attributes of each planet when its canvas items were last updated
+        self.shown = set()  # planets whose canvas item is not hidden
+        self.shown_paths = set()  # planets whose orbit path is not hidden
+        self.points = []  # pool of canvas items used to draw bodies as points in the form [item, color]
+        self.points_shown = 0  # the number of items in the pool that are not hidden
+        self.created = False  # whether items were created this frame and need to be leveled
+
+    def sync(self, removed: list, added: list):
+        """
+        applies the planets that were removed and added since the last frame
+            --> removes the items of removed planets
+            --> creates the paths of added planets, the rest is drawn when they are first updated
+
+        :param removed: the planets that were removed since the last frame
+        :param added: the planets that were added since the last frame
+        """
+
+        canvas = self.canvas
+
+        # deletes the items of removed planets
+        for planet in removed:
+            canvas.delete(planet.tag, f"path {planet.tag}", f"trigger {planet.tag}")
+            self.shown.discard(planet)
+            self.shown_paths.discard(planet)
+            self.drawn.pop(planet, None)
+
+        # adds the orbit paths of newly added planets
+        self.created = bool(added)
+        for planet in added:
+            if planet != canvas.planet_manager.get_sun():
+                canvas.create_oval(0, 0, 0, 0, outline="gray", width=1, tags=("paths", f"path {planet.tag}"),
+                                   state="hidden")
+
+    def draw(self, updated: list, planets: set, paths: set, points: array):
+        """
+        draws a frame
+            --> applies the attributes that changed to the items of updated planets
+            --> hides and shows items that left or entered the screen
+            --> places every item that is on screen
+
+        :param updated: the planets that were modified since the last frame
+        :param planets: the planets drawn as shapes
+        :param paths: the planets whose orbit path is drawn
+        :param points: the orbit store index of each body drawn as a point
+        """
+
+        canvas = self.canvas
+
+        # updates the items of planets that were modified, only the attributes that changed since the planet was last
+        # drawn are applied
+        for planet in updated:
+            drawn = self.drawn.setdefault(planet, {})
+            attributes = {"type": type(planet), "item": TkRenderer.SHAPES[planet.shape][0], "color": planet.color,
+                          "radius": planet.radius, "period": planet.period}
+            changed = {name for name, value in attributes.items() if drawn.get(name) != value}
+            drawn.update(attributes)
+            has_trigger = type(planet) == Planet and planet != canvas.planet_manager.get_sun()
+
+            # replaces the trigger and hides the path until it is culled when a planet becomes a moon or back
+            if "type" in changed:
+                self.created = True
+                canvas.delete(f"trigger {planet.tag}")
+                tags = ("triggers", f"trigger {planet.tag}")
+                canvas.create_line(0, 0, 0, 0, fill="gray", width=1, tags=tags, state="hidden") if has_trigger else None
+                canvas.itemconfig(f"path {planet.tag}", state="hidden")
+                self.shown_paths.discard(planet)
+
+            # updates path, moon paths are placed every frame with their parent
+            if changed.intersection(("type", "period")) and type(planet) != Moon:
+                p1 = canvas.space_to_canvas(array([planet.orbital_radius] * 2))[0]
+                p2 = canvas.space_to_canvas(array([- planet.orbital_radius] * 2))[0]
+                canvas.coords(f"path {planet.tag}", *p1, *p2)
+
+            # updates trigger
+            if changed.intersection(("type", "period", "radius")) and has_trigger:
+                length = planet.radius * canvas.TRIGGER_SIZE
+                p1 = canvas.space_to_canvas(array([0, -planet.orbital_radius + length]))[0]
+                p2 = canvas.space_to_canvas(array([0, -planet.orbital_radius - length]))[0]
+                canvas.coords(f"trigger {planet.tag}", *p1, *p2)
+
+            # recreates the shape only when it needs a different kind of canvas item, size and position are applied
+            # with every other planet in place_planets
+            if "item" in changed:
+                self.created = True
+                canvas.delete(planet.tag)
+                create, vertices = TkRenderer.SHAPES[planet.shape]
+                pos = canvas.space_to_canvas(planet.position)[0]
+                args = tile(pos, len(vertices) // 2) + array(vertices) * planet.radius * canvas.zoom[0, 0]
+                getattr(canvas, create)(*args, fill=planet.color, tags=("planets", planet.tag))
+                self.shown.add(planet)
+            elif "color" in changed:
+                canvas.itemconfig(planet.tag, fill=planet.color)
+
+        # hides planets and paths that left the screen or became too small and shows the ones that came back
+        [canvas.itemconfig(planet.tag, state="hidden") for planet in self.shown.difference(planets)]
+        [canvas.itemconfig(planet.tag, state="normal") for planet in planets.difference(self.shown)]
+        for planet in self.shown_paths.symmetric_difference(paths):
+            state = "normal" if planet in paths else "hidden"
+            canvas.itemconfig(f"path {planet.tag}", state=state)
+            canvas.itemconfig(f"trigger {planet.tag}", state=state) if type(planet) == Planet else None
+        self.shown, self.shown_paths = planets, paths
+
+        # moves planets, points and moon paths that are on screen with a single tcl evaluation
+        commands = self.place_planets(planets) + self.place_paths(paths) + self.draw_points(points)
+        canvas.tk.eval("\n".join(commands)) if commands else None
+
+        # ensures proper leveling of canvas items
+        if self.created:
+            canvas.tag_lower("planets", "buttons")
+            canvas.tag_lower("paths", "planets")
+            canvas.tag_lower("triggers", "planets")
+
+    def flash(self, triggered: list):
+        """
+        colors the planets that crossed their trigger this frame white for a moment, only planets on screen are colored
+
+        :param triggered: the planets that crossed their trigger this frame
+        """
+
+        canvas = self.canvas
+        for planet in self.shown.intersection(triggered):
+            canvas.itemconfig(planet.tag, fill="white")
+            canvas.after(canvas.NAV_BUTTON_CLICK_TIME, lambda p=planet: canvas.itemconfig(p.tag, fill=p.color))
+
+    def coords_commands(self, tags: list, coords: array) -> list[str]:
+        """
+        creates the tcl commands that set the coordinates of canvas items so that they can be evaluated in one batch
+        rather than with a round trip per item
+
+        :param tags: the tag or id of each canvas item
+        :param coords: the coordinates of each item in the form [[x1, y1, x2, y2, ...], ...]
+
+        :return: a coords command for each item
+        """
+
+        command = f"{self.canvas._w} coords {{%s}}" + " %.1f" * coords.shape[1]
+        return [command % (tag, *row) for tag, row in zip(tags, coords.tolist())]
+
+    def place_planets(self, planets: set) -> list[str]:
+        """
+        finds where the shape of each planet should be drawn from its position and radius in the orbit store, the
+        vertices of every planet with the same shape are computed at once
+
+        :param planets: the planets to place
+
+        :return: the commands that move the shapes of the planets
+        """
+
+        store, zoom = self.canvas.planet_manager.orbits, self.canvas.zoom[0, 0]
+        commands = []
+        for shape, (_, vertices) in TkRenderer.SHAPES.items():
+            group = [planet for planet in planets if planet.shape == shape]
+            indices = array([planet.index for planet in group], dtype=int)
+            centers = (store.position[indices] - self.canvas.space_position[0]) * zoom
+            coords = tile(centers, len(vertices) // 2) + array(vertices) * store.radius[indices, None] * zoom
+            commands += self.coords_commands([planet.tag for planet in group], coords)
+
+        return commands
+
+    def place_paths(self, planets: set) -> list[str]:
+        """
+        finds where the paths of moons should be drawn from the position of their parent in the orbit store, paths of
+        planets are centered on the origin so they are only moved by position and zoom events
+
+        :param planets: the planets and moons whose paths are on screen
+
+        :return: the commands that move the paths of the moons
+        """
+
+        store, zoom = self.canvas.planet_manager.orbits, self.canvas.zoom[0, 0]
+        moons = [planet for planet in planets if type(planet) == Moon]
+        indices = array([moon.index for moon in moons], dtype=int)
+        centers = (store.position[store.parent[indices]] - self.canvas.space_position[0]) * zoom
+        coords = tile(centers, 2) + array([-1, -1, 1, 1]) * store.orbital_radius[indices, None] * zoom
+        return self.coords_commands([f"path {moon.tag}" for moon in moons], coords)
+
+    def draw_points(self, indices: array) -> list[str]:
+        """
+        draws bodies as single pixel points, the canvas items are kept in a pool and reused every frame so that items
+        are only created when more points are needed than ever before
+
+        :param indices: the orbit store index of each body to draw
+
+        :return: the commands that move the points
+        """
+
+        # shows and colors each point, creating new items when the pool runs out
+        canvas, store = self.canvas, self.canvas.planet_manager.orbits
+        positions = floor((store.position[indices] - canvas.space_position[0]) * canvas.zoom[0, 0])
+        for point, ((x, y), index) in enumerate(zip(positions.tolist(), indices.tolist())):
+            color = store.bodies[index].color
+            if point == len(self.points):
+                self.points.append([canvas.create_rectangle(x, y, x, y, outline=color, tags="points"), color])
+                canvas.tag_lower("points", "buttons")
+                continue
+
+            item = self.points[point]
+            canvas.itemconfig(item[0], state="normal") if point >= self.points_shown else None
+            if color != item[1]:
+                canvas.itemconfig(item[0], outline=color)
+                item[1] = color
+
+        # hides the rest of the pool
+        [canvas.itemconfig(item, state="hidden") for item, _ in self.points[len(indices):self.points_shown]]
+        self.points_shown = len(indices)
+
+        return self.coords_commands([item for item, _ in self.points[:len(indices)]], tile(positions, 2))
+
+    def move(self, amount: array):
+        """
+        moves every item with the view, called by position events between frames
+
+        :param amount: how far to move in the form [dx, dy]
+        """
+
+        for tag in ("planets", "triggers", "paths", "points"):
+            self.canvas.move(tag, *amount)
+
+    def scale(self, center: array, amount: float):
+        """
+        scales every item with the view, called by zoom events between frames
+
+        :param center: the point on the canvas to scale around in the form [x, y]
+        :param amount: how much to scale by
+        """
+
+        for tag in ("planets", "triggers", "paths", "points"):
+            self.canvas.scale(tag, *center, amount, amount)
+
+    def clear(self):
+        """
+        deletes every planet item, used when a new project is loaded and every planet will be added again
+        """
+
+        self.canvas.delete("planets", "paths", "triggers")
+        self.drawn.clear()
+        self.shown.clear()
+        self.shown_paths.clear()
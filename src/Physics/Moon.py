@@ -1,6 +1,6 @@
 from Physics.Planet import Planet
-from numpy import array, copy
-from math import cos, sin, pi, atan2
+from numpy import array
+from math import cos, sin, pi
 from copy import deepcopy
 
 
@@ -15,7 +15,7 @@ class Moon(Planet):
         """
         creates the planet with the given attributes
 
-        :param planet: the planet for which the moon will orbit
+        :param planet: the planet for which the moon will orbit, can be another moon
         :param period: how long it takes the planet to revolve
         :param radius: the radius of the planet
         :param color: the color of the planet
@@ -29,40 +29,11 @@ class Moon(Planet):
         self.planet = planet
 
         # physics fields
-        self.center = array([planet.original_position[0], planet.original_position[1]])
         orig_x = planet.original_position[0] + self.orbital_radius * cos(pi * 2 * (self.offset + .25))
         orig_y = planet.original_position[1] + self.orbital_radius * -sin(pi * 2 * (self.offset + .25))
         self.original_position = array([orig_x, orig_y])
         self.position = self.original_position.copy()
 
-    def update_physics(self, dt: float):
-        """
-        updates the physics of the moon
-
-        :param dt: the time that has passed since the last update
-        """
-
-        # centering at 0,0 for polar coordinates
-        self.position = self.position if not self.update else copy(self.original_position)
-        self.center = self.center if not self.update else self.planet.original_position
-        rel_x = self.position[0] - self.center[0]
-        rel_y = self.position[1] - self.center[1]
-
-        # Apply rotation matrix and use polar coordinates
-        angular_speed = 2 * pi / self.period
-        rel_angle = atan2(rel_y, rel_x)
-        new_angle = rel_angle + angular_speed * dt
-
-        # switch back to rectangular coordinates
-        moon_new_x = self.planet.position[0] + self.orbital_radius * cos(new_angle)
-        moon_new_y = self.planet.position[1] + self.orbital_radius * sin(new_angle)
-
-        # Update absolute position and returns
-        result = self.center[0] < 0 <= self.planet.position[0] and (not self.update)
-        self.center = self.planet.position
-        self.position = array([moon_new_x, moon_new_y])
-        return result
-
     def convert(self, period: float, offset: float, **kwargs):
         """
         converts the moon to a planet
@@ -88,3 +59,6 @@ class Moon(Planet):
         moon_copy._shape = self._shape
         memo[id(self)] = moon_copy
         return moon_copy
+
+    parent = property(lambda self: self.planet)  # read only, the body being orbited
+    depth = property(lambda self: self.planet.depth + 1)  # read only, moons of moons are deeper than their parent
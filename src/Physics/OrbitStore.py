@@ -0,0 +1,250 @@
+from numpy import array, zeros, full, cos, sin, pi, flatnonzero, fmod, divide, where, array_equal
+
+
+class OrbitStore:
+    """
+    stores the orbital state of every celestial body in flat numpy arrays so that the whole solar system can be stepped
+    with a single vectorized call per frame
+        --> each body owns one row of the store, planets and moons read and write their position through that row
+        --> rows are kept dense, removing a body moves the last row into its place
+        --> the hierarchy is a parent index array, rows are grouped by depth so that moons (and moons of moons) are
+            offset by the position of their parent with one gather and add per depth
+        --> bodies marked as dirty have their attributes re-read and their angle reset before the next step
+        --> in closed form mode positions are computed directly from the elapsed time so they never drift
+    """
+
+    INITIAL_CAPACITY = 64
+    CLOSED_FORM = True  # places bodies directly from the elapsed time rather than advancing them each frame
+    FIELDS = ("period", "offset", "orbital_radius", "angular_speed", "angle", "parent", "position", "radius")
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        """
+        creates an empty orbit store
+
+        :param capacity: the number of rows to allocate up front, the store will grow as needed
+        """
+
+        # orbital attributes, one row per body
+        self.period = zeros(capacity)
+        self.offset = zeros(capacity)
+        self.orbital_radius = zeros(capacity)
+        self.angular_speed = zeros(capacity)
+        self.angle = zeros(capacity)
+        self.parent = full(capacity, -1)  # index of the body being orbited, -1 for the origin
+        self.position = zeros((capacity, 2))
+        self.radius = zeros(capacity)  # size of the body, not used by the physics but lets the gui cull and pick
+
+        # bookkeeping fields
+        self.bodies = []
+        self.dirty = set()
+        self.levels = None  # rows of each depth below the planets, recalculated when the hierarchy changes
+        self.version = 0  # incremented when a body is added or removed or its period, offset or parent changes
+        self.closed_form = OrbitStore.CLOSED_FORM
+
+    def __len__(self) -> int:
+        """
+        :return: the number of bodies in the store
+        """
+
+        return len(self.bodies)
+
+    def reserve(self, capacity: int):
+        """
+        grows the arrays of the store so that they can hold at least the given number of bodies
+
+        :param capacity: the minimum number of rows the store should be able to hold
+        """
+
+        # handles when store is already big enough
+        if capacity <= len(self.period):
+            return
+
+        # copies every field into a bigger array
+        capacity = max(capacity, len(self.period) * 2)
+        for field in OrbitStore.FIELDS:
+            old = getattr(self, field)
+            new = full((capacity, *old.shape[1:]), -1 if field == "parent" else 0, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, field, new)
+
+    def add(self, body):
+        """
+        adds a body to the end of the store, the body will be synced and have its angle reset on the next step
+
+        :param body: the planet or moon to add
+        """
+
+        # removes body from any store it was previously in
+        body.store.remove(body) if body.store is not None else None
+        self.reserve(len(self.bodies) + 1)
+
+        # assigns a row to the body
+        index = len(self.bodies)
+        self.bodies.append(body)
+        self.position[index] = body.position
+        body.store, body.index = self, index
+        self.levels = None
+        self.version += 1
+
+        # moons that were added before their planet need their parent index resolved again
+        self.sync(body)
+        self.dirty.add(body)
+        self.dirty.update(body.moons)
+
+    def remove(self, body):
+        """
+        removes a body from the store by moving the last row into its place
+
+        :param body: the planet or moon to remove
+        """
+
+        # gives position ownership back to the body
+        index, last = body.index, len(self.bodies) - 1
+        body._position = self.position[index].copy()
+        self.dirty.discard(body)
+
+        # moves the last row into the removed row
+        for field in OrbitStore.FIELDS:
+            getattr(self, field)[index] = getattr(self, field)[last]
+        self.bodies[index] = self.bodies[last]
+        self.bodies[index].index = index
+        self.bodies.pop()
+
+        # orphans bodies that orbited the removed body and re-points bodies that orbited the moved body
+        parent = self.parent[:last]
+        parent[parent == index] = -1
+        parent[parent == last] = index
+        body.store, body.index = None, None
+        self.levels = None
+        self.version += 1
+
+    def sync(self, body):
+        """
+        copies the orbital attributes of a body into its row of the store, the version only changes when an attribute
+        that decides when the body crosses the top of its orbit has changed (not its size or looks)
+
+        :param body: the planet or moon to sync
+        """
+
+        index = body.index
+        parent = body.parent.index if body.parent is not None and body.parent.store is self else -1
+        self.version += (self.period[index], self.offset[index], self.parent[index]) != (body.period, body.offset,
+                                                                                          parent)
+        self.period[index] = body.period
+        self.offset[index] = body.offset
+        self.orbital_radius[index] = body.orbital_radius
+        self.angular_speed[index] = 2 * pi / body.period if body.period else 0
+        self.radius[index] = body.radius
+
+        # updates the hierarchy when the body has a new parent
+        self.levels = None if parent != self.parent[index] else self.levels
+        self.parent[index] = parent
+
+    def sort_hierarchy(self):
+        """
+        finds the depth of every row in the hierarchy and groups the rows below the planets by depth so that parents are
+        always placed before their children
+        """
+
+        # finds the depth of each row by repeatedly following the parent index, bounded in case of a cycle
+        size = len(self.bodies)
+        parent = self.parent[:size]
+        depth = zeros(size, dtype=int)
+        for _ in range(size):
+            new_depth = where(parent >= 0, depth[parent] + 1, 0)
+            if array_equal(new_depth, depth):
+                break
+            depth = new_depth
+
+        # groups rows by depth
+        self.levels = [flatnonzero(depth == level) for level in range(1, depth.max(initial=0) + 1)]
+
+    def sync_dirty(self) -> list:
+        """
+        syncs every body that was modified since the last step and clears the dirty set
+
+        :return: the list of bodies that were synced
+        """
+
+        synced = list(self.dirty)
+        for body in synced:
+            self.sync(body)
+        self.dirty.clear()
+        return synced
+
+    def phase(self, time_elapsed: float) -> array:
+        """
+        gets where each body is along its orbit, computed directly from the time so that no error is accumulated between
+        frames
+
+        :param time_elapsed: the total time that has passed
+
+        :return: the position of each body along its orbit measured in orbits where whole numbers are the top of the
+            orbit, bodies without a period stay at their offset
+        """
+
+        size = len(self.bodies)
+        period = self.period[:size]
+        phase = fmod(time_elapsed, period, out=zeros(size), where=period > 0)
+        return divide(phase, period, out=phase, where=period > 0) - self.offset[:size]
+
+    def place(self):
+        """
+        converts the angle of each body back to rectangular coordinates and offsets moons by the position of their
+        parent one depth at a time
+        """
+
+        # places each body relative to its parent
+        size = len(self.bodies)
+        angle, radius, parent = self.angle[:size], self.orbital_radius[:size], self.parent[:size]
+        position = self.position[:size]
+        position[:, 0] = radius * cos(angle)
+        position[:, 1] = radius * sin(angle)
+
+        # offsets each depth by the already placed depth above it
+        self.sort_hierarchy() if self.levels is None else None
+        for level in self.levels:
+            position[level] += position[parent[level]]
+
+    def seek(self, time_elapsed: float) -> list:
+        """
+        places every body where it will be after the given amount of time, the cost is the same no matter how far the
+        jump is
+
+        :param time_elapsed: the total time that has passed
+
+        :return: the list of bodies that were synced before placing
+        """
+
+        synced = self.sync_dirty()
+        self.angle[:len(self.bodies)] = 2 * pi * (self.phase(time_elapsed) - .25)
+        self.place()
+        return synced
+
+    def step(self, dt: float, time_elapsed: float) -> list:
+        """
+        advances every body in the store in a single vectorized pass
+            --> dirty bodies are synced and placed where they would be after time_elapsed seconds
+            --> in closed form mode every body is placed directly from time_elapsed, otherwise remaining bodies advance
+                by their angular speed
+
+        :param dt: the time that has passed since the last step
+        :param time_elapsed: the total time that has passed, used to place dirty bodies
+
+        :return: the list of bodies that were synced so that their triggers can be rescheduled
+        """
+
+        # places every body directly from the time
+        if self.closed_form:
+            return self.seek(time_elapsed)
+
+        # advances the angle of each body and places synced bodies directly from the time
+        size = len(self.bodies)
+        synced = self.sync_dirty()
+        reset = [body.index for body in synced]
+        angle = self.angle[:size]
+        angle += self.angular_speed[:size] * dt
+        angle[reset] = 2 * pi * (self.phase(time_elapsed)[reset] - .25)
+        angle %= 2 * pi
+        self.place()
+        return synced
@@ -1,10 +1,10 @@
-from numpy import array, copy
+from numpy import array
 from functools import partial
-from pygame.mixer import Sound
-from math import cos, sin, pi, atan2
+from math import cos, sin, pi
 from uuid import uuid1
 from os.path import dirname
 from os import makedirs
+from AudioEngine.LazySound import LazySound
 
 
 class Planet:
@@ -15,6 +15,9 @@ class Planet:
     """
 
     RADIUS_FACTOR = .5  # how much to adjust radius when converting to moon
+    SOUND = None  # creates a playable sound from a file path, assigned by the audio adapter (see main.py)
+    SOUND_DATA = None  # creates a playable sound from the contents of a file, assigned by the audio adapter
+    AUDIO = {}  # the contents of the sound files of the loaded project kept in memory by file path, replaced on load
 
     def __init__(self, period: float, radius: float, color: str, pitch: int, sound_path=None, offset=0):
         """
@@ -37,6 +40,8 @@ class Planet:
         # physics fields
         self.moons = self.moons if hasattr(self, "moons") else []
         self.offset = offset
+        self.store = self.store if hasattr(self, "store") else None  # added by planet manager
+        self.index = self.index if hasattr(self, "index") else None  # row of the planet in the store
         orig_x = self.orbital_radius * cos(2 * pi * (self.offset + .25))
         orig_y = self.orbital_radius * -sin(2 * pi * (self.offset + .25))
         self.original_position = array([orig_x, orig_y])
@@ -50,34 +55,22 @@ class Planet:
         # music generation fields
         self.pitch = pitch
         self.sound_path = sound_path
-        self.sound = Sound(sound_path) if sound_path else None
+        self.sound = Planet.load_sound(sound_path)
 
-    def update_physics(self, dt: float):
+    @staticmethod
+    def load_sound(sound_path):
         """
-        updates the physics for the planet
+        creates the sound of a planet, the sounds of files that were loaded from a project into memory are lazy so that
+        they can be materialized in the background (see PlanetManager.load_sounds)
 
-        :param dt: the time that has passed since the last update
+        :param sound_path: the file path of the sound
 
-        :return: true if the planet should play a sound
+        :return: the playable sound, None if there is no sound or no audio adapter
         """
 
-        # gets the position
-        self.position = self.position if not self.update else copy(self.original_position)
-        rel_x = self.position[0]
-        rel_y = self.position[1]
-
-        # Apply rotation matrix and use polar coordinates
-        angular_speed = 2 * pi / self.period
-        rel_angle = atan2(rel_y, rel_x)
-        new_angle = rel_angle + angular_speed * dt
-
-        # switch back to rectangular coordinates
-        new_x = self.orbital_radius * cos(new_angle)
-        new_y = self.orbital_radius * sin(new_angle)
-
-        # Update absolute position and returns
-        self.position = array([new_x, new_y])
-        return rel_x < 0 <= new_x and (not self.update)
+        if sound_path in Planet.AUDIO:
+            return LazySound(Planet.SOUND_DATA, Planet.AUDIO[sound_path]) if Planet.SOUND_DATA else None
+        return Planet.SOUND(sound_path) if sound_path and Planet.SOUND else None
 
     def convert(self, planet, period: float, offset: float):
         """
@@ -94,6 +87,41 @@ class Planet:
         self.__init__(planet, period, self.radius * Planet.RADIUS_FACTOR, self.color, self.pitch, self.sound_path
                       , offset)
 
+    def set_position(self, position):
+        """
+        sets the position of the planet, writing into the orbit store when the planet has been added to one
+
+        :param position: the new position of the planet in the form [x, y]
+        """
+
+        if self.store is not None:
+            self.store.position[self.index] = position
+        else:
+            self._position = position
+
+    def set_update(self, update: bool):
+        """
+        sets the update flag of the planet and marks it as dirty in the orbit store so its attributes are synced and its
+        position is reset on the next physics update
+
+        :param update: determines if the planet needs its gui and physics updated
+        """
+
+        self._update = update
+        self.store.dirty.add(self) if update and self.store is not None else None
+
+    def get_satellites(self) -> list:
+        """
+        gets every moon that orbits the planet directly or by orbiting one of its moons
+
+        :return: the list of satellites, parents always come before their moons
+        """
+
+        satellites = self.moons.copy()
+        for moon in satellites:
+            satellites.extend(moon.moons)
+        return satellites
+
     def set_value(self, value, attribute: str, add_state: bool = True):
         """
         handles when the user updates a value
@@ -113,7 +141,8 @@ class Planet:
         # adds state
         undo = (self.set_value, (getattr(self, attribute), attribute, False))
         redo = (self.set_value, (value, attribute, False))
-        self.state_manager.add_state({"undo": [undo], "redo": [redo]}, self.update) if add_state else None
+        self.state_manager.add_state({"undo": [undo], "redo": [redo], "planets": [self]}, self.update) if add_state \
+            else None
 
         # updates planet
         setattr(self, attribute, value)
@@ -126,26 +155,60 @@ class Planet:
         :return: the state of the planet excluding the play sound file object
         """
 
+        return Planet.read_state(self.copy_state())
+
+    def copy_state(self) -> dict:
+        """
+        copies the state of the planet without reading its sound file so that a save can take it on the GUI thread and
+        serialize it on another (see ProjectFile.snapshot)
+
+        :return: the state of the planet, the sound is the contents kept in memory or the file path to read it from
+        """
+
         state = self.__dict__.copy()
-        if self.sound_path:
-            with open(self.sound_path, "rb") as f:
+        state["sound"] = Planet.AUDIO.get(self.sound_path, self.sound_path) if self.sound_path else state["sound"]
+        state["moons"], state["_position"] = list(self.moons), self.position.copy()
+        [state.pop(attribute, None) for attribute in ("state_manager", "store", "index")]
+        return state
+
+    @staticmethod
+    def read_state(state: dict) -> dict:
+        """
+        reads the sound file of a copied state, can be run on another thread
+
+        :param state: the state taken with copy_state, edited in place
+
+        :return: the state with the contents of the sound file
+        """
+
+        if isinstance(state["sound"], str):
+            with open(state["sound"], "rb") as f:
                 state["sound"] = f.read()
-        del state["state_manager"]
         return state
 
     def __setstate__(self, state):
         """
         restore the state of the planet after loading from file with the sound attribute
+            --> the contents of the sound file are kept in memory and the planet gets a lazy sound
+            --> the sound file is only written for audio adapters that can't create sounds from memory
 
         :param state: the state without the sound attribute
         """
 
         self.__dict__.update(state)
-        if self.sound_path:
+        self.store, self.index = None, None
+
+        # handles files saved before positions were kept in an orbit store
+        self._position = self.__dict__.pop("position") if "position" in self.__dict__ else self._position
+        self.__dict__.pop("center", None)
+        self.__dict__.pop("update", None)
+        if self.sound_path and Planet.SOUND and not Planet.SOUND_DATA:
             makedirs(dirname(self.sound_path), exist_ok=True)
             with open(self.sound_path, "wb") as f:
-                state["sound"] = f.write(state["sound"])
-        self.sound = Sound(self.sound_path) if self.sound_path else None
+                state["sound"] = f.write(bytes(state["sound"]))  # sounds of container files are read from their section
+        elif self.sound_path:
+            Planet.AUDIO[self.sound_path] = state["sound"]
+        self.sound = Planet.load_sound(self.sound_path)
         self.update = True
 
     def __deepcopy__(self, memo):
@@ -173,3 +236,10 @@ class Planet:
     period = property(lambda self: self._period, partial(set_value, attribute="_period"))
     shape = property(lambda self: self._shape, partial(set_value, attribute="_shape"))
     orbital_radius = property(lambda self: (self.period ** (2 / 3)) * 500)  # read only, calculated with period
+
+    # physics fields are views into the orbit store once the planet has been added to one
+    position = property(lambda self: self.store.position[self.index] if self.store is not None else self._position,
+                        set_position)
+    update = property(lambda self: self._update, set_update)
+    parent = property(lambda self: None)  # read only, the body being orbited (the origin for planets)
+    depth = property(lambda self: 0)  # read only, how many bodies are between the planet and the origin
@@ -1,7 +1,11 @@
 from Physics.Planet import Planet
+from Physics.OrbitStore import OrbitStore
+from Physics.TriggerScheduler import TriggerScheduler
+from Physics.TriggerTable import TriggerTable
 from FileManagement.StateManager import StateManger
-from tkinter.messagebox import askokcancel, showerror
-from GUI.PlanetEditor import PlanetEditor
+from AudioEngine.LazySound import LazySound
+from AudioEngine.SoundLoader import SoundLoader
+from math import inf
 
 
 # noinspection PyPropertyDefinition
@@ -11,10 +15,22 @@ class PlanetManager:
         --> can create new planets
         --> can destroy planets
         --> can get the list of plants
+
+    the planet manager does not depend on the GUI, when a canvas is assigned it is notified of changes through its
+    planet manager callbacks, otherwise the planet manager runs headless
     """
 
+    MIXER = None  # plays sounds at the exact time of their trigger when assigned by the audio adapter (see main.py)
+    BOUNCER = None  # plays a pre-rendered loop through the mixer once edits settle when assigned (see main.py)
+    LOADER = SoundLoader()  # materializes the sounds of loaded planets in the background (see load_sounds)
+
     # gui will automatically update by setting focused_planet
-    focused_planet = property(lambda self: self._focused_planet, lambda self, value: self.canvas.set_focus(value))
+    focused_planet = property(lambda self: self._focused_planet, lambda self, value: self.canvas.set_focus(
+        value) if self.canvas else setattr(self, "_focused_planet", value))
+
+    # read only statistics of the trigger table, None and 0 when the solar system has no repeat
+    loop_length = property(lambda self: self.timeline.loop_length)
+    trigger_density = property(lambda self: self.timeline.density)
 
     def __init__(self, planets: list[Planet] = None, samples: dict = None):
         """
@@ -34,14 +50,22 @@ class PlanetManager:
         self.removed_buffer = []
         self.added_buffer = self.planets.copy()
         self.state_manager = StateManger()
+        self.orbits = OrbitStore()
+        self.triggers = TriggerScheduler()
+        self.timeline = TriggerTable()  # replaces the trigger scheduler while the solar system is unchanged
+        self.timeline_stale = True
+        self.timeline_version = None  # the version of the orbit store the trigger table was last checked against
+        self.trigger_events = []  # the crossings of the last physics update in the form (time, planet)
+        self.synced_planets = []  # the planets and moons that were modified before the last physics update
 
         # sets values that will be controlled by the canvas
         self._focused_planet = None
         self.canvas = self.canvas if hasattr(self, "canvas") else None  # will be assigned
 
-        # ensures planets have access to state manager
+        # ensures planets have access to state manager and adds them to the orbit store
         for planet in self.planets:
             planet.state_manager = self.state_manager
+            self.orbits.add(planet)
 
         # sets planet volume
         for sample in self.samples.values():
@@ -49,24 +73,11 @@ class PlanetManager:
                 [planet.sound.set_volume(sample["volume"]) if planet and planet.sound else None for planet in sample[
                     "midi_array"].flatten()]
 
-        # adds samples to sample list
-        if self.canvas:
-            self.set_sample(self.sample)
-            [frame.destroy() for frame in self.canvas.menu_visibility["planet"]["menu"].sample_frames.values()]
-            for name, sample in self.samples.items():
-                self.canvas.menu_visibility["planet"]["menu"].add_sample(name, sample)
-
-            # sets sun settings
-            self.canvas.menu_visibility["planet"]["menu"].old_sun_r = self.planets[0].radius
-            self.canvas.menu_visibility["planet"]["menu"].size_slider.set(self.planets[0].radius)
-            self.canvas.menu_visibility["planet"]["menu"].shape_options.set(self.planets[0].shape)
-
-        # removed old planet editors
-        for editor in PlanetEditor.planets.values():
-            editor.destroy()
-        PlanetEditor.planets.clear()
+        # decodes the sounds of loaded planets in the background
+        self.load_sounds()
 
-        # sets sample
+        # reloads the menus and sets sample
+        self.canvas.reload_menus() if self.canvas else None
         self.set_sample(self.sample)
 
     def get_sun(self) -> Planet:
@@ -104,17 +115,19 @@ class PlanetManager:
         """
 
         # adds state updates to state manager
-        state = {"undo": [(self.remove_planet, (planet, False))], "redo": [(self.add_planet, (planet, False))]}
+        state = {"undo": [(self.remove_planet, (planet, False))], "redo": [(self.add_planet, (planet, False))],
+                 "planets": [planet]}
         self.state_manager.add_state(state, modify_state) if add_state else None
 
         # adds planet to solar system
         planet.state_manager = self.state_manager
         self.planets.append(planet)
+        self.orbits.add(planet)
         self.added_buffer.append(planet)
         planet.update = True
 
-        # adds to parent planet list if planet is a moon
-        if type(planet) != Planet:
+        # adds to parent planet list if planet is a moon, the parent can be a moon as well
+        if type(planet) != Planet and planet not in planet.planet.moons:
             planet.planet.moons.append(planet)
 
     def remove_planet(self, planet: Planet, add_state: bool = True, modify_state: bool = False):
@@ -133,11 +146,15 @@ class PlanetManager:
         """
 
         # adds state to state manager
-        state = {"undo": [(self.add_planet, (planet, False))], "redo": [(self.remove_planet, (planet, False))]}
+        state = {"undo": [(self.add_planet, (planet, False))], "redo": [(self.remove_planet, (planet, False))],
+                 "planets": [planet]}
         self.state_manager.add_state(state, modify_state) if add_state else None
 
         # removes planet
         self.planets.remove(planet)
+        self.orbits.remove(planet)
+        self.triggers.cancel(planet)
+        self.invalidate_timeline()
         self.removed_buffer.append(planet)
 
         # removes from parent planet list if planet is a moon
@@ -159,22 +176,23 @@ class PlanetManager:
 
         # handles when name is invalid
         if name == "Default (No Audio)":
-            showerror("Invalid Name", "Sample cannot be named: Default (No Audio)")
+            msg = "Sample cannot be named: Default (No Audio)"
+            self.canvas.show_error("Invalid Name", msg) if self.canvas else None
             return
 
         # exits if user does not want to override another sample
         msg = "A sample with this name already exist, saving will override this save. Continue?"
-        if (name in self.samples.keys()) and (not askokcancel("Sample Already Exists", msg)):
+        if (name in self.samples.keys()) and self.canvas and (not self.canvas.confirm("Sample Already Exists", msg)):
             return
 
         # overrides another sample
-        state = {"undo": [], "redo": []}
+        state = {"undo": [], "redo": [], "planets": []}
         if name in self.samples.keys():
             state = self.delete_sample(name, False)
 
         # adds sample
         self.samples[name] = sample
-        self.canvas.menu_visibility["planet"]["menu"].add_sample(name, sample)
+        self.canvas.sample_added(name, sample) if self.canvas else None
 
         # adds planets from sample
         if "midi_array" in sample.keys():
@@ -184,7 +202,7 @@ class PlanetManager:
         if add_state:
             undo = [(self.delete_sample, (name, False))] + state["undo"]
             redo = state["redo"] + [(self.add_sample, (name, sample, False))]
-            self.state_manager.add_state({"undo": undo, "redo": redo})
+            self.state_manager.add_state({"undo": undo, "redo": redo, "samples": [name], "planets": state["planets"]})
 
     def delete_sample(self, name: str, add_state: bool = True):
         """
@@ -198,22 +216,24 @@ class PlanetManager:
 
         # asks user if they are sure they want to delete
         msg = "You are about to delete a sample which will delete any associated planets. Continue?"
-        if add_state and (not askokcancel("Delete Sample", msg)):
+        if add_state and self.canvas and (not self.canvas.confirm("Delete Sample", msg)):
             return
 
         # deletes the sample
         sample = self.samples.pop(name)
-        self.canvas.menu_visibility["planet"]["menu"].sample_frames[name].destroy()
+        self.canvas.sample_deleted(name) if self.canvas else None
 
         # deletes planets in sample
-        if "midi_array" in sample.keys():
-            [self.remove_planet(planet, False) for planet in sample["midi_array"].flatten() if planet is not None]
+        planets = [planet for planet in sample["midi_array"].flatten() if planet is not None] if "midi_array" in \
+            sample.keys() else []
+        [self.remove_planet(planet, False) for planet in planets]
 
         # adds to state manager
         undo = [(self.add_sample, (name, sample, False))]
         redo = [(self.delete_sample, (name, False))]
-        self.state_manager.add_state({"undo": undo, "redo": redo}) if add_state else None
-        return {"undo": undo, "redo": redo}
+        self.state_manager.add_state({"undo": undo, "redo": redo, "samples": [name], "planets": planets}) if \
+            add_state else None
+        return {"undo": undo, "redo": redo, "planets": planets}
 
     def set_sample(self, sample: str):
         """
@@ -223,9 +243,7 @@ class PlanetManager:
         """
 
         self.sample = sample
-        if self.canvas:
-            self.canvas.menu_visibility["planet"]["menu"].sample.set(sample)
-            self.canvas.menu_visibility["AI"]["menu"].load_sample(sample)
+        self.canvas.sample_selected(sample) if self.canvas else None
 
     def get_added_buffer(self) -> list[Planet]:
         """
@@ -249,21 +267,101 @@ class PlanetManager:
         self.removed_buffer.clear()
         return buffer
 
-    def update_planet_physics(self, dt):
+    def update_planet_physics(self, dt, speed: float = 1):
         """
         runs the physics engine on each of the planets within the application
 
         :param dt: the change in time since the last physics update in seconds
+        :param speed: how many seconds of simulation time pass per second, used to time sounds in the mixer
+
+        :return: the list of planets that played a sound
         """
 
-        # updates planet manager state
+        # journals the last edit now that it has been applied
+        self.state_manager.journal.record() if self.state_manager.journal else None
+
+        # updates planet manager state and steps every planet in the orbit store at once, the trigger table is only
+        # invalidated when an edit changed when bodies trigger
         self.time_elapsed += dt
+        synced = self.synced_planets = self.orbits.step(dt, self.time_elapsed)
+        self.invalidate_timeline() if self.orbits.version != self.timeline_version else None
+        for planet in synced:
+            self.triggers.schedule(planet, self.time_elapsed)
+
+        # rebuilds the trigger table on the first frame without edits
+        if self.timeline_stale and not synced:
+            self.build_timeline()
+
+        # plays the sound of each planet that crossed the top of its orbit and every moon orbiting it
+        #     --> sounds are only scheduled when the mixer is not playing a pre-rendered loop
+        mixer = PlanetManager.MIXER
+        mixer.sync(self.time_elapsed, speed) if mixer else None
+        PlanetManager.BOUNCER.update(self, speed) if PlanetManager.BOUNCER else None
+        live = not (mixer and mixer.loop)
+        self.trigger_events = (self.timeline if self.timeline.loop_length else self.triggers).pop_due(self.time_elapsed)
         triggered_planets = []
-        for planet in self.planets[1:]:
-
-            # updates each planets position
-            if planet.update_physics(dt if not planet.update else self.time_elapsed):
-                planet.sound.play() if planet.sound else None
-                triggered_planets.append(planet)
+        for time, planet in self.trigger_events:
+            for body in [planet] + [moon for moon in planet.get_satellites() if moon.store is self.orbits]:
+                (mixer.schedule(body.sound, time) if mixer else body.sound.play()) if body.sound and live else None
+                triggered_planets.append(body)
 
         return triggered_planets
+
+    def seek(self, time: float):
+        """
+        jumps the simulation to the given time without replaying the time in between, no sounds are played
+
+        :param time: the time in seconds to jump to
+        """
+
+        self.time_elapsed = time
+        PlanetManager.MIXER.clear() if PlanetManager.MIXER else None
+        self.orbits.seek(time)
+        self.triggers.reset(self.orbits.bodies, time)
+        self.timeline.seek(time)
+
+    def invalidate_timeline(self):
+        """
+        stops using the trigger table after the solar system has been edited, the trigger scheduler takes over until
+        the table is rebuilt
+        """
+
+        # the trigger scheduler is not advanced while the table is used so it needs to be caught up
+        if self.timeline.loop_length:
+            self.timeline.clear()
+            self.triggers.reset(self.orbits.bodies, self.time_elapsed)
+        self.timeline_stale, self.timeline_version = True, self.orbits.version
+
+    def build_timeline(self):
+        """
+        builds the trigger table for one repeat of the solar system and notifies the canvas of its new statistics
+        """
+
+        samples = {planet: name for name, sample in self.samples.items() if "midi_array" in sample for planet in
+                   sample["midi_array"].flatten() if planet is not None}
+        self.timeline.build(self.orbits.bodies, samples, self.time_elapsed)
+        self.timeline_stale = False
+        self.canvas.timeline_built(self.loop_length, self.trigger_density) if self.canvas else None
+
+    def load_sounds(self):
+        """
+        materializes the lazy sounds of the planets and moons on a background thread, the bodies that trigger soonest
+        are materialized first so their sounds are ready before they play
+        """
+
+        bodies = [planet for planet in self.planets if isinstance(planet.sound, LazySound) and not planet.sound.ready]
+        PlanetManager.LOADER.load([body.sound for body in sorted(bodies, key=self.next_trigger)])
+
+    def next_trigger(self, body) -> float:
+        """
+        finds when a body will next play its sound, moons play with the planet at the root of their orbits
+
+        :param body: the planet or moon
+
+        :return: the simulation time of the next trigger, inf if the body never triggers
+        """
+
+        while body.parent is not None:
+            body = body.parent
+        return (TriggerScheduler.next_orbit(body, self.time_elapsed) + body.offset) * body.period if body.period > 0 \
+            else inf
@@ -0,0 +1,139 @@
+from heapq import heappush, heappop, heapify
+from itertools import count
+from math import floor
+
+
+class TriggerScheduler:
+    """
+    keeps the time at which each planet will next cross the top of its orbit in a min heap so that only the triggers
+    that are due need to be checked each frame
+        --> crossing times are computed analytically from the period and offset of the planet
+        --> moons are not scheduled, they trigger with their planet
+        --> rescheduling a body invalidates its queued crossing lazily, stale entries are skipped when popped
+    """
+
+    # how the scheduler should handle a frame with more due triggers than MAX_BACKLOG
+    #     --> "all": every trigger is returned
+    #     --> "latest": only the latest trigger of each planet is returned
+    #     --> "skip": the backlog is dropped
+    CATCH_UP_POLICIES = ("all", "latest", "skip")
+    CATCH_UP_POLICY = "latest"
+    MAX_BACKLOG = 256
+
+    def __init__(self):
+        """
+        creates an empty trigger scheduler
+        """
+
+        self.queue = []  # entries in the form (time, order, body, generation, orbit)
+        self.generation = {}
+        self.order = count()
+        self.catch_up_policy = TriggerScheduler.CATCH_UP_POLICY
+        self.max_backlog = TriggerScheduler.MAX_BACKLOG
+
+    def next_crossing(self, body, orbit: int, generation: int) -> tuple:
+        """
+        creates the queue entry for a crossing of a planet
+
+        :param body: the planet that will cross the top of its orbit
+        :param orbit: the number of the orbit that will be completed by the crossing
+        :param generation: the generation of the body when the crossing was scheduled
+
+        :return: the queue entry for the crossing
+        """
+
+        return (orbit + body.offset) * body.period, next(self.order), body, generation, orbit
+
+    @staticmethod
+    def next_orbit(body, time_elapsed: float) -> int:
+        """
+        finds the first orbit a planet completes after the given time
+
+        :param body: the planet that crosses the top of its orbit
+        :param time_elapsed: the time after which the crossing should happen
+
+        :return: the number of the orbit
+        """
+
+        return floor(time_elapsed / body.period - body.offset) + 1
+
+    def schedule(self, body, time_elapsed: float, push: bool = True) -> tuple:
+        """
+        schedules the first crossing of a body after the given time and invalidates any crossing already queued for it
+
+        :param body: the planet or moon to schedule
+        :param time_elapsed: the time after which the crossing should happen
+        :param push: determines if the entry should be pushed onto the queue or only returned
+
+        :return: the queue entry that was created, None if the body does not trigger on its own
+        """
+
+        # invalidates the queued crossing and handles bodies that don't trigger on their own
+        generation = self.generation.get(body, 0) + 1
+        self.generation[body] = generation
+        if body.parent is not None or body.period <= 0:
+            return
+
+        # schedules the next crossing
+        entry = self.next_crossing(body, TriggerScheduler.next_orbit(body, time_elapsed), generation)
+        heappush(self.queue, entry) if push else None
+        return entry
+
+    def cancel(self, body):
+        """
+        removes a body from the scheduler, its queued crossing will be skipped
+
+        :param body: the planet or moon to remove
+        """
+
+        self.generation.pop(body, None)
+
+    def reset(self, bodies: list, time_elapsed: float):
+        """
+        rebuilds the queue from scratch, used when the time jumps
+
+        :param bodies: every planet and moon that should be scheduled
+        :param time_elapsed: the time after which the crossings should happen
+        """
+
+        self.generation.clear()
+        self.queue = [entry for entry in (self.schedule(body, time_elapsed, False) for body in bodies) if entry]
+        heapify(self.queue)
+
+    def pop_due(self, time_elapsed: float) -> list[tuple]:
+        """
+        pops every crossing that happens up to the given time and queues the following crossing of each planet
+
+        :param time_elapsed: the end of the window to pop crossings from
+
+        :return: the list of due crossings in the form (time, planet) sorted by time
+        """
+
+        # pops due crossings and skips the ones that have been invalidated
+        events = []
+        while self.queue and self.queue[0][0] <= time_elapsed:
+            time, _, body, generation, orbit = heappop(self.queue)
+            if self.generation.get(body) != generation:
+                continue
+            events.append((time, body))
+            heappush(self.queue, self.next_crossing(body, orbit + 1, generation))
+
+        return TriggerScheduler.catch_up(events, self.catch_up_policy, self.max_backlog)
+
+    @staticmethod
+    def catch_up(events: list[tuple], policy: str, max_backlog: int) -> list[tuple]:
+        """
+        applies a catch up policy to the crossings of a frame when there is a backlog
+
+        :param events: the due crossings in the form (time, planet) sorted by time
+        :param policy: one of CATCH_UP_POLICIES
+        :param max_backlog: the number of crossings a frame can have before the policy is applied
+
+        :return: the crossings that should be played
+        """
+
+        if len(events) <= max_backlog or policy == "all":
+            return events
+        if policy == "latest":
+            return sorted({body: (time, body) for time, body in events}.values(), key=lambda event: event[0])
+        return []
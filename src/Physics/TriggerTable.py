@@ -0,0 +1,145 @@
+from Physics.TriggerScheduler import TriggerScheduler
+from numpy import array, zeros, arange, concatenate, repeat, argsort, searchsorted
+from fractions import Fraction
+from math import gcd, lcm, floor
+
+
+class TriggerTable:
+    """
+    stores every crossing of one full repeat of the solar system in a table sorted by time so that playback only needs
+    to advance a cursor
+        --> the repeat length is the least common multiple of the periods of the planets, planet periods are whole
+            numbers of columns in the sequence editor so they almost always have one
+        --> moons are not in the table, they trigger with their planet
+        --> the table is only usable while the solar system is unchanged, it is rebuilt once edits have stopped
+    """
+
+    MAX_DENOMINATOR = 1000  # periods are treated as fractions with at most this denominator
+    TOLERANCE = 1e-9  # how far a period can be from its fraction
+    MAX_LOOP_LENGTH = 3600  # seconds, longer repeats are played with the trigger scheduler instead
+    MAX_TRIGGERS = 1_000_000  # the largest table that will be built
+
+    def __init__(self):
+        """
+        creates an empty trigger table
+        """
+
+        self.catch_up_policy = TriggerScheduler.CATCH_UP_POLICY
+        self.max_backlog = TriggerScheduler.MAX_BACKLOG
+        self.version = 0  # incremented each time the table is built
+        self.clear()
+
+    def __len__(self) -> int:
+        """
+        :return: the number of crossings in one repeat
+        """
+
+        return len(self.times)
+
+    def clear(self):
+        """
+        empties the table so that it is no longer used
+        """
+
+        self.loop_length = None  # the length of one repeat in seconds, None when the table is empty
+        self.density = 0  # the number of sounds played per second including moons
+        self.times = zeros(0)  # time of each crossing within the loop
+        self.bodies = array([], dtype=object)  # planet of each crossing
+        self.samples = array([], dtype=object)  # name of the sample of each planet, None when it has no sample
+        self.cursor = 0  # index of the next crossing
+        self.cycle = 0  # the number of repeats completed before the cursor
+
+    @staticmethod
+    def hyperperiod(periods) -> float:
+        """
+        finds the length of time after which a set of periods all line up again
+
+        :param periods: the periods of the planets
+
+        :return: the least common multiple of the periods, None if they don't have one within MAX_LOOP_LENGTH
+        """
+
+        loop = None
+        for period in set(periods):
+            fraction = Fraction(period).limit_denominator(TriggerTable.MAX_DENOMINATOR)
+            if abs(fraction - period) > TriggerTable.TOLERANCE:
+                return
+            loop = fraction if loop is None else Fraction(lcm(loop.numerator, fraction.numerator),
+                                                          gcd(loop.denominator, fraction.denominator))
+            if loop > TriggerTable.MAX_LOOP_LENGTH:
+                return
+
+        return float(loop) if loop else None
+
+    def build(self, bodies: list, samples: dict, time_elapsed: float) -> bool:
+        """
+        fills the table with one repeat of the crossings of the given bodies and places the cursor at the given time
+
+        :param bodies: every planet and moon in the solar system
+        :param samples: the name of the sample of each planet
+        :param time_elapsed: the time to place the cursor at
+
+        :return: if the table could be built, an empty table is left when there is no repeat
+        """
+
+        # finds the repeat length of the planets that trigger on their own
+        self.clear()
+        self.version += 1
+        planets = [body for body in bodies if body.parent is None and body.period > 0]
+        loop = self.hyperperiod(planet.period for planet in planets)
+        counts = [round(loop / planet.period) for planet in planets] if loop else []
+        if (not loop) or sum(counts) > TriggerTable.MAX_TRIGGERS:
+            return False
+
+        # places every crossing of each planet within one repeat and sorts them by time
+        times = concatenate([(arange(n) + planet.offset) * planet.period % loop for planet, n in zip(planets, counts)])
+        order = argsort(times, kind="stable")
+        owners = repeat(arange(len(planets)), counts)[order]
+        self.times = times[order]
+        self.bodies = array(planets, dtype=object)[owners]
+        self.samples = array([samples.get(planet) for planet in planets], dtype=object)[owners]
+
+        # sets the statistics of the table and places the cursor
+        self.loop_length = loop
+        self.density = sum(n * (1 + len(planet.get_satellites())) for planet, n in zip(planets, counts)) / loop
+        self.seek(time_elapsed)
+        return True
+
+    def seek(self, time_elapsed: float):
+        """
+        moves the cursor to the first crossing after the given time
+
+        :param time_elapsed: the time to place the cursor at
+        """
+
+        if self.loop_length:
+            self.cycle = floor(time_elapsed / self.loop_length)
+            self.cursor = searchsorted(self.times, time_elapsed - self.cycle * self.loop_length, side="right")
+
+    def pop_due(self, time_elapsed: float) -> list[tuple]:
+        """
+        advances the cursor past every crossing that happens up to the given time, wrapping around at the end of the
+        repeat
+
+        :param time_elapsed: the end of the window to pop crossings from
+
+        :return: the list of due crossings in the form (time, planet) sorted by time
+        """
+
+        # handles an empty table and frames without a crossing
+        events = []
+        if (not self.loop_length) or (self.cursor < len(self.times) and
+                                      self.cycle * self.loop_length + self.times[self.cursor] > time_elapsed):
+            return events
+
+        # collects crossings one repeat at a time
+        while True:
+            start = self.cycle * self.loop_length
+            end = searchsorted(self.times, time_elapsed - start, side="right")
+            events.extend(zip((start + self.times[self.cursor:end]).tolist(), self.bodies[self.cursor:end]))
+            if end < len(self.times) or time_elapsed < start + self.loop_length:
+                self.cursor = end
+                break
+            self.cycle, self.cursor = self.cycle + 1, 0
+
+        return TriggerScheduler.catch_up(events, self.catch_up_policy, self.max_backlog)
@@ -3,13 +3,29 @@ from FileManagement.FileManager import FileManager
 from GUI.PlanetSettings import PlanetSettings
 from GUI.AISettings import AISettings
 from GUI.Canvas import Canvas
-from pygame.mixer import init, set_num_channels
+from Physics.Planet import Planet
+from Physics.PlanetManager import PlanetManager
+from AudioEngine.Mixer import Mixer
+from AudioEngine.DeviceOutput import DeviceOutput
+from AudioEngine.SoundCache import SoundCache
+from AudioEngine.LoopBouncer import LoopBouncer
+from pygame.mixer import init, set_num_channels, Sound
 from sys import argv
 
-# initializes pygame audio mixer and AI
+# initializes pygame audio mixer (used for sample previews), the planet mixer and AI
 progress_bar.set(1 / 2)
 init()
-set_num_channels(1000)  # adjust as needed
+set_num_channels(1000)  # pygame plays the previews, and every planet when the planet mixer can't be opened
+try:
+    mixer = Mixer(DeviceOutput())
+    Planet.SOUND, Planet.SOUND_DATA = mixer.load, mixer.load_data
+    PlanetManager.MIXER = mixer
+    PlanetManager.BOUNCER = LoopBouncer(mixer)
+except (RuntimeError, IndexError):  # falls back to pygame sounds when a second device can't be opened
+    # only the decoded samples are shared, each planet gets its own sound so that their volumes stay separate
+    sounds = SoundCache(lambda file: memoryview(Sound(file).get_raw()))
+    Planet.SOUND = lambda path: Sound(buffer=sounds.get(path))
+    Planet.SOUND_DATA = lambda data: Sound(buffer=sounds.get_data(data))
 
 # creates the screen and its widgets
 FileManager.SAVE_OPTIONS["parent"] = root
@@ -23,6 +39,9 @@ AI_settings = AISettings(root, border_width=2, planet_manager=planet_manager, pl
 canvas = Canvas(root, bg="black", highlightthickness=1, planet_settings=planet_settings, AI_settings=AI_settings,
                 planet_manager=planet_manager, file_manager=file_manager)
 
+# compacts the journal of the project on a schedule so it stays small between saves
+file_manager.compact_journal(canvas)
+
 # configures grid close and click functions
 root.rowconfigure(0, weight=1)
 root.columnconfigure(0, weight=1)
@@ -48,6 +67,12 @@ root.bind_all("<Control-Shift-minus>", lambda e: setattr(canvas, "speed", canvas
 root.bind_all("<Control-Shift-equal>", lambda e: setattr(canvas, "speed", canvas.speed * Canvas.SPEED_FACTOR))
 root.bind_all("<Control-Shift-underscore>", lambda e: setattr(canvas, "speed", canvas.speed / Canvas.SPEED_FACTOR))
 
+# frame profiler and frame rate actions
+root.bind_all("<F3>", lambda e: canvas.toggle_profile())
+root.bind_all("<Shift-F3>", lambda e: canvas.export_profile())
+root.bind_all("<F4>", lambda e: canvas.step_fps(1))
+root.bind_all("<Shift-F4>", lambda e: canvas.step_fps(-1))
+
 # places widgets on screen
 label.destroy()
 progress_bar.destroy()